@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Perfil de arranque de la API: tiempo de importación y tiempo hasta la primera petición.
+
+1. Importa `unrc_api_main` con `python -X importtime` en un proceso nuevo y resume la
+   salida: tiempo total, módulos más caros (acumulado) y costo propio por paquete.
+   Avisa si al importar se cargan dependencias pesadas que deberían cargarse en el
+   primer uso (spaCy, scikit-learn, NumPy, pypdf, python-docx...).
+2. Arranca el servidor (uvicorn o gunicorn) sobre una copia de la base de datos y mide
+   cuánto tarda en responder /health/live y la primera petición real (--ruta). Es lo
+   que espera el primer usuario tras un arranque en frío (escalado a cero en Railway).
+
+Ejecutar desde la raíz del proyecto:
+    python benchmarks/bench_arranque.py
+    python benchmarks/bench_arranque.py --servidor gunicorn --arranques 5 --objetivo-ms 1500
+
+El proceso termina con código 1 si la mediana del tiempo hasta la primera petición
+supera --objetivo-ms.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Paquetes que no deberían importarse al arrancar (se cargan en el primer uso)
+PESADOS = ("spacy", "sklearn", "numpy", "scipy", "pandas", "thinc", "pypdf", "PyPDF2", "docx", "lxml", "boto3")
+
+
+def _entorno(base=None):
+    entorno = {**os.environ, "SECRET_KEY": os.environ.get("SECRET_KEY") or "arranque-secret"}
+    if base:
+        entorno["DATABASE_PATH"] = base
+    return entorno
+
+
+def perfil_importaciones(modulo, base):
+    """Filas (modulo, propio_us, acumulado_us, profundidad) de `-X importtime`, en orden de salida."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, env=_entorno(base), capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+        filas.append((nombre.strip(), int(propio), int(acumulado), profundidad))
+    return filas
+
+
+def resumir_importaciones(filas, modulo, top):
+    total = next((acumulado for nombre, _, acumulado, _ in filas if nombre == modulo), 0)
+    por_paquete = {}
+    for nombre, propio, _, _ in filas:
+        paquete = nombre.split(".")[0]
+        por_paquete[paquete] = por_paquete.get(paquete, 0) + propio
+    cargados = {nombre.split(".")[0] for nombre, _, _, _ in filas}
+    return {
+        "total_ms": total / 1000,
+        "modulos": len(filas),
+        "mas_caros": [
+            {"modulo": nombre, "acumulado_ms": acumulado / 1000, "propio_ms": propio / 1000}
+            for nombre, propio, acumulado, _ in sorted(filas, key=lambda f: f[2], reverse=True)[:top]
+        ],
+        "por_paquete": [
+            {"paquete": paquete, "propio_ms": propio / 1000}
+            for paquete, propio in sorted(por_paquete.items(), key=lambda p: p[1], reverse=True)[:top]
+        ],
+        "pesados_al_arrancar": sorted(p for p in PESADOS if p in cargados),
+    }
+
+
+def medir_arranque(args, base):
+    """Segundos desde lanzar el servidor hasta /health/live y hasta la primera respuesta de --ruta."""
+    url = f"http://127.0.0.1:{args.puerto}"
+    entorno = _entorno(base)
+    entorno["PORT"] = str(args.puerto)
+    if args.servidor == "gunicorn":
+        entorno["WEB_CONCURRENCY"] = str(args.workers)
+        comando = [sys.executable, "-m", "gunicorn", "unrc_api_main:app", "-c", "gunicorn.conf.py",
+                   "--access-logfile", "/dev/null", "--log-level", "warning"]
+    else:
+        comando = [sys.executable, "-m", "uvicorn", "unrc_api_main:app", "--port", str(args.puerto),
+                   "--log-level", "warning"]
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=entorno)
+    try:
+        vivo = None
+        limite = inicio + args.timeout
+        while vivo is None:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"El servidor terminó al arrancar (código {proceso.returncode})")
+            if time.perf_counter() > limite:
+                raise RuntimeError("El servidor no respondió /health/live a tiempo")
+            try:
+                if httpx.get(url + "/health/live", timeout=1).status_code == 200:
+                    vivo = time.perf_counter() - inicio
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        respuesta = httpx.get(url + args.ruta, timeout=args.timeout)
+        primera = time.perf_counter() - inicio
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f"GET {args.ruta} respondió {respuesta.status_code}")
+        return vivo, primera
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def imprimir(reporte):
+    imp = reporte["importacion"]
+    print(f"\nImportación de {reporte['modulo']}: {imp['total_ms']:.0f} ms ({imp['modulos']} módulos)")
+    print(f"\n{'Módulo (acumulado)':<50}{'acum. ms':>10}{'propio ms':>11}")
+    for m in imp["mas_caros"]:
+        print(f"{m['modulo']:<50}{m['acumulado_ms']:>10.1f}{m['propio_ms']:>11.1f}")
+    print(f"\n{'Paquete (suma de tiempo propio)':<50}{'ms':>10}")
+    for p in imp["por_paquete"]:
+        print(f"{p['paquete']:<50}{p['propio_ms']:>10.1f}")
+    if imp["pesados_al_arrancar"]:
+        print(f"\n✗ Dependencias pesadas importadas al arrancar: {', '.join(imp['pesados_al_arrancar'])}")
+    else:
+        print("\n✓ Ninguna dependencia pesada se importa al arrancar")
+
+    arr = reporte.get("arranque")
+    if arr:
+        print(f"\nArranque con {arr['servidor']} ({arr['arranques']} veces, mediana / mínimo):")
+        print(f"  hasta /health/live:      {arr['vivo_ms']:8.0f} / {arr['vivo_min_ms']:.0f} ms")
+        print(f"  hasta GET {arr['ruta']:<14} {arr['primera_ms']:8.0f} / {arr['primera_min_ms']:.0f} ms"
+              f"  (objetivo {arr['objetivo_ms']:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de arranque de la API")
+    parser.add_argument("--modulo", default="unrc_api_main", help="Módulo a importar")
+    parser.add_argument("--top", type=int, default=15, help="Filas de cada tabla")
+    parser.add_argument("--solo-importacion", action="store_true", help="No arrancar el servidor")
+    parser.add_argument("--servidor", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=2, help="Workers con --servidor gunicorn")
+    parser.add_argument("--puerto", type=int, default=8810)
+    parser.add_argument("--arranques", type=int, default=3, help="Arranques a medir")
+    parser.add_argument("--ruta", default="/oportunidades/", help="Primera petición real")
+    parser.add_argument("--objetivo-ms", type=float, default=2000, help="Tiempo máximo hasta la primera petición")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--salida", help="Guardar el reporte en JSON")
+    args = parser.parse_args()
+
+    # Copia de la base: el arranque crea tablas y no debe tocar db/database.db
+    temporal = tempfile.mkdtemp(prefix="arranque-")
+    base = os.path.join(temporal, "database.db")
+    origen = os.path.join(RAIZ, "db", "database.db")
+    if os.path.exists(origen):
+        shutil.copyfile(origen, base)
+    try:
+        reporte = {
+            "modulo": args.modulo,
+            "importacion": resumir_importaciones(perfil_importaciones(args.modulo, base), args.modulo, args.top),
+        }
+        if not args.solo_importacion:
+            medidas = [medir_arranque(args, base) for _ in range(args.arranques)]
+            vivos, primeras = [m[0] for m in medidas], [m[1] for m in medidas]
+            reporte["arranque"] = {
+                "servidor": args.servidor,
+                "arranques": args.arranques,
+                "ruta": args.ruta,
+                "objetivo_ms": args.objetivo_ms,
+                "vivo_ms": statistics.median(vivos) * 1000,
+                "vivo_min_ms": min(vivos) * 1000,
+                "primera_ms": statistics.median(primeras) * 1000,
+                "primera_min_ms": min(primeras) * 1000,
+            }
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    imprimir(reporte)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2)
+        print(f"\nReporte guardado en {args.salida}")
+
+    arranque = reporte.get("arranque")
+    if arranque and arranque["primera_ms"] > args.objetivo_ms:
+        print(f"\n✗ El tiempo hasta la primera petición supera el objetivo de {args.objetivo_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
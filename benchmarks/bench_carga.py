@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Generador de carga que reproduce los flujos del frontend (frontend/src) contra una
+base sembrada con benchmarks/sembrar_carga.py, y reporta por endpoint el throughput
+y las latencias p50/p95/p99.
+
+Cada usuario virtual repite sesiones hasta que se acaba el tiempo:
+- Estudiante (PerfilEstudiante / DashboardEstudiante): POST /auth/login y, por cada
+  vista, GET /estudiantes/me/profile y GET /oportunidades/recomendadas/{id}; con
+  probabilidad --prob-cv sube un CV (POST /estudiantes/me/upload_cv).
+- Empresa (PerfilEmpresa / GestionOfertas / GestionEstudiantes): POST /auth/login y,
+  por cada vista, GET /empresas/me, GET /oportunidades/me y GET /auth/usuarios/estudiantes.
+
+Ejecutar desde la raíz del proyecto:
+    python benchmarks/sembrar_carga.py benchmarks/carga
+    python benchmarks/bench_carga.py benchmarks/carga --arrancar --usuarios 20 --duracion 60 --salida base.json
+    # ... cambiar la API ...
+    python benchmarks/bench_carga.py benchmarks/carga --arrancar --usuarios 20 --duracion 60 --comparar base.json
+
+Con --arrancar se levanta la API sobre una copia de la base sembrada (sin límite de
+peticiones y con los CVs en un directorio temporal), así cada corrida parte del mismo
+estado. Sin --arrancar se usa la API de --url, que debe apuntar a la base sembrada
+(DATABASE_PATH) y tener RATE_LIMIT_RULES vacío. Con --comparar el proceso termina con
+código 1 si el p95 de algún endpoint o el throughput empeoran más que --tolerancia, o
+si aumenta la tasa de errores.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _percentil(valores, p):
+    """Percentil con interpolación lineal sobre los valores ordenados."""
+    if not valores:
+        return 0.0
+    k = (len(valores) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(valores) - 1)
+    return valores[i] + (valores[j] - valores[i]) * (k - i)
+
+
+class Resultados:
+    """Latencias por endpoint; solo cuenta las peticiones que empiezan tras el calentamiento."""
+
+    def __init__(self, desde):
+        self.desde = desde
+        self.latencias = {}
+        self.errores = {}
+
+    def registrar(self, etiqueta, inicio, segundos, estado):
+        if inicio < self.desde:
+            return
+        self.latencias.setdefault(etiqueta, []).append(segundos)
+        if estado is None or estado >= 400:
+            por_estado = self.errores.setdefault(etiqueta, {})
+            clave = str(estado) if estado is not None else "conexion"
+            por_estado[clave] = por_estado.get(clave, 0) + 1
+
+
+async def _peticion(cliente, resultados, etiqueta, metodo, url, **kwargs):
+    inicio = time.monotonic()
+    try:
+        respuesta = await cliente.request(metodo, url, **kwargs)
+        await respuesta.aread()
+    except httpx.HTTPError:
+        resultados.registrar(etiqueta, inicio, time.monotonic() - inicio, None)
+        return None
+    resultados.registrar(etiqueta, inicio, time.monotonic() - inicio, respuesta.status_code)
+    return respuesta
+
+
+async def _login(cliente, resultados, email, password):
+    respuesta = await _peticion(cliente, resultados, "POST /auth/login", "POST", "/auth/login",
+                                json={"email": email, "password": password})
+    if respuesta is None or respuesta.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+
+async def sesion_estudiante(cliente, resultados, rng, manifiesto, args):
+    cabeceras = await _login(cliente, resultados, rng.choice(manifiesto["estudiantes"]), manifiesto["password"])
+    if cabeceras is None:
+        return
+    for _ in range(args.vistas):
+        perfil = await _peticion(cliente, resultados, "GET /estudiantes/me/profile", "GET",
+                                 "/estudiantes/me/profile", headers=cabeceras)
+        if perfil is None or perfil.status_code != 200:
+            return
+        estudiante_id = perfil.json()["id"]
+        await _peticion(cliente, resultados, "GET /oportunidades/recomendadas/{id}", "GET",
+                        f"/oportunidades/recomendadas/{estudiante_id}", headers=cabeceras)
+        if manifiesto["cvs"] and rng.random() < args.prob_cv:
+            ruta = rng.choice(manifiesto["cvs"])
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            await _peticion(cliente, resultados, "POST /estudiantes/me/upload_cv", "POST",
+                            "/estudiantes/me/upload_cv", headers=cabeceras,
+                            files={"file": (os.path.basename(ruta), contenido)})
+        await _pausa(rng, args)
+
+
+async def sesion_empresa(cliente, resultados, rng, manifiesto, args):
+    cabeceras = await _login(cliente, resultados, rng.choice(manifiesto["empresas"]), manifiesto["password"])
+    if cabeceras is None:
+        return
+    for _ in range(args.vistas):
+        await _peticion(cliente, resultados, "GET /empresas/me", "GET", "/empresas/me", headers=cabeceras)
+        await _peticion(cliente, resultados, "GET /oportunidades/me", "GET", "/oportunidades/me", headers=cabeceras)
+        # GestionEstudiantes no envía el token
+        await _peticion(cliente, resultados, "GET /auth/usuarios/estudiantes", "GET", "/auth/usuarios/estudiantes")
+        await _pausa(rng, args)
+
+
+async def _pausa(rng, args):
+    if args.pausa_ms:
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.pausa_ms / 1000)
+
+
+async def usuario_virtual(n, cliente, resultados, manifiesto, args, fin):
+    rng = random.Random(args.semilla * 1000 + n)
+    while time.monotonic() < fin:
+        if rng.random() < args.prop_empresas:
+            await sesion_empresa(cliente, resultados, rng, manifiesto, args)
+        else:
+            await sesion_estudiante(cliente, resultados, rng, manifiesto, args)
+
+
+async def ejecutar_carga(url, manifiesto, args):
+    inicio = time.monotonic()
+    resultados = Resultados(desde=inicio + args.calentamiento)
+    fin = inicio + args.calentamiento + args.duracion
+    limites = httpx.Limits(max_connections=args.usuarios, max_keepalive_connections=args.usuarios)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limites) as cliente:
+        await asyncio.gather(*(
+            usuario_virtual(n, cliente, resultados, manifiesto, args, fin) for n in range(args.usuarios)
+        ))
+    # Las sesiones en curso terminan después de `fin`: se mide contra el tiempo real
+    duracion = max(time.monotonic() - resultados.desde, 1e-9)
+    return reporte(resultados, duracion, args)
+
+
+def reporte(resultados, duracion, args):
+    endpoints = {}
+    total = 0
+    for etiqueta, valores in sorted(resultados.latencias.items()):
+        valores.sort()
+        errores = sum(resultados.errores.get(etiqueta, {}).values())
+        total += len(valores)
+        endpoints[etiqueta] = {
+            "n": len(valores),
+            "rps": len(valores) / duracion,
+            "errores": errores,
+            "tasa_error": errores / len(valores),
+            "por_estado": resultados.errores.get(etiqueta, {}),
+            "p50_ms": _percentil(valores, 50) * 1000,
+            "p95_ms": _percentil(valores, 95) * 1000,
+            "p99_ms": _percentil(valores, 99) * 1000,
+            "max_ms": valores[-1] * 1000,
+        }
+    return {
+        "usuarios": args.usuarios,
+        "duracion_s": duracion,
+        "semilla": args.semilla,
+        "peticiones": total,
+        "rps": total / duracion,
+        "endpoints": endpoints,
+    }
+
+
+def imprimir(rep):
+    print(f"\n{rep['peticiones']} peticiones en {rep['duracion_s']:.1f} s con {rep['usuarios']} usuarios "
+          f"({rep['rps']:.1f} req/s)")
+    print(f"\n{'Endpoint':<40}{'n':>7}{'req/s':>8}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for etiqueta, m in rep["endpoints"].items():
+        print(f"{etiqueta:<40}{m['n']:>7}{m['rps']:>8.1f}{m['errores']:>6}{m['p50_ms']:>9.1f}"
+              f"{m['p95_ms']:>9.1f}{m['p99_ms']:>9.1f}{m['max_ms']:>9.1f}")
+    for etiqueta, m in rep["endpoints"].items():
+        if m["por_estado"]:
+            print(f"  ✗ {etiqueta}: {m['por_estado']}")
+
+
+def comparar(rep, base, tolerancia):
+    """Imprime las diferencias contra `base` y devuelve True si no hay regresiones."""
+    ok = True
+    print(f"\nComparación contra la base (tolerancia {tolerancia:.0%}):")
+    cambio = (rep["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+    regresion = cambio < -tolerancia
+    ok = ok and not regresion
+    print(f"  {'throughput':<40} {base['rps']:8.1f} → {rep['rps']:8.1f} req/s ({cambio:+.0%}){'  ✗' if regresion else ''}")
+    for etiqueta, antes in base["endpoints"].items():
+        ahora = rep["endpoints"].get(etiqueta)
+        if ahora is None:
+            print(f"  {etiqueta:<40} sin peticiones en esta corrida")
+            continue
+        cambio = (ahora["p95_ms"] - antes["p95_ms"]) / antes["p95_ms"] if antes["p95_ms"] else 0.0
+        regresion = antes["p95_ms"] > 1 and cambio > tolerancia
+        regresion_error = ahora["tasa_error"] > antes["tasa_error"] + 0.01
+        ok = ok and not regresion and not regresion_error
+        marca = "  ✗" if regresion else ""
+        if regresion_error:
+            marca += f"  ✗ errores {antes['tasa_error']:.1%} → {ahora['tasa_error']:.1%}"
+        print(f"  {etiqueta:<40} p95 {antes['p95_ms']:8.1f} → {ahora['p95_ms']:8.1f} ms ({cambio:+.0%}){marca}")
+    return ok
+
+
+def arrancar_api(manifiesto, args, temporal):
+    """Levanta la API sobre una copia de la base sembrada. Devuelve (proceso, url)."""
+    base = os.path.join(temporal, "carga.db")
+    shutil.copyfile(manifiesto["base"], base)
+    entorno = {
+        **os.environ,
+        "DATABASE_PATH": base,
+        "CV_STORAGE_DIR": os.path.join(temporal, "blobs"),
+        "RATE_LIMIT_RULES": "",
+        "SECRET_KEY": os.environ.get("SECRET_KEY") or "carga-secret",
+        "PORT": str(args.puerto),
+        "WEB_CONCURRENCY": str(args.workers),
+    }
+    if args.servidor == "gunicorn":
+        comando = [sys.executable, "-m", "gunicorn", "unrc_api_main:app", "-c", "gunicorn.conf.py",
+                   "--access-logfile", "/dev/null"]
+    else:
+        comando = [sys.executable, "-m", "uvicorn", "unrc_api_main:app", "--port", str(args.puerto),
+                   "--workers", str(args.workers), "--no-access-log"]
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=entorno)
+    url = f"http://127.0.0.1:{args.puerto}"
+    limite = time.monotonic() + 120
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"La API terminó al arrancar (código {proceso.returncode})")
+        try:
+            if httpx.get(url + "/health/ready", timeout=2).status_code == 200:
+                return proceso, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proceso.terminate()
+    raise RuntimeError("La API no respondió /health/ready a tiempo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con los flujos del frontend")
+    parser.add_argument("sembrado", help="Directorio generado por sembrar_carga.py (con manifiesto.json)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API a probar (sin --arrancar)")
+    parser.add_argument("--arrancar", action="store_true", help="Levantar la API sobre una copia de la base sembrada")
+    parser.add_argument("--servidor", choices=("uvicorn", "gunicorn"), default="uvicorn", help="Con --arrancar")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de la API con --arrancar")
+    parser.add_argument("--puerto", type=int, default=8800, help="Puerto de la API con --arrancar")
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duracion", type=float, default=60, help="Segundos medidos")
+    parser.add_argument("--calentamiento", type=float, default=10, help="Segundos iniciales que no se miden")
+    parser.add_argument("--vistas", type=int, default=3, help="Vistas de página por login")
+    parser.add_argument("--prop-empresas", type=float, default=0.25, help="Proporción de sesiones de empresa")
+    parser.add_argument("--prob-cv", type=float, default=0.05, help="Probabilidad de subir CV por vista de estudiante")
+    parser.add_argument("--pausa-ms", type=float, default=0, help="Pausa media entre vistas (0 = carga cerrada)")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="Guardar el reporte en JSON")
+    parser.add_argument("--comparar", help="Reporte JSON base contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="Empeoramiento permitido (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    ruta_manifiesto = os.path.join(args.sembrado, "manifiesto.json")
+    if not os.path.exists(ruta_manifiesto):
+        print(f"✗ No hay {ruta_manifiesto}; ejecuta primero benchmarks/sembrar_carga.py")
+        return 1
+    with open(ruta_manifiesto, encoding="utf-8") as f:
+        manifiesto = json.load(f)
+
+    proceso = None
+    temporal = tempfile.mkdtemp(prefix="carga-") if args.arrancar else None
+    try:
+        url = args.url
+        if args.arrancar:
+            proceso, url = arrancar_api(manifiesto, args, temporal)
+            print(f"✓ API en {url} ({args.servidor}, {args.workers} worker(s))")
+        print(f"Carga: {args.usuarios} usuarios, {args.calentamiento:.0f} s de calentamiento + {args.duracion:.0f} s")
+        rep = asyncio.run(ejecutar_carga(url, manifiesto, args))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    imprimir(rep)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+        print(f"\nReporte guardado en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if not comparar(rep, base, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark y arnés de regresión del parser de CVs.
+
+Mide por etapa (extracción de texto, parseo de secciones y enriquecimiento con
+spaCy) el tiempo de cada CV del corpus sintético, y la precisión por campo
+(carrera, habilidades, proyectos, experiencias) contra `esperado.json`.
+
+Ejecutar desde la raíz del proyecto:
+    python benchmarks/bench_cv_parser.py benchmarks/cvs_sinteticos --generar --salida base.json
+    # ... cambiar el parser ...
+    python benchmarks/bench_cv_parser.py benchmarks/cvs_sinteticos --comparar base.json
+
+Con --comparar el proceso termina con código 1 si alguna etapa es más lenta que
+la base por encima de --tolerancia o si el F1 de algún campo baja más de 0.01.
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.cv_parser import extract_text, simple_parse_sections, enriquecer_con_nlp, get_nlp
+from benchmarks.corpus import generar_corpus
+
+ETAPAS = ("extraccion", "secciones", "nlp")
+CAMPOS_LISTA = ("habilidades", "proyectos", "experiencias")
+
+
+def _norm(valor):
+    return " ".join(str(valor).lower().split())
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+def medir_cv(path, repeticiones, usar_nlp):
+    """Devuelve ({etapa: segundos}, resultado). Se toma el mínimo de las repeticiones."""
+    tiempos = {etapa: [] for etapa in ETAPAS}
+    resultado = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        texto = extract_text(path)
+        t1 = time.perf_counter()
+        resultado = simple_parse_sections(texto, usar_nlp=False)
+        t2 = time.perf_counter()
+        if usar_nlp:
+            resultado = copy.deepcopy(resultado)
+            enriquecer_con_nlp(texto, resultado)
+        t3 = time.perf_counter()
+        tiempos["extraccion"].append(t1 - t0)
+        tiempos["secciones"].append(t2 - t1)
+        tiempos["nlp"].append(t3 - t2)
+    return {etapa: min(v) for etapa, v in tiempos.items()}, resultado
+
+
+def comparar_campos(esperado, obtenido, conteo):
+    """Acumula aciertos por campo en `conteo` (tp/fp/fn para listas, aciertos/total para carrera)."""
+    if esperado["carrera"]:
+        conteo["carrera"]["total"] += 1
+        if obtenido.get("carrera") and _norm(esperado["carrera"]) in _norm(obtenido["carrera"]):
+            conteo["carrera"]["aciertos"] += 1
+    for campo in CAMPOS_LISTA:
+        esp = {_norm(x) for x in esperado[campo]}
+        obt = {_norm(x) for x in obtenido.get(campo) or []}
+        conteo[campo]["tp"] += len(esp & obt)
+        conteo[campo]["fp"] += len(obt - esp)
+        conteo[campo]["fn"] += len(esp - obt)
+
+
+def _nuevo_conteo():
+    conteo = {campo: {"tp": 0, "fp": 0, "fn": 0} for campo in CAMPOS_LISTA}
+    conteo["carrera"] = {"aciertos": 0, "total": 0}
+    return conteo
+
+
+def _metricas(conteo):
+    metricas = {}
+    c = conteo["carrera"]
+    metricas["carrera"] = {"exactitud": c["aciertos"] / c["total"] if c["total"] else None}
+    for campo in CAMPOS_LISTA:
+        tp, fp, fn = conteo[campo]["tp"], conteo[campo]["fp"], conteo[campo]["fn"]
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        metricas[campo] = {"precision": precision, "recall": recall, "f1": f1}
+    return metricas
+
+
+def ejecutar(corpus, repeticiones=3, usar_nlp=True):
+    with open(os.path.join(corpus, "esperado.json"), encoding="utf-8") as f:
+        esperados = json.load(f)
+
+    usar_nlp = usar_nlp and get_nlp() is not None
+    tiempos = {etapa: [] for etapa in ETAPAS}
+    por_grupo = {}
+    conteo_total = _nuevo_conteo()
+
+    for nombre, info in sorted(esperados.items()):
+        t, resultado = medir_cv(os.path.join(corpus, nombre), repeticiones, usar_nlp)
+        for etapa in ETAPAS:
+            tiempos[etapa].append(t[etapa])
+        comparar_campos(info["esperado"], resultado, conteo_total)
+        for grupo in (f"variante={info['variante']}", f"idioma={info['idioma']}", f"largo={info['largo']}"):
+            g = por_grupo.setdefault(grupo, {"n": 0, "tiempo": [], "conteo": _nuevo_conteo()})
+            g["n"] += 1
+            g["tiempo"].append(sum(t.values()))
+            comparar_campos(info["esperado"], resultado, g["conteo"])
+
+    return {
+        "cvs": len(esperados),
+        "nlp": usar_nlp,
+        "etapas": {
+            etapa: {
+                "p50_ms": statistics.median(v) * 1000 if v else 0.0,
+                "p95_ms": _percentil(v, 95) * 1000,
+                "total_ms": sum(v) * 1000,
+            }
+            for etapa, v in tiempos.items()
+        },
+        "campos": _metricas(conteo_total),
+        "grupos": {
+            grupo: {
+                "n": g["n"],
+                "p50_ms": statistics.median(g["tiempo"]) * 1000,
+                "campos": _metricas(g["conteo"]),
+            }
+            for grupo, g in sorted(por_grupo.items())
+        },
+    }
+
+
+def imprimir(reporte):
+    print(f"\nCVs: {reporte['cvs']}  (spaCy: {'sí' if reporte['nlp'] else 'no disponible'})")
+    print(f"\n{'Etapa':<12}{'p50 ms':>10}{'p95 ms':>10}{'total ms':>12}")
+    for etapa, m in reporte["etapas"].items():
+        print(f"{etapa:<12}{m['p50_ms']:>10.2f}{m['p95_ms']:>10.2f}{m['total_ms']:>12.1f}")
+
+    print(f"\n{'Campo':<14}{'precision':>10}{'recall':>10}{'f1':>8}")
+    for campo in CAMPOS_LISTA:
+        m = reporte["campos"][campo]
+        print(f"{campo:<14}{m['precision']:>10.2f}{m['recall']:>10.2f}{m['f1']:>8.2f}")
+    exactitud = reporte["campos"]["carrera"]["exactitud"]
+    print(f"{'carrera':<14}{'exactitud':>10}{(exactitud or 0):>10.2f}")
+
+    print(f"\n{'Grupo':<20}{'n':>4}{'p50 ms':>10}{'f1 hab':>8}{'f1 proy':>9}{'f1 exp':>8}")
+    for grupo, g in reporte["grupos"].items():
+        c = g["campos"]
+        print(f"{grupo:<20}{g['n']:>4}{g['p50_ms']:>10.2f}{c['habilidades']['f1']:>8.2f}"
+              f"{c['proyectos']['f1']:>9.2f}{c['experiencias']['f1']:>8.2f}")
+
+
+def comparar(reporte, base, tolerancia):
+    """Imprime las diferencias contra `base` y devuelve True si no hay regresiones."""
+    ok = True
+    print(f"\nComparación contra la base (tolerancia de tiempo {tolerancia:.0%}):")
+    for etapa in ETAPAS:
+        antes = base["etapas"][etapa]["p50_ms"]
+        ahora = reporte["etapas"][etapa]["p50_ms"]
+        cambio = (ahora - antes) / antes if antes else 0.0
+        regresion = antes > 0.05 and cambio > tolerancia
+        ok = ok and not regresion
+        print(f"  {etapa:<12} p50 {antes:8.2f} → {ahora:8.2f} ms ({cambio:+.0%}){'  ✗' if regresion else ''}")
+    for campo in CAMPOS_LISTA:
+        antes = base["campos"][campo]["f1"]
+        ahora = reporte["campos"][campo]["f1"]
+        regresion = ahora < antes - 0.01
+        ok = ok and not regresion
+        print(f"  {campo:<12} f1  {antes:8.2f} → {ahora:8.2f}{'  ✗' if regresion else ''}")
+    antes = base["campos"]["carrera"]["exactitud"] or 0.0
+    ahora = reporte["campos"]["carrera"]["exactitud"] or 0.0
+    regresion = ahora < antes - 0.01
+    ok = ok and not regresion
+    print(f"  {'carrera':<12} exactitud {antes:.2f} → {ahora:.2f}{'  ✗' if regresion else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de CVs")
+    parser.add_argument("corpus", help="Directorio del corpus (con esperado.json)")
+    parser.add_argument("--generar", action="store_true", help="Generar el corpus si no existe")
+    parser.add_argument("--cantidad", type=int, default=60, help="CVs a generar con --generar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por CV (se toma el mínimo)")
+    parser.add_argument("--sin-nlp", action="store_true", help="No medir la etapa de spaCy")
+    parser.add_argument("--salida", help="Guardar el reporte en JSON")
+    parser.add_argument("--comparar", help="Reporte JSON base contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Regresión de tiempo permitida (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.corpus, "esperado.json")):
+        if not args.generar:
+            print(f"No hay corpus en {args.corpus}; usa --generar")
+            return 1
+        generar_corpus(args.corpus, args.cantidad)
+
+    reporte = ejecutar(args.corpus, args.repeticiones, not args.sin_nlp)
+    imprimir(reporte)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2)
+        print(f"\nReporte guardado en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if not comparar(reporte, base, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
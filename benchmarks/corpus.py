@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Generador de un corpus sintético de CVs (PDF y DOCX) para medir el parser.
+
+Cada CV se genera a partir de datos conocidos, que se guardan en `esperado.json`
+junto a los archivos para poder medir la precisión por campo. El corpus varía:
+- formato: PDF y DOCX
+- idioma de los encabezados: español e inglés
+- longitud: número de experiencias/proyectos y párrafos de relleno
+- secciones presentes (algunas se omiten al azar)
+- PDFs con letras separadas por espacios ("C A R L O S"), que activan la
+  normalización de caracteres separados del extractor
+
+Ejecutar desde la raíz del proyecto:
+    python benchmarks/corpus.py benchmarks/cvs_sinteticos --cantidad 60 --semilla 42
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from docx import Document
+
+CARRERAS = [
+    "Ingeniería en Sistemas Computacionales",
+    "Licenciatura en Ciencia de Datos para Negocios",
+    "Ingeniería en Software",
+    "Licenciatura en Informática",
+    "Ingeniería en Telecomunicaciones",
+]
+
+HABILIDADES = [
+    "Python", "Java", "Javascript", "Sql", "Docker", "Kubernetes", "React", "Django",
+    "Fastapi", "Pandas", "Numpy", "Tensorflow", "Aws", "Azure", "Linux", "Git",
+    "Mongodb", "Postgresql", "Excel", "Tableau", "Scrum", "Flask", "Redis", "Html", "Css",
+]
+
+PROYECTOS = [
+    "Sistema de inventario con Django y PostgreSQL",
+    "Dashboard de ventas en Tableau para una PyME",
+    "Chatbot de atención a alumnos con spaCy",
+    "Aplicación móvil de rutas de transporte",
+    "Modelo de predicción de deserción escolar",
+    "API REST para control de asistencias",
+    "Plataforma de tutorías entre pares",
+]
+
+EXPERIENCIAS = [
+    "Desarrollador backend en Innova Labs durante seis meses",
+    "Analista de datos en DataViz con reportes semanales",
+    "Soporte técnico en la coordinación de sistemas de la UNRC",
+    "Prácticas profesionales en TechCorp como desarrollador web",
+    "Servicio social en el laboratorio de cómputo de la universidad",
+    "Becario de infraestructura cloud en CloudNine",
+]
+
+RELLENO = [
+    "Me considero una persona responsable, con facilidad para aprender y comunicarme",
+    "Busco una oportunidad para aplicar mis conocimientos y seguir creciendo",
+    "Participé en hackatones universitarios y en grupos de estudio",
+    "Disponibilidad de horario y disposición para trabajar de forma remota",
+]
+
+ENCABEZADOS = {
+    "es": {"educacion": "EDUCACIÓN", "habilidades": "HABILIDADES", "proyectos": "PROYECTOS",
+           "experiencia": "EXPERIENCIA LABORAL", "perfil": "SOBRE MÍ"},
+    "en": {"educacion": "EDUCATION", "habilidades": "SKILLS", "proyectos": "PROJECTS",
+           "experiencia": "WORK EXPERIENCE", "perfil": "ABOUT ME"},
+}
+
+
+def generar_cv(rng, idioma, largo):
+    """Devuelve (lineas, esperado) para un CV sintético."""
+    enc = ENCABEZADOS[idioma]
+    n = {"corto": 1, "medio": 3, "largo": 6}[largo]
+    carrera = rng.choice(CARRERAS)
+    habilidades = rng.sample(HABILIDADES, k=min(3 + n, len(HABILIDADES)))
+    proyectos = rng.sample(PROYECTOS, k=min(n, len(PROYECTOS)))
+    experiencias = rng.sample(EXPERIENCIAS, k=min(n, len(EXPERIENCIAS)))
+    secciones = ["educacion", "habilidades", "proyectos", "experiencia"]
+    # Omitir al azar alguna sección (excepto en CVs cortos, que ya tienen poco contenido)
+    if largo != "corto" and rng.random() < 0.3:
+        secciones.remove(rng.choice(secciones))
+
+    lineas = [f"{rng.choice(['Carlos', 'Andrea', 'María', 'Luis'])} {rng.choice(['López', 'Hernández', 'García'])}",
+              "correo@ejemplo.com | 55 1234 5678", enc["perfil"]]
+    lineas.extend(rng.sample(RELLENO, k=min(n, len(RELLENO))))
+
+    esperado = {"carrera": None, "habilidades": [], "proyectos": [], "experiencias": []}
+    for seccion in secciones:
+        lineas.append(enc[seccion])
+        if seccion == "educacion":
+            lineas.append(carrera)
+            esperado["carrera"] = carrera
+        elif seccion == "habilidades":
+            lineas.append(", ".join(habilidades))
+            esperado["habilidades"] = habilidades
+        elif seccion == "proyectos":
+            lineas.extend(proyectos)
+            esperado["proyectos"] = proyectos
+        elif seccion == "experiencia":
+            lineas.extend(experiencias)
+            esperado["experiencias"] = experiencias
+        if largo == "largo":
+            lineas.extend(rng.sample(RELLENO, k=2))
+    return lineas, esperado
+
+
+# --- Escritura de PDF mínima (sin dependencias extra) ---
+
+def _escapar_pdf(texto):
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def escribir_pdf(path, lineas, separar_letras=False, lineas_por_pagina=50):
+    """Escribe un PDF de texto con Helvetica (WinAnsiEncoding), varias páginas si hace falta."""
+    if separar_letras:
+        lineas = [" ".join(linea) for linea in lineas]
+    paginas = [lineas[i:i + lineas_por_pagina] for i in range(0, len(lineas), lineas_por_pagina)] or [[]]
+
+    objetos = []  # contenido de cada objeto, el número es índice + 1
+    objetos.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objetos.append(None)  # /Pages, se completa al final
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    kids = []
+    for pagina in paginas:
+        comandos = ["BT", "/F1 10 Tf", "14 TL", "50 800 Td"]
+        for linea in pagina:
+            comandos.append(f"({_escapar_pdf(linea)}) Tj T*")
+        comandos.append("ET")
+        stream = "\n".join(comandos).encode("cp1252", errors="replace")
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        contenido_id = len(objetos)
+        objetos.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {contenido_id} 0 R >>").encode())
+        kids.append(len(objetos))
+    objetos[1] = ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids), len(kids))).encode()
+
+    salida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objetos, start=1):
+        offsets.append(len(salida))
+        salida += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for off in offsets:
+        salida += b"%010d 00000 n \n" % off
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(salida)
+
+
+def escribir_docx(path, lineas):
+    doc = Document()
+    for linea in lineas:
+        doc.add_paragraph(linea)
+    doc.save(path)
+
+
+def generar_corpus(destino, cantidad=60, semilla=42):
+    """Genera `cantidad` CVs en `destino` y escribe `esperado.json`. Devuelve el dict esperado."""
+    rng = random.Random(semilla)
+    os.makedirs(destino, exist_ok=True)
+    esperados = {}
+    for i in range(cantidad):
+        idioma = rng.choice(["es", "es", "en"])
+        largo = rng.choice(["corto", "medio", "largo"])
+        formato = rng.choice(["pdf", "pdf", "docx"])
+        separar = formato == "pdf" and rng.random() < 0.25
+        lineas, esperado = generar_cv(rng, idioma, largo)
+
+        variante = "espaciado" if separar else formato
+        nombre = f"cv_{i:04d}_{idioma}_{largo}_{variante}.{formato}"
+        path = os.path.join(destino, nombre)
+        if formato == "pdf":
+            escribir_pdf(path, lineas, separar_letras=separar)
+        else:
+            escribir_docx(path, lineas)
+        esperados[nombre] = {
+            "idioma": idioma, "largo": largo, "variante": variante, "esperado": esperado,
+        }
+
+    with open(os.path.join(destino, "esperado.json"), "w", encoding="utf-8") as f:
+        json.dump(esperados, f, ensure_ascii=False, indent=2)
+    return esperados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de CVs")
+    parser.add_argument("destino", help="Directorio donde escribir el corpus")
+    parser.add_argument("--cantidad", type=int, default=60)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    esperados = generar_corpus(args.destino, args.cantidad, args.semilla)
+    print(f"✓ {len(esperados)} CVs generados en {args.destino}")
+
+
+if __name__ == "__main__":
+    main()
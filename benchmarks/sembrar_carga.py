@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Siembra una base SQLite aparte para las pruebas de carga (benchmarks/bench_carga.py).
+
+Crea estudiantes (con experiencias), empresas y oportunidades a partir de una semilla,
+todos con la misma contraseña, y deja en el directorio de salida:
+- carga.db: la base (se usa con DATABASE_PATH; la de db/ no se toca)
+- manifiesto.json: credenciales y cantidades, lo que lee el generador de carga
+- cvs/: algunos CVs sintéticos (ver benchmarks/corpus.py) para el flujo de subida
+
+Ejecutar desde la raíz del proyecto:
+    python benchmarks/sembrar_carga.py benchmarks/carga --estudiantes 500 --empresas 25 --oportunidades 150
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.corpus import CARRERAS, EXPERIENCIAS, HABILIDADES, PROYECTOS, generar_corpus
+
+PASSWORD = "carga12345"
+
+BLANDAS = ["Comunicación", "Trabajo en equipo", "Liderazgo", "Resolución de problemas",
+           "Creatividad", "Adaptabilidad", "Organización", "Pensamiento crítico"]
+TIPOS = ["practica", "servicio_social", "empleo"]
+MODALIDADES = ["presencial", "remoto", "hibrido"]
+UBICACIONES = ["CDMX", "Estado de México", "Remoto", "Guadalajara", "Monterrey"]
+
+
+def sembrar(destino, estudiantes, empresas, oportunidades, cvs, semilla):
+    """Crea la base y el manifiesto en `destino`. Devuelve el manifiesto."""
+    os.makedirs(destino, exist_ok=True)
+    ruta_db = os.path.abspath(os.path.join(destino, "carga.db"))
+    if os.path.exists(ruta_db):
+        os.remove(ruta_db)
+    # db.database crea el esquema al importarse sobre DATABASE_PATH
+    os.environ["DATABASE_PATH"] = ruta_db
+    from db.database import (
+        SessionLocal, User as DBUser, Empresa as DBEmpresa, Estudiante as DBEstudiante,
+        Experiencia as DBExperiencia, Habilidad as DBHabilidad, Oportunidad as DBOportunidad,
+    )
+    from security.core import hash_password
+    from schemas.models import UserRole
+
+    rng = random.Random(semilla)
+    # Un solo hash para todos: Argon2 es deliberadamente lento
+    hashed = hash_password(PASSWORD)
+    db = SessionLocal()
+    try:
+        habilidades = {nombre: DBHabilidad(nombre=nombre) for nombre in HABILIDADES}
+        db.add_all(habilidades.values())
+
+        correos_estudiantes = []
+        for i in range(estudiantes):
+            email = f"estudiante{i}@carga.test"
+            usuario = DBUser(email=email, nombre=f"Estudiante{i}", apellido="Carga",
+                             tipo=UserRole.estudiante, hashed_password=hashed, activo=True)
+            tecnicas = rng.sample(HABILIDADES, k=rng.randint(3, 8))
+            estudiante = DBEstudiante(
+                usuario=usuario,
+                matricula=f"CARGA{i:06d}",
+                semestre=rng.randint(1, 10),
+                carrera=rng.choice(CARRERAS),
+                gpa=round(rng.uniform(6.0, 10.0), 2),
+                habilidades_tecnicas=tecnicas,
+                habilidades_blandas=rng.sample(BLANDAS, k=2),
+                proyectos_lista=rng.sample(PROYECTOS, k=rng.randint(0, 3)),
+                disponibilidad=rng.random() < 0.8,
+            )
+            estudiante.habilidades = [habilidades[h] for h in tecnicas[:3]]
+            estudiante.experiencias = [
+                DBExperiencia(puesto=descripcion.split(" en ")[0], empresa="Empresa de prueba",
+                              descripcion=descripcion, fecha_inicio="2023-01", fecha_fin=None)
+                for descripcion in rng.sample(EXPERIENCIAS, k=rng.randint(0, 2))
+            ]
+            db.add(estudiante)
+            correos_estudiantes.append(email)
+
+        correos_empresas = []
+        perfiles_empresa = []
+        for i in range(empresas):
+            email = f"empresa{i}@carga.test"
+            usuario = DBUser(email=email, nombre=f"Empresa{i}", apellido="Carga",
+                             tipo=UserRole.empresa, hashed_password=hashed, activo=True)
+            empresa = DBEmpresa(usuario=usuario, nombre=f"Empresa de carga {i}",
+                                descripcion="Empresa sembrada para pruebas de carga",
+                                ubicacion=rng.choice(UBICACIONES))
+            db.add(empresa)
+            perfiles_empresa.append(empresa)
+            correos_empresas.append(email)
+        db.flush()
+
+        for i in range(oportunidades):
+            db.add(DBOportunidad(
+                empresa_id=perfiles_empresa[i % len(perfiles_empresa)].id,
+                titulo=f"Vacante de prueba {i}",
+                descripcion="Oportunidad sembrada para pruebas de carga. " * rng.randint(1, 4),
+                tipo=rng.choice(TIPOS),
+                habilidades_requeridas=rng.sample(HABILIDADES, k=rng.randint(2, 6)),
+                semestre_minimo=rng.randint(1, 8),
+                gpa_minimo=rng.choice([None, 7.0, 8.0]),
+                ubicacion=rng.choice(UBICACIONES),
+                modalidad=rng.choice(MODALIDADES),
+                duracion_meses=rng.choice([None, 3, 6, 12]),
+                activa=rng.random() < 0.9,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+    dir_cvs = os.path.join(destino, "cvs")
+    generados = generar_corpus(dir_cvs, cvs, semilla) if cvs else {}
+
+    manifiesto = {
+        "semilla": semilla,
+        "base": ruta_db,
+        "password": PASSWORD,
+        "estudiantes": correos_estudiantes,
+        "empresas": correos_empresas,
+        "oportunidades": oportunidades,
+        "cvs": [os.path.abspath(os.path.join(dir_cvs, nombre)) for nombre in sorted(generados)],
+    }
+    with open(os.path.join(destino, "manifiesto.json"), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Siembra la base de datos de las pruebas de carga")
+    parser.add_argument("destino", help="Directorio de salida (carga.db, manifiesto.json, cvs/)")
+    parser.add_argument("--estudiantes", type=int, default=500)
+    parser.add_argument("--empresas", type=int, default=25)
+    parser.add_argument("--oportunidades", type=int, default=150)
+    parser.add_argument("--cvs", type=int, default=10, help="CVs sintéticos para el flujo de subida")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    if args.empresas < 1 or args.estudiantes < 1:
+        print("✗ Se necesita al menos un estudiante y una empresa")
+        return 1
+    manifiesto = sembrar(args.destino, args.estudiantes, args.empresas, args.oportunidades, args.cvs, args.semilla)
+    print(f"✓ Base sembrada en {manifiesto['base']}: {len(manifiesto['estudiantes'])} estudiantes, "
+          f"{len(manifiesto['empresas'])} empresas, {manifiesto['oportunidades']} oportunidades, "
+          f"{len(manifiesto['cvs'])} CVs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
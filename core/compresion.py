@@ -0,0 +1,173 @@
+"""
+Compresión de respuestas HTTP (gzip y, si está instalado el paquete `brotli`, br).
+
+Middleware ASGI puro: elige la codificación según `Accept-Encoding` y comprime solo las
+respuestas cuyo `Content-Type` esté en `COMPRESSION_CONTENT_TYPES` y que midan al menos
+`COMPRESSION_MIN_SIZE` bytes. No toca respuestas ya codificadas, parciales (206), sin
+cuerpo (204/304), con `Cache-Control: no-transform` ni las enviadas como archivo
+(`http.response.pathsend`/`zerocopysend`), así que las descargas de CV pasan intactas.
+
+Al comprimir se añade `Vary: Accept-Encoding` y el ETag pasa a débil: la representación
+comprimida no es idéntica byte a byte, pero sigue sirviendo para revalidar (304).
+"""
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from core.config import (
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_CONTENT_TYPES, COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE,
+)
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+
+def _preferencias(accept_encoding: str) -> Dict[str, float]:
+    """`gzip, br;q=0.8, *;q=0` -> {"gzip": 1.0, "br": 0.8, "*": 0.0}"""
+    preferencias = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if not nombre:
+            continue
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        preferencias[nombre.strip()] = q
+    return preferencias
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """Codificación a usar ("br", "gzip") o None si el cliente no acepta ninguna."""
+    preferencias = _preferencias(accept_encoding)
+    comodin = preferencias.get("*", 0.0)
+    q_gzip = preferencias.get("gzip", comodin)
+    q_br = preferencias.get("br", comodin)
+    if brotli is not None and q_br > 0 and q_br >= q_gzip:
+        return "br"
+    if q_gzip > 0:
+        return "gzip"
+    return None
+
+
+class _Compresor:
+    def __init__(self, codificacion: str, nivel: int, calidad_brotli: int):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._br = brotli.Compressor(quality=calidad_brotli)
+        else:
+            # wbits = 16 + MAX_WBITS produce el formato gzip (cabecera + CRC)
+            self._zlib = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        if self.codificacion == "br":
+            salida = self._br.process(datos)
+            return salida + (self._br.finish() if final else self._br.flush())
+        salida = self._zlib.compress(datos)
+        return salida + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión con umbral de tamaño y lista de tipos permitidos."""
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE, nivel: int = COMPRESSION_LEVEL,
+                 calidad_brotli: int = COMPRESSION_BROTLI_QUALITY, tipos: str = COMPRESSION_CONTENT_TYPES):
+        self.app = app
+        self.min_size = min_size
+        self.nivel = nivel
+        self.calidad_brotli = calidad_brotli
+        self.tipos: Tuple[str, ...] = tuple(t.strip().lower() for t in tipos.split(",") if t.strip())
+
+    def _tipo_comprimible(self, cabeceras: MutableHeaders) -> bool:
+        tipo = cabeceras.get("content-type", "").split(";")[0].strip().lower()
+        return tipo in self.tipos
+
+    @staticmethod
+    def _se_puede_comprimir(mensaje, cabeceras: MutableHeaders) -> bool:
+        return (
+            mensaje["status"] not in (204, 206, 304)
+            and "content-encoding" not in cabeceras
+            and "content-range" not in cabeceras
+            and "no-transform" not in cabeceras.get("cache-control", "").lower()
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for clave, valor in scope.get("headers", []):
+            if clave == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+        codificacion = elegir_codificacion(accept_encoding)
+
+        inicio = None          # mensaje http.response.start retenido hasta ver el cuerpo
+        compresor: Optional[_Compresor] = None
+        pasar = False          # la respuesta se envía sin modificar
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor, pasar
+            tipo = mensaje["type"]
+            if tipo == "http.response.start":
+                cabeceras = MutableHeaders(raw=list(mensaje["headers"]))
+                if self._tipo_comprimible(cabeceras):
+                    # La representación depende de Accept-Encoding aunque esta vez no se comprima
+                    cabeceras.add_vary_header("Accept-Encoding")
+                    mensaje["headers"] = cabeceras.raw
+                    if codificacion and self._se_puede_comprimir(mensaje, cabeceras):
+                        inicio = mensaje
+                        return
+                pasar = True
+                await send(mensaje)
+                return
+
+            if pasar:
+                await send(mensaje)
+                return
+            if tipo != "http.response.body":
+                # pathsend/zerocopysend u otras extensiones: se envía el archivo tal cual
+                pasar = True
+                await send(inicio)
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas_cuerpo = mensaje.get("more_body", False)
+            if compresor is None:
+                if not mas_cuerpo and len(cuerpo) < self.min_size:
+                    pasar = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+                compresor = _Compresor(codificacion, self.nivel, self.calidad_brotli)
+                cabeceras = MutableHeaders(raw=inicio["headers"])
+                cabeceras["content-encoding"] = codificacion
+                etag = cabeceras.get("etag")
+                if etag and not etag.startswith("W/"):
+                    cabeceras["etag"] = "W/" + (etag if etag.startswith('"') else f'"{etag}"')
+                if mas_cuerpo:
+                    # Respuesta en streaming: el tamaño final no se conoce
+                    del cabeceras["content-length"]
+                    await send(inicio)
+                else:
+                    comprimido = compresor.comprimir(cuerpo, final=True)
+                    cabeceras["content-length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+
+            await send({
+                "type": "http.response.body",
+                "body": compresor.comprimir(cuerpo, final=not mas_cuerpo),
+                "more_body": mas_cuerpo,
+            })
+
+        await self.app(scope, receive, enviar)
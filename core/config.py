@@ -13,4 +13,146 @@ load_dotenv()
 # Esto es útil para que la aplicación pueda funcionar en desarrollo sin un archivo .env configurado.
 SECRET_KEY: str = os.getenv("SECRET_KEY")
 ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+
+# --- Base de datos ---
+# Archivo SQLite de la aplicación. Se puede apuntar a otra copia, p. ej. la base sembrada
+# para las pruebas de carga (benchmarks/sembrar_carga.py).
+DATABASE_PATH: str = os.getenv("DATABASE_PATH", "./db/database.db")
+
+# --- Límites de extracción de texto de CVs en PDF ---
+# Evitan que un PDF enorme o malformado bloquee un worker del parser.
+CV_PDF_MAX_PAGES: int = int(os.getenv("CV_PDF_MAX_PAGES", 20))
+CV_PDF_MAX_CHARS: int = int(os.getenv("CV_PDF_MAX_CHARS", 100_000))
+CV_PDF_TIME_BUDGET_SECONDS: float = float(os.getenv("CV_PDF_TIME_BUDGET_SECONDS", 10))
+
+# --- Modelos de NLP/ML ---
+# El modelo spaCy se instala en el build (`python -m spacy download es_core_news_sm`)
+# y se carga la primera vez que se usa: un worker que no parsea CVs ni recomienda no
+# paga su memoria. Con WARMUP_MODELS=true cada proceso lo precarga en segundo plano al
+# arrancar (una copia por worker) y `/health/ready` responde 503 hasta que termina; con
+# gunicorn es preferible GUNICORN_PRELOAD_MODELS, que carga una copia compartida.
+SPACY_MODEL: str = os.getenv("SPACY_MODEL", "es_core_news_sm")
+WARMUP_MODELS: bool = os.getenv("WARMUP_MODELS", "false").lower() in ("1", "true", "yes")
+
+# --- Almacenamiento de CVs ---
+# Backend `local` (directorio compartido) o `s3` (cualquier servicio compatible con S3,
+# p. ej. MinIO en desarrollo usando CV_STORAGE_S3_ENDPOINT_URL=http://localhost:9000).
+CV_STORAGE_BACKEND: str = os.getenv("CV_STORAGE_BACKEND", "local").lower()
+CV_STORAGE_DIR: str = os.getenv("CV_STORAGE_DIR", "uploaded_cvs/blobs")
+CV_STORAGE_COMPRESS: bool = os.getenv("CV_STORAGE_COMPRESS", "false").lower() in ("1", "true", "yes")
+CV_STORAGE_S3_BUCKET: str = os.getenv("CV_STORAGE_S3_BUCKET", "")
+CV_STORAGE_S3_PREFIX: str = os.getenv("CV_STORAGE_S3_PREFIX", "cvs/")
+CV_STORAGE_S3_ENDPOINT_URL: str = os.getenv("CV_STORAGE_S3_ENDPOINT_URL", "")
+# Cache-Control de las descargas de CV: por defecto cada vista revalida con la ETag
+# (respuesta 304 sin cuerpo si no cambió) y ningún caché compartido guarda el archivo.
+CV_DOWNLOAD_CACHE_CONTROL: str = os.getenv("CV_DOWNLOAD_CACHE_CONTROL", "private, no-cache")
+
+# --- Caché de usuarios autenticados ---
+# Principal resuelto (id, rol, ids de perfil, activo) por `sub` del token. Cada proceso
+# tiene su propia caché: un cambio hecho en otro worker tarda como máximo el TTL en verse.
+AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 30))
+AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 10_000))
+# Con AUTH_STATELESS_TOKENS=true el token incluye id, rol e ids de perfil del usuario
+# y los endpoints que solo necesitan identidad no consultan la base de datos. Un cambio
+# de rol o una desactivación revoca los tokens emitidos antes.
+AUTH_STATELESS_TOKENS: bool = os.getenv("AUTH_STATELESS_TOKENS", "false").lower() in ("1", "true", "yes")
+# Las revocaciones (logout, cambio de rol, desactivación) se guardan en la base de datos;
+# cada proceso relee la lista cada N segundos, así que una revocación hecha en otro
+# worker tarda como máximo ese tiempo en aplicarse.
+AUTH_REVOCATION_TTL_SECONDS: float = float(os.getenv("AUTH_REVOCATION_TTL_SECONDS", 5))
+
+# --- Hashing de contraseñas (Argon2) ---
+# Coste de Argon2id; si se cambia, los hashes existentes se actualizan en el siguiente login.
+ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", 65536))  # KiB
+ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", 4))
+# Pool de hilos dedicado al hashing (por defecto un hilo por núcleo) y máximo de
+# operaciones en cola: por encima se responde 503 en lugar de acumular esperas.
+PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+# --- Límite de peticiones (token buckets en memoria, ver security/rate_limit.py) ---
+# Formato: `MÉTODO RUTA=CAPACIDAD/SEGUNDOS[:ip|usuario]` separadas por `;` (ruta = regex).
+# RATE_LIMIT_RULES vacío desactiva el límite.
+RATE_LIMIT_RULES: str = os.getenv(
+    "RATE_LIMIT_RULES",
+    "POST /auth/login=10/60:ip;"
+    "POST /auth/register=5/60:ip;"
+    "POST /estudiantes/[^/]+/upload_cv=5/60:usuario",
+)
+RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 50_000))
+# Usar X-Forwarded-For como IP del cliente (solo detrás de un proxy de confianza)
+RATE_LIMIT_TRUST_PROXY: bool = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+
+# --- Refresh tokens ---
+# Permiten renovar el token de acceso sin volver a verificar la contraseña (rotación en cada uso).
+REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+
+# --- Caché HTTP de catálogos (/oportunidades/, /empresas/, /habilidades/) ---
+# Segundos que un worker reutiliza la versión de una tabla sin consultarla: los cambios
+# hechos en otro worker tardan como máximo esto en invalidar su caché.
+CATALOG_VERSION_TTL_SECONDS: float = float(os.getenv("CATALOG_VERSION_TTL_SECONDS", 2))
+CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 256))
+CATALOG_CACHE_CONTROL: str = os.getenv("CATALOG_CACHE_CONTROL", "public, no-cache")
+
+# --- Compresión de respuestas (gzip / brotli, ver core/compresion.py) ---
+# Solo se comprimen respuestas de al menos COMPRESSION_MIN_SIZE bytes cuyo Content-Type
+# esté en la lista; los CVs (PDF/DOCX) y las respuestas parciales nunca se comprimen.
+COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", 6))  # gzip: 1-9
+COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))  # brotli: 0-11 (requiere `brotli`)
+COMPRESSION_CONTENT_TYPES: str = os.getenv(
+    "COMPRESSION_CONTENT_TYPES",
+    "application/json,text/html,text/plain,text/css,application/javascript,image/svg+xml",
+)
+
+# --- Métricas (GET /metrics en formato Prometheus, ver core/metricas.py) ---
+METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Si se define, /metrics exige `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+# --- Perfilado por muestreo (ver core/perfilado.py) ---
+# Un administrador puede perfilar una petición enviando `X-Profile: 1` (o `?_profile=1`);
+# el perfil se guarda en PROFILING_DIR en formato "folded" (flamegraph.pl / speedscope).
+PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() in ("1", "true", "yes")
+PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", 2))
+PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", 100))
+# Muestreo continuo de todo el proceso a baja frecuencia, volcado a un archivo por ventana
+PROFILING_CONTINUOUS: bool = os.getenv("PROFILING_CONTINUOUS", "false").lower() in ("1", "true", "yes")
+PROFILING_CONTINUOUS_HZ: float = float(os.getenv("PROFILING_CONTINUOUS_HZ", 10))
+PROFILING_CONTINUOUS_WINDOW_SECONDS: float = float(os.getenv("PROFILING_CONTINUOUS_WINDOW_SECONDS", 300))
+
+# --- Eventos en tiempo real (SSE, GET /oportunidades/stream) ---
+# Puntuación mínima (0-100) para avisar a un estudiante de una oportunidad nueva o editada
+SSE_SCORE_MINIMO: float = float(os.getenv("SSE_SCORE_MINIMO", 60))
+SSE_KEEPALIVE_SECONDS: float = float(os.getenv("SSE_KEEPALIVE_SECONDS", 20))
+SSE_MAX_CONEXIONES: int = int(os.getenv("SSE_MAX_CONEXIONES", 1000))
+SSE_MAX_CONEXIONES_POR_ESTUDIANTE: int = int(os.getenv("SSE_MAX_CONEXIONES_POR_ESTUDIANTE", 3))
+# EventSource no envía Authorization: el cliente pide un ticket de un solo uso
+# (POST /oportunidades/stream/ticket) y lo pasa como ?ticket=, que vale estos segundos
+SSE_TICKET_TTL_SECONDS: float = float(os.getenv("SSE_TICKET_TTL_SECONDS", 30))
+
+# --- Tareas de mantenimiento programadas (ver services/mantenimiento.py) ---
+# En proceso: cada proceso de la API arranca el planificador, pero un candado de archivo
+# hace que solo uno ejecute las tareas. Con MAINTENANCE_IN_PROCESS=false se usa en su
+# lugar el worker aparte `python scripts/mantenimiento.py`.
+MAINTENANCE_IN_PROCESS: bool = os.getenv("MAINTENANCE_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+MAINTENANCE_LOCK_FILE: str = os.getenv("MAINTENANCE_LOCK_FILE", "db/mantenimiento.lock")
+# Espera antes de la primera ronda en la API, para no competir con las primeras peticiones
+MAINTENANCE_INITIAL_DELAY_SECONDS: float = float(os.getenv("MAINTENANCE_INITIAL_DELAY_SECONDS", 60))
+# Intervalos en segundos (0 desactiva la tarea)
+MAINTENANCE_CLOSE_EXPIRED_SECONDS: float = float(os.getenv("MAINTENANCE_CLOSE_EXPIRED_SECONDS", 300))
+MAINTENANCE_SKILL_STATS_SECONDS: float = float(os.getenv("MAINTENANCE_SKILL_STATS_SECONDS", 900))
+MAINTENANCE_PURGE_TOKENS_SECONDS: float = float(os.getenv("MAINTENANCE_PURGE_TOKENS_SECONDS", 3600))
+MAINTENANCE_OPTIMIZE_DB_SECONDS: float = float(os.getenv("MAINTENANCE_OPTIMIZE_DB_SECONDS", 86400))
+# VACUUM reescribe el archivo completo y bloquea las escrituras mientras dura
+MAINTENANCE_VACUUM: bool = os.getenv("MAINTENANCE_VACUUM", "false").lower() in ("1", "true", "yes")
+
+# --- Re-parseo de CVs (POST /estudiantes/admin/reparse, scripts/reparse_cvs.py) ---
+# Un candado de archivo hace que solo corra un re-parseo entre todos los procesos; el
+# progreso se publica junto a él (mismo nombre con extensión .json) para que cualquier
+# worker pueda responder GET /estudiantes/admin/reparse.
+REPARSE_LOCK_FILE: str = os.getenv("REPARSE_LOCK_FILE", "db/reparseo.lock")
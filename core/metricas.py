@@ -0,0 +1,277 @@
+"""
+Métricas de ejecución en formato de texto de Prometheus (expuestas en GET /metrics).
+
+Los contadores e histogramas están fragmentados por hilo: cada hilo escribe en su propio
+diccionario (sin locks en el camino caliente, el GIL basta porque nadie más escribe en
+él) y los fragmentos se suman solo al exponer. Los fragmentos de hilos que ya terminaron
+se acumulan en uno base para no crecer sin límite con los hilos del threadpool.
+
+Los medidores (gauges) se calculan al exponer llamando a una función, así que no tienen
+coste mientras nadie consulta /metrics.
+
+Las métricas son por proceso: con varios workers, Prometheus debe consultar cada uno
+(o agregarlas por instancia).
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Límites (en segundos) por defecto de los histogramas de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Para operaciones muy rápidas (consultas a la base de datos)
+BUCKETS_RAPIDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class _Fragmentos:
+    """Un diccionario por hilo; `combinar` los suma para exponer."""
+
+    def __init__(self, sumar: Callable[[dict, dict], None]):
+        self._sumar = sumar
+        self._local = threading.local()
+        self._vivos: List[Tuple[threading.Thread, dict]] = []
+        self._base: dict = {}
+        self._lock = threading.Lock()
+
+    def propio(self) -> dict:
+        try:
+            return self._local.datos
+        except AttributeError:
+            datos = {}
+            self._local.datos = datos
+            with self._lock:
+                self._vivos.append((threading.current_thread(), datos))
+            return datos
+
+    def combinar(self) -> dict:
+        with self._lock:
+            vivos = []
+            for hilo, datos in self._vivos:
+                if hilo.is_alive():
+                    vivos.append((hilo, datos))
+                else:
+                    self._sumar(self._base, datos)
+            self._vivos = vivos
+            total: dict = {}
+            self._sumar(total, self._base)
+            for _, datos in vivos:
+                self._sumar(total, datos.copy())
+        return total
+
+
+def _sumar_valores(destino: dict, origen: dict) -> None:
+    for clave, valor in origen.items():
+        destino[clave] = destino.get(clave, 0.0) + valor
+
+
+def _sumar_listas(destino: dict, origen: dict) -> None:
+    for clave, valores in origen.items():
+        valores = list(valores)
+        actual = destino.get(clave)
+        if actual is None:
+            destino[clave] = valores
+        else:
+            for i, v in enumerate(valores):
+                actual[i] += v
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres: Sequence[str], valores: Sequence, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self._fragmentos = _Fragmentos(_sumar_valores)
+
+    def inc(self, *valores_etiquetas, valor: float = 1.0) -> None:
+        datos = self._fragmentos.propio()
+        datos[valores_etiquetas] = datos.get(valores_etiquetas, 0.0) + valor
+
+    def valores(self) -> dict:
+        return self._fragmentos.combinar()
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for clave, valor in sorted(self.valores().items()):
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}")
+        return lineas
+
+
+class Histograma:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_LATENCIA):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        self._fragmentos = _Fragmentos(_sumar_listas)
+
+    def observar(self, valor: float, *valores_etiquetas) -> None:
+        datos = self._fragmentos.propio()
+        cuentas = datos.get(valores_etiquetas)
+        if cuentas is None:
+            # [cuenta por bucket..., cuenta +Inf, suma, total]
+            cuentas = datos[valores_etiquetas] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        cuentas[bisect_left(self.buckets, valor)] += 1
+        cuentas[-2] += valor
+        cuentas[-1] += 1
+
+    def medir(self, *valores_etiquetas) -> "_Cronometro":
+        """`with histograma.medir("etiqueta"):` observa la duración del bloque."""
+        return _Cronometro(self, valores_etiquetas)
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for clave, cuentas in sorted(self._fragmentos.combinar().items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + (float("inf"),), cuentas):
+                acumulado += cuenta
+                le = f'le="{_formatear_numero(limite)}"'
+                lineas.append(f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {_formatear_numero(cuentas[-2])}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {cuentas[-1]}")
+        return lineas
+
+
+class _Cronometro:
+    __slots__ = ("_histograma", "_etiquetas", "_inicio")
+
+    def __init__(self, histograma: Histograma, etiquetas: tuple):
+        self._histograma, self._etiquetas = histograma, etiquetas
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histograma.observar(time.perf_counter() - self._inicio, *self._etiquetas)
+        return False
+
+
+class Medidor:
+    """Gauge calculado al exponer: `funcion` devuelve un número o {valores_etiquetas: número}."""
+
+    def __init__(self, nombre: str, ayuda: str, funcion: Callable[[], Union[float, Dict[tuple, float]]],
+                 etiquetas: Sequence[str] = ()):
+        self.nombre, self.ayuda, self.funcion, self.etiquetas = nombre, ayuda, funcion, tuple(etiquetas)
+
+    def exponer(self) -> List[str]:
+        try:
+            valor = self.funcion()
+        except Exception:
+            # Un medidor que falla (p. ej. fuera del event loop) no rompe el resto
+            return []
+        valores = valor if isinstance(valor, dict) else {(): valor}
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} gauge"]
+        for clave, v in sorted(valores.items()):
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(v)}")
+        return lineas
+
+
+_metricas: Dict[str, Union[Contador, Histograma, Medidor]] = {}
+_registro_lock = threading.Lock()
+
+
+def _registrar(metrica):
+    with _registro_lock:
+        # Registrar dos veces el mismo nombre (p. ej. al recargar un módulo) devuelve la existente
+        existente = _metricas.get(metrica.nombre)
+        if existente is not None and type(existente) is type(metrica) and not isinstance(metrica, Medidor):
+            return existente
+        _metricas[metrica.nombre] = metrica
+        return metrica
+
+
+def contador(nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+    return _registrar(Contador(nombre, ayuda, etiquetas))
+
+
+def histograma(nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+               buckets: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+    return _registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+
+def medidor(nombre: str, ayuda: str, funcion: Callable, etiquetas: Sequence[str] = ()) -> Medidor:
+    return _registrar(Medidor(nombre, ayuda, funcion, etiquetas))
+
+
+def exponer() -> str:
+    """Todas las métricas registradas en formato de texto de Prometheus (0.0.4)."""
+    with _registro_lock:
+        metricas = list(_metricas.values())
+    lineas: List[str] = []
+    for metrica in metricas:
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+# --- Métricas HTTP ---
+
+peticiones_total = contador(
+    "http_requests_total", "Peticiones HTTP atendidas", ("metodo", "ruta", "estado"))
+duracion_peticiones = histograma(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP", ("metodo", "ruta", "estado"))
+_peticiones_iniciadas = Contador("_http_iniciadas", "")
+_peticiones_terminadas = Contador("_http_terminadas", "")
+medidor(
+    "http_requests_in_flight", "Peticiones HTTP en curso",
+    lambda: _peticiones_iniciadas.valores().get((), 0.0) - _peticiones_terminadas.valores().get((), 0.0),
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que cuenta y cronometra cada petición. La ruta se reporta como la
+    plantilla del endpoint (`/estudiantes/{estudiante_id}`), no la URL, para que el
+    número de series no dependa de los IDs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rutas: Optional[Dict] = None
+
+    def _plantilla(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "sin_ruta"
+        if self._rutas is None:
+            app = scope.get("app")
+            self._rutas = {
+                getattr(r, "endpoint", None): r.path for r in getattr(app, "routes", []) if hasattr(r, "path")
+            }
+        return self._rutas.get(endpoint, "otra")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        estado = [500]
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado[0] = mensaje["status"]
+            await send(mensaje)
+
+        _peticiones_iniciadas.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            _peticiones_terminadas.inc()
+            etiquetas = (scope["method"], self._plantilla(scope), str(estado[0]))
+            peticiones_total.inc(*etiquetas)
+            duracion_peticiones.observar(duracion, *etiquetas)
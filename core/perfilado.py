@@ -0,0 +1,231 @@
+"""
+Perfilado por muestreo, sin dependencias externas.
+
+Un hilo muestreador lee periódicamente `sys._current_frames()` y cuenta las pilas de
+llamadas de los hilos que están trabajando (los que esperan en un lock, una cola o el
+selector del event loop se descartan). El resultado se guarda en formato "folded"
+(`hilo;func (archivo:línea);... N`), que aceptan flamegraph.pl, speedscope o inferno.
+
+Dos modos:
+- Por petición: un administrador envía `X-Profile: 1` (o `?_profile=1`) y esa petición se
+  perfila a PROFILING_INTERVAL_MS; el nombre del perfil vuelve en `X-Profile-Id` y se
+  descarga desde GET /admin/perfiles/{nombre}. Se muestrean todos los hilos del proceso,
+  así que si hay otras peticiones en curso también aparecen (el primer marco de cada pila
+  es el nombre del hilo). Solo se perfila una petición a la vez.
+- Continuo (PROFILING_CONTINUOUS): todo el proceso a PROFILING_CONTINUOUS_HZ, volcado a
+  un archivo cada PROFILING_CONTINUOUS_WINDOW_SECONDS.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import (
+    PROFILING_CONTINUOUS_HZ, PROFILING_CONTINUOUS_WINDOW_SECONDS, PROFILING_DIR, PROFILING_INTERVAL_MS,
+    PROFILING_MAX_FILES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Archivos donde un hilo está esperando, no trabajando
+_ARCHIVOS_INACTIVOS = ("threading.py", "selectors.py", "queue.py")
+_PROFUNDIDAD_MAXIMA = 128
+NOMBRE_VALIDO = re.compile(r"^[\w.-]+\.folded$")
+
+_etiquetas: Dict[object, str] = {}
+_raiz = os.getcwd()
+
+
+def _etiqueta(codigo) -> str:
+    etiqueta = _etiquetas.get(codigo)
+    if etiqueta is None:
+        archivo = codigo.co_filename
+        if archivo.startswith(_raiz):
+            archivo = os.path.relpath(archivo, _raiz)
+        else:
+            archivo = os.path.basename(archivo)
+        etiqueta = _etiquetas[codigo] = f"{codigo.co_name} ({archivo}:{codigo.co_firstlineno})".replace(";", ",")
+    return etiqueta
+
+
+def _pila(nombre_hilo: str, frame) -> str:
+    marcos = []
+    while frame is not None and len(marcos) < _PROFUNDIDAD_MAXIMA:
+        marcos.append(_etiqueta(frame.f_code))
+        frame = frame.f_back
+    marcos.append(nombre_hilo.replace(";", ","))
+    return ";".join(reversed(marcos))
+
+
+class Muestreador:
+    """Acumula pilas de todos los hilos (salvo el propio) cada `intervalo` segundos."""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.pilas: Counter = Counter()
+        self.muestras = 0
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def tomar_muestra(self) -> None:
+        propio = threading.get_ident()
+        nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == propio or frame.f_code.co_filename.endswith(_ARCHIVOS_INACTIVOS):
+                continue
+            self.pilas[_pila(nombres.get(ident, str(ident)), frame)] += 1
+        self.muestras += 1
+
+    def _bucle(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.tomar_muestra()
+
+    def iniciar(self) -> "Muestreador":
+        self._hilo = threading.Thread(target=self._bucle, name="perfilador", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self) -> Counter:
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        return self.pilas
+
+
+def guardar_perfil(nombre: str, pilas: Counter) -> str:
+    """Escribe el perfil en PROFILING_DIR y borra los más antiguos por encima del límite."""
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    ruta = os.path.join(PROFILING_DIR, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for pila, cuenta in pilas.most_common():
+            f.write(f"{pila} {cuenta}\n")
+    perfiles = listar_perfiles()
+    for viejo in perfiles[PROFILING_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILING_DIR, viejo["nombre"]))
+        except OSError:
+            pass
+    return ruta
+
+
+def listar_perfiles() -> List[dict]:
+    """Perfiles guardados, del más reciente al más antiguo."""
+    if not os.path.isdir(PROFILING_DIR):
+        return []
+    perfiles = []
+    for nombre in os.listdir(PROFILING_DIR):
+        if not NOMBRE_VALIDO.match(nombre):
+            continue
+        info = os.stat(os.path.join(PROFILING_DIR, nombre))
+        perfiles.append({"nombre": nombre, "tamano": info.st_size, "modificado": info.st_mtime})
+    perfiles.sort(key=lambda p: p["modificado"], reverse=True)
+    return perfiles
+
+
+def _nombre_perfil(prefijo: str) -> str:
+    prefijo = re.sub(r"[^\w-]+", "_", prefijo).strip("_")[:60]
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{prefijo}-{uuid.uuid4().hex[:6]}.folded"
+
+
+# --- Perfilado por petición ---
+
+_perfil_en_curso = threading.Lock()
+
+
+def _pide_perfil(scope) -> bool:
+    for clave, valor in scope.get("headers", []):
+        if clave == b"x-profile":
+            return valor not in (b"", b"0", b"false")
+    consulta = scope.get("query_string", b"")
+    return b"_profile=" in consulta and parse_qs(consulta.decode("latin-1")).get("_profile", ["0"])[0] not in ("", "0", "false")
+
+
+def _es_administrador(scope) -> bool:
+    # Importación diferida: security.core depende de core (config, métricas)
+    from fastapi import HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+    from db.database import SessionLocal
+    from security.core import get_current_principal
+
+    autorizacion = ""
+    for clave, valor in scope.get("headers", []):
+        if clave == b"authorization":
+            autorizacion = valor.decode("latin-1")
+    if not autorizacion.lower().startswith("bearer "):
+        return False
+    db = SessionLocal()
+    try:
+        credenciales = HTTPAuthorizationCredentials(scheme="Bearer", credentials=autorizacion[7:])
+        return get_current_principal(credenciales, db).tipo == "administrador"
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """Perfila las peticiones marcadas con `X-Profile` si las envía un administrador."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _pide_perfil(scope):
+            await self.app(scope, receive, send)
+            return
+        # Sin permiso, o con otro perfil en curso, la petición se atiende normalmente
+        if not await run_in_threadpool(_es_administrador, scope) or not _perfil_en_curso.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        nombre = _nombre_perfil(f"{scope['method']}-{scope['path']}")
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                mensaje["headers"] = list(mensaje.get("headers", [])) + [(b"x-profile-id", nombre.encode())]
+            await send(mensaje)
+
+        muestreador = Muestreador(PROFILING_INTERVAL_MS / 1000).iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            pilas = muestreador.detener()
+            _perfil_en_curso.release()
+            await run_in_threadpool(guardar_perfil, nombre, pilas)
+            logger.info(f"Perfil {nombre}: {muestreador.muestras} muestras")
+
+
+# --- Perfilado continuo ---
+
+_continuo = {"iniciado": False}
+
+
+def _perfilar_continuamente() -> None:
+    intervalo = 1.0 / max(PROFILING_CONTINUOUS_HZ, 0.1)
+    while True:
+        muestreador = Muestreador(intervalo)
+        fin = time.monotonic() + PROFILING_CONTINUOUS_WINDOW_SECONDS
+        while time.monotonic() < fin:
+            time.sleep(intervalo)
+            muestreador.tomar_muestra()
+        if muestreador.pilas:
+            try:
+                guardar_perfil(_nombre_perfil("continuo"), muestreador.pilas)
+            except OSError as e:
+                logger.error(f"No se pudo guardar el perfil continuo: {e}")
+
+
+def iniciar_perfilado_continuo() -> None:
+    """Arranca el muestreo continuo en un hilo de fondo (una vez por proceso)."""
+    if _continuo["iniciado"]:
+        return
+    _continuo["iniciado"] = True
+    threading.Thread(target=_perfilar_continuamente, name="perfilador-continuo", daemon=True).start()
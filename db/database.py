@@ -1,10 +1,15 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Enum, Boolean, Float, ForeignKey, JSON, Table
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Enum, Boolean, Float, ForeignKey, JSON, Table, LargeBinary, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
 import datetime
 import enum
+import time
 
-DATABASE_URL = "sqlite:///./db/database.db"
+from core import metricas
+from core.config import DATABASE_PATH
+
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
@@ -72,6 +77,9 @@ class Estudiante(Base):
     proyectos_lista = Column(JSON, default=[], nullable=False)  # Renombrado de 'proyectos' para evitar conflicto con relationship
     disponibilidad = Column(Boolean, default=True)
     cv_path = Column(String, nullable=True)  # Ruta del CV subido
+    # Texto extraído del CV comprimido con zlib (para re-parsear sin volver a leer el archivo).
+    # Diferido: solo se carga cuando se accede al atributo.
+    cv_texto = deferred(Column(LargeBinary, nullable=True))
 
     # Relación con User
     usuario = relationship("User", back_populates="estudiante")
@@ -129,8 +137,105 @@ class Oportunidad(Base):
 
     empresa = relationship("Empresa", back_populates="oportunidades")
 
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Solo se guarda el sha256 del token: una fuga de la tabla no permite usarlos
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    usuario_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    # Todos los tokens obtenidos rotando desde un mismo login comparten familia
+    familia = Column(String(32), index=True, nullable=False)
+    fecha_creacion = Column(DateTime, default=datetime.datetime.utcnow)
+    expira = Column(DateTime, nullable=False)
+    revocado = Column(Boolean, default=False, nullable=False)
+
+class TokenRevocado(Base):
+    """Tokens de acceso revocados antes de expirar (logout), por su `jti`."""
+    __tablename__ = "tokens_revocados"
+
+    jti = Column(String(32), primary_key=True)
+    expira = Column(Float, index=True, nullable=False)  # epoch, como el claim `exp`
+
+class RevocacionUsuario(Base):
+    """Los tokens de acceso del usuario emitidos hasta `desde` no son válidos (cambio de rol, desactivación)."""
+    __tablename__ = "revocaciones_usuarios"
+
+    usuario_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    desde = Column(Float, index=True, nullable=False)  # epoch, se compara con el claim `iat`
+
+class EstadisticaHabilidad(Base):
+    """Demanda (oportunidades activas) y oferta (estudiantes) por habilidad; la recalcula services/mantenimiento.py."""
+    __tablename__ = "estadisticas_habilidades"
+
+    nombre = Column(String, primary_key=True)  # en minúsculas
+    demanda = Column(Integer, default=0, nullable=False)
+    oferta = Column(Integer, default=0, nullable=False)
+    actualizado = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+class VersionTabla(Base):
+    """Contador de cambios por tabla: lo usan las ETags de los endpoints de catálogo."""
+    __tablename__ = "versiones_tablas"
+
+    tabla = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
 Base.metadata.create_all(bind=engine)
 
+# --- Versionado de tablas de catálogo ---
+# Cualquier flush que inserte, modifique o borre filas de estas tablas incrementa su
+# versión en la misma transacción (sirva desde un endpoint o desde un script).
+TABLAS_VERSIONADAS = {"oportunidades", "empresas", "habilidades", "estadisticas_habilidades"}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _incrementar_versiones(session, flush_context):
+    tablas = {
+        obj.__tablename__
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__tablename__", None) in TABLAS_VERSIONADAS
+    }
+    if not tablas:
+        return
+    stmt = sqlite_insert(VersionTabla).values([{"tabla": t, "version": 1} for t in sorted(tablas)])
+    session.connection().execute(stmt.on_conflict_do_update(
+        index_elements=[VersionTabla.tabla], set_={"version": VersionTabla.version + 1}
+    ))
+    session.info.setdefault("tablas_modificadas", set()).update(tablas)
+
+
+def leer_versiones(db, tablas):
+    """Versión actual de cada tabla ({tabla: version}); 0 si nunca cambió."""
+    filas = db.execute(select(VersionTabla.tabla, VersionTabla.version).where(VersionTabla.tabla.in_(tablas)))
+    versiones = dict.fromkeys(tablas, 0)
+    versiones.update(dict(filas.all()))
+    return versiones
+
+
+# --- Métricas de consultas y del pool de conexiones (ver core/metricas.py) ---
+_OPERACIONES_SQL = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+_duracion_consultas = metricas.histograma(
+    "db_query_duration_seconds", "Duración de las consultas SQL", ("operacion",), metricas.BUCKETS_RAPIDOS
+)
+metricas.medidor("db_pool_connections_in_use", "Conexiones del pool en uso", lambda: engine.pool.checkedout())
+metricas.medidor("db_pool_size", "Tamaño del pool de conexiones", lambda: engine.pool.size())
+metricas.medidor("db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool", lambda: max(0, engine.pool.overflow()))
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _fin_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_consulta", None)
+    if inicio is None:
+        return
+    operacion = statement.lstrip()[:6].upper()
+    _duracion_consultas.observar(time.perf_counter() - inicio, operacion if operacion in _OPERACIONES_SQL else "OTRA")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,60 @@
+"""
+Configuración de gunicorn para producción (ver start.sh / Procfile):
+
+    gunicorn unrc_api_main:app -c gunicorn.conf.py
+
+- N workers de uvicorn (WEB_CONCURRENCY; por defecto uno por núcleo, mínimo 2).
+- preload_app: la aplicación se carga una sola vez en el proceso maestro y los workers la
+  comparten copy-on-write. Antes de crear los workers se congela el GC (`gc.freeze`)
+  para que las recolecciones no toquen esas páginas.
+- Modelos (spaCy, TF-IDF): por defecto se cargan en el primer uso, solo en los workers
+  que los necesitan, y el puerto se abre en menos de un segundo tras un arranque en frío
+  (escalado a cero). Con GUNICORN_PRELOAD_MODELS=true se cargan en el maestro y los
+  workers comparten una sola copia, pero el puerto no se abre hasta que terminan de
+  cargarse. WARMUP_MODELS=true los precarga en cada worker (una copia privada por worker).
+- Reciclado de workers cada GUNICORN_MAX_REQUESTS peticiones (con jitter) para acotar
+  el crecimiento de memoria.
+- Recarga sin cortes: `kill -HUP <pid del maestro>` reemplaza los workers uno a uno. Con
+  preload_app el código queda cargado en el maestro, así que para desplegar código nuevo
+  sin cortes se usa `kill -USR2` (nuevo maestro) y luego `kill -QUIT` al anterior, o
+  GUNICORN_PRELOAD=false para que HUP recargue el código.
+
+Los cachés, límites de peticiones, tokens revocados y métricas siguen siendo por worker.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+preload_models = os.getenv("GUNICORN_PRELOAD_MODELS", "false").lower() in ("1", "true", "yes")
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    if not preload_app:
+        return
+    # La aplicación ya está importada (preload)
+    if preload_models:
+        from routers import health
+        health.precargar_modelos()
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Aplicación{' y modelos' if preload_models else ''} precargados en el proceso maestro")
+
+
+def post_fork(server, worker):
+    # Las conexiones abiertas por el maestro (create_all al importar) no se comparten entre procesos
+    from db.database import engine
+    engine.dispose(close=False)
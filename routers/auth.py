@@ -1,19 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Body, Path
+from fastapi import APIRouter, HTTPException, Depends, status, Body, Path, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from typing import Dict, List
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+import io
 
 # Importaciones de módulos locales
-from schemas.models import User, UserCreate, LoginRequest, Token, UserUpdate, TokenWithUser, UserInfo, Estudiante, EstudianteConUsuario
+from schemas.models import User, UserCreate, LoginRequest, Token, UserUpdate, TokenWithUser, UserInfo, Estudiante, EstudianteConUsuario, RefreshRequest
 from core.config import ACCESS_TOKEN_EXPIRE_MINUTES
 from security.core import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
-    get_current_user,
+    get_current_principal,
+    Principal,
+    cargar_principal,
+    claims_de_principal,
+    decodificar_token,
+    revocar_token,
+    security,
 )
 from db.database import get_db, User as DBUser, Estudiante as DBEstudiante, Empresa as DBEmpresa
+from security.refresh_tokens import emitir_refresh_token, rotar_refresh_token, revocar_refresh_token
+from services.user_import import importar_estudiantes_csv
+from services.serializacion import JSONRapidoResponse, respuesta_modelos
+from services.proyecciones import CAMPOS_ESTUDIANTE_LISTA, opciones_de_carga, parse_campos, proyectar
 
 # --- Creación del Router ---
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -37,7 +50,8 @@ async def register(user_create: UserCreate, db: Session = Depends(get_db)):
 
     # Para Argon2 usamos la contraseña como string (no es necesario truncarla).
     password_to_hash = user_create.password
-    hashed_password = hash_password(password_to_hash)
+    db.rollback()  # Liberar la conexión mientras se calcula el hash
+    hashed_password = await hash_password_async(password_to_hash)
     
     # Crear el usuario base
     db_user = DBUser(
@@ -73,19 +87,72 @@ async def login(login_request: LoginRequest, db: Session = Depends(get_db)):
     db_user = db.query(DBUser).filter(DBUser.email == login_request.email).first()
     # Verificamos la contraseña tal cual (Argon2 espera str)
     password_to_verify = login_request.password
-    if not db_user or not verify_password(password_to_verify, db_user.hashed_password):
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
+    hash_guardado = db_user.hashed_password
+    # Devolver la conexión al pool mientras se verifica: con muchos logins concurrentes,
+    # retenerla durante Argon2 agotaría el pool y bloquearía el event loop.
+    db.rollback()
+    valida, nuevo_hash = await verify_and_update_password(password_to_verify, hash_guardado)
+    if not valida:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
+    if nuevo_hash:
+        # Los parámetros de Argon2 cambiaron desde que se guardó el hash: se actualiza
+        db_user.hashed_password = nuevo_hash
+        db.commit()
+
+    return _respuesta_tokens(db, db_user)
 
+
+def _respuesta_tokens(db: Session, db_user: DBUser, refresh_token: Optional[str] = None) -> dict:
+    """
+    Token de acceso + refresh token + datos del usuario (hace commit).
+    Si no se pasa `refresh_token` (login) se emite uno de una familia nueva.
+    """
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={"sub": db_user.email}, expires_delta=access_token_expires)
+    principal = cargar_principal(db, db_user.email)
+    access_token = create_access_token(data=claims_de_principal(principal), expires_delta=access_token_expires)
+    refresh_token = refresh_token or emitir_refresh_token(db, db_user.id)
+    db.commit()
 
     user_info = UserInfo(id=db_user.id, nombre=db_user.nombre, tipo=db_user.tipo)
 
-    return {"access_token": access_token, "token_type": "bearer", "user": user_info}
+    return {"access_token": access_token, "token_type": "bearer", "user": user_info, "refresh_token": refresh_token}
+
+# --- Endpoint de Refresh ---
+@router.post("/refresh", response_model=TokenWithUser)
+async def refresh(datos: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Renueva el token de acceso con un refresh token, sin verificar la contraseña.
+    El refresh token usado deja de ser válido y se devuelve uno nuevo (rotación).
+    """
+    usuario_id, nuevo_refresh_token = rotar_refresh_token(db, datos.refresh_token)
+    db_user = db.query(DBUser).filter(DBUser.id == usuario_id).first()
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
+    if db_user.activo is False:
+        revocar_refresh_token(db, nuevo_refresh_token)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuario inactivo")
+    return _respuesta_tokens(db, db_user, nuevo_refresh_token)
+
+# --- Endpoint de Logout ---
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    datos: Optional[RefreshRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+):
+    """
+    Revoca el token de acceso actual: deja de ser válido aunque todavía no haya expirado.
+    Si se envía el refresh token, también se revoca (junto con los obtenidos al rotarlo).
+    """
+    revocar_token(decodificar_token(credentials), db)
+    if datos is not None:
+        revocar_refresh_token(db, datos.refresh_token)
 
 # --- Endpoint para obtener todos los usuarios (protegido) ---
 @router.get("/usuarios", response_model=List[User], tags=["Usuarios"])
-async def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_all_users(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Obtiene una lista de todos los usuarios.
     Requiere autenticación.
@@ -94,51 +161,49 @@ async def get_all_users(db: Session = Depends(get_db), current_user: User = Depe
         raise HTTPException(status_code=403, detail="No tienes permiso para ver todos los usuarios.")
     
     users = db.query(DBUser).all()
-    return users
+    return respuesta_modelos(User, users)
+
+# --- Alta masiva de estudiantes desde CSV (solo administradores) ---
+@router.post("/usuarios/importar", tags=["Usuarios"])
+async def importar_usuarios(
+    file: UploadFile = File(...),
+    lote: int = 200,
+    dry_run: bool = False,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Crea cuentas de estudiante a partir de un CSV con columnas
+    `email,nombre,apellido,password[,matricula,semestre,carrera]`.
+    Devuelve el total de filas, cuántas se crearon y el detalle de las que fallaron.
+    """
+    if current_user.tipo != "administrador":
+        raise HTTPException(status_code=403, detail="Solo administradores pueden importar usuarios.")
+    archivo = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        # La importación es bloqueante (hashing + inserciones): fuera del event loop
+        return await run_in_threadpool(importar_estudiantes_csv, archivo, max(1, min(lote, 1000)), None, dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El CSV debe estar codificado en UTF-8")
 
 # --- Endpoint público para obtener solo estudiantes ---
-@router.get("/usuarios/estudiantes")
-async def get_estudiantes(db: Session = Depends(get_db)):
+@router.get("/usuarios/estudiantes", response_class=JSONRapidoResponse)
+async def get_estudiantes(
+    fields: Optional[str] = Query(None, description="Campos a devolver, p. ej. `id,carrera,habilidades_tecnicas,usuario.nombre`"),
+    db: Session = Depends(get_db),
+):
     """
     Obtiene una lista pública de todos los estudiantes con su información completa.
+    Con `fields` solo se consultan y devuelven los campos pedidos (ver services/proyecciones.py).
     No requiere autenticación.
     """
-    from db.database import Estudiante as DBEstudiante, User as DBUser
+    campos = parse_campos(fields, CAMPOS_ESTUDIANTE_LISTA)
     try:
-        # Obtener estudiantes con su información de usuario
-        estudiantes = db.query(DBEstudiante).all()
-        
-        # Para cada estudiante, agregar manualmente la información del usuario
-        resultado = []
-        for est in estudiantes:
-            usuario = db.query(DBUser).filter(DBUser.id == est.usuario_id).first()
-            # Crear un diccionario con los datos del estudiante
-            est_dict = {
-                'id': est.id,
-                'usuario_id': est.usuario_id,
-                'matricula': est.matricula,
-                'semestre': est.semestre,
-                'carrera': est.carrera,
-                'gpa': est.gpa,
-                'habilidades_tecnicas': est.habilidades_tecnicas or [],
-                'habilidades_blandas': est.habilidades_blandas or [],
-                'proyectos': est.proyectos_lista or [],
-                'disponibilidad': est.disponibilidad,
-                'experiencias': est.experiencias or [],
-                'habilidades': est.habilidades or [],
-                'usuario': {
-                    'id': usuario.id,
-                    'nombre': usuario.nombre,
-                    'apellido': usuario.apellido,
-                    'email': usuario.email,
-                    'tipo': usuario.tipo,
-                    'activo': usuario.activo,
-                    'fecha_creacion': str(usuario.fecha_creacion) if usuario.fecha_creacion else None
-                } if usuario else None
-            }
-            resultado.append(est_dict)
-        
-        return resultado
+        # Una consulta para los estudiantes (+ usuario con JOIN) y una por relación pedida
+        estudiantes = db.query(DBEstudiante).options(*opciones_de_carga(campos, CAMPOS_ESTUDIANTE_LISTA)).all()
+        resultado = [proyectar(est, campos, CAMPOS_ESTUDIANTE_LISTA) for est in estudiantes]
+        return JSONRapidoResponse(resultado)
     except Exception as e:
         import traceback
         print(f"Error en get_estudiantes: {str(e)}")
@@ -147,9 +212,10 @@ async def get_estudiantes(db: Session = Depends(get_db)):
 
 # --- Endpoint para editar usuario (solo el propio usuario autenticado) ---
 @router.patch("/usuarios/{usuario_id}", response_model=User, tags=["Usuarios"])
-async def editar_usuario(usuario_id: int, datos: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def editar_usuario(usuario_id: int, datos: UserUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Permite que solo el usuario autenticado edite su propia información.
+    Al guardar se invalida el principal en caché del usuario (ver security.core).
     """
     if current_user.id != usuario_id:
         raise HTTPException(status_code=403, detail="No tienes permiso para editar este usuario.")
@@ -1,26 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from db.database import get_db, Empresa as DBEmpresa
 from schemas.models import Empresa as SchemaEmpresa, EmpresaUpdate
-from security.core import get_current_user
-from schemas.models import User as SchemaUser
+from security.core import get_current_principal, Principal
+from services.http_cache import respuesta_catalogo
+from services.serializacion import dump_modelos
 
 router = APIRouter(prefix="/empresas", tags=["Empresas"])
 
 @router.get("/", response_model=List[SchemaEmpresa])
-async def get_all_empresas(db: Session = Depends(get_db)):
+async def get_all_empresas(request: Request, db: Session = Depends(get_db)):
     """
     Obtiene una lista de todos los perfiles de empresa.
+    Respuesta cacheada con ETag según la versión de la tabla de empresas.
     """
-    empresas = db.query(DBEmpresa).all()
-    return empresas
+    def serializar():
+        empresas = db.query(DBEmpresa).all()
+        return dump_modelos(SchemaEmpresa, empresas)
+    return respuesta_catalogo(request, db, ("empresas",), "empresas:todas", serializar)
 
 @router.get("/me", response_model=SchemaEmpresa)
 async def get_my_empresa_profile(
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Obtiene el perfil de empresa del usuario autenticado.
@@ -53,7 +57,7 @@ async def get_empresa_by_id(empresa_id: int, db: Session = Depends(get_db)):
 async def update_my_empresa_profile(
     empresa_update: EmpresaUpdate,
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Permite a un usuario de tipo 'empresa' actualizar su propio perfil.
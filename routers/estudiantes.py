@@ -1,19 +1,49 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 from sqlalchemy.orm import Session
 import os
+from datetime import datetime, timezone
 from db.database import get_db, Estudiante as DBEstudiante, Experiencia as DBExperiencia, User as DBUser
-from services.cv_parser import parse_cv
-from fastapi.responses import FileResponse
-from security.core import get_current_user
-from schemas.models import User as SchemaUser
+from services.cv_parser import parse_cv_con_texto
+from services.cv_import import (
+    aplicar_cv_a_estudiante, resumen_parseado, guardar_texto_cv, liberar_cvs_huerfanos,
+    reparsear_textos_guardados, reservar_reparseo, estado_reparseo,
+)
+from services.storage import get_storage, es_clave, media_type_para
+from services.http_cache import respuesta_archivo, no_modificado, etag_de_archivo
+from services.proyecciones import CAMPOS_ESTUDIANTE_DETALLE, opciones_de_carga, parse_campos, proyectar
+from core.config import CV_DOWNLOAD_CACHE_CONTROL
+from security.core import get_current_principal, Principal
 
 router = APIRouter(prefix="/estudiantes", tags=["Estudiantes"])
 
-UPLOAD_DIR = "uploaded_cvs"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+@router.post("/admin/reparse", status_code=status.HTTP_202_ACCEPTED)
+def reparse_cvs(background_tasks: BackgroundTasks, lote: int = 200, dry_run: bool = False,
+                current_user: Principal = Depends(get_current_principal)):
+    """
+    Lanza en segundo plano el re-parseo de todos los CVs a partir del texto ya extraído
+    (sin volver a leer los archivos). Solo administradores.
+    """
+    if current_user.tipo != "administrador":
+        raise HTTPException(status_code=403, detail="Solo administradores pueden re-parsear CVs")
+    # El turno se toma aquí (no en la tarea) para que dos peticiones simultáneas no lancen dos re-parseos
+    if not reservar_reparseo(dry_run):
+        raise HTTPException(status_code=409, detail="Ya hay un re-parseo en curso")
+    background_tasks.add_task(reparsear_textos_guardados, max(1, min(lote, 1000)), dry_run, reservado=True)
+    return {"message": "Re-parseo iniciado", "lote": lote, "dry_run": dry_run}
+
+
+@router.get("/admin/reparse", status_code=status.HTTP_200_OK)
+def reparse_cvs_estado(current_user: Principal = Depends(get_current_principal)):
+    """Progreso del último re-parseo lanzado."""
+    if current_user.tipo != "administrador":
+        raise HTTPException(status_code=403, detail="Solo administradores pueden ver el re-parseo")
+    return estado_reparseo()
+
 
 @router.get("/me/profile", status_code=status.HTTP_200_OK)
-def get_my_profile(db: Session = Depends(get_db), current_user: SchemaUser = Depends(get_current_user)):
+def get_my_profile(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Obtiene el perfil del estudiante autenticado por usuario_id.
     """
@@ -40,8 +70,20 @@ def get_my_profile(db: Session = Depends(get_db), current_user: SchemaUser = Dep
         "cv_path": db_estudiante.cv_path,
     }
 
+def _guardar_y_parsear(contents: bytes, ext: str):
+    """
+    Guarda el CV en el almacenamiento y lo parsea: (clave, texto, parseado). Es bloqueante
+    (E/S de disco o S3, hasta CV_PDF_TIME_BUDGET_SECONDS de extracción y el candado de
+    spaCy), así que los endpoints async lo ejecutan con `run_in_threadpool`.
+    """
+    storage = get_storage()
+    cv_key = storage.put(contents, ext)
+    with storage.local_path(cv_key) as path:
+        texto, parsed = parse_cv_con_texto(path)
+    return cv_key, texto, parsed
+
 @router.post("/me/upload_cv", status_code=status.HTTP_200_OK)
-async def upload_cv_me(file: UploadFile = File(...), db: Session = Depends(get_db), current_user: SchemaUser = Depends(get_current_user)):
+async def upload_cv_me(file: UploadFile = File(...), db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Permite al estudiante autenticado subir su CV.
     Busca el perfil de estudiante por usuario_id.
@@ -59,72 +101,27 @@ async def upload_cv_me(file: UploadFile = File(...), db: Session = Depends(get_d
         if ext not in [".pdf", ".doc", ".docx"]:
             raise HTTPException(status_code=400, detail="Formato de archivo no permitido. Use PDF, DOC o DOCX")
         
-        # Crear directorio si no existe
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        
-        save_path = os.path.join(UPLOAD_DIR, f"cv_{db_estudiante.id}{ext}")
-        
-        # Leer y guardar archivo
+        # Leer y guardar archivo (por contenido: subir el mismo CV no lo reescribe)
         contents = await file.read()
         if not contents:
             raise HTTPException(status_code=400, detail="El archivo está vacío")
         
-        with open(save_path, "wb") as f:
-            f.write(contents)
-        
-        db_estudiante.cv_path = save_path
-        
-        # Intentar parsear el CV para extraer información
-        parsed = parse_cv(save_path)
-        
-        # Actualizar campos en la base de datos si se encontraron, evitando duplicados
-        if parsed.get('carrera'):
-            db_estudiante.carrera = parsed.get('carrera')
-        
-        if parsed.get('habilidades'):
-            # Mezclar con existentes y eliminar duplicados (case-insensitive)
-            existing_skills = db_estudiante.habilidades_tecnicas or []
-            existing_skills_lower = [s.lower() for s in existing_skills]
-            new_skills = [
-                h for h in parsed.get('habilidades') 
-                if h.lower() not in existing_skills_lower
-            ]
-            db_estudiante.habilidades_tecnicas = list(set(existing_skills + new_skills))
-        
-        if parsed.get('proyectos'):
-            # Mezclar con existentes y eliminar duplicados
-            existing_projects = db_estudiante.proyectos_lista or []
-            new_projects = [
-                p for p in parsed.get('proyectos')
-                if p not in existing_projects
-            ]
-            db_estudiante.proyectos_lista = list(set(existing_projects + new_projects))
-        
-        # Crear experiencias extraídas (si hay), evitando duplicados
-        if parsed.get('experiencias'):
-            existing_descriptions = {e.descripcion for e in db_estudiante.experiencias}
-            for exp_text in parsed.get('experiencias'):
-                if exp_text not in existing_descriptions:
-                    exp = DBExperiencia(
-                        puesto=exp_text[:150], 
-                        empresa='', 
-                        descripcion=exp_text, 
-                        estudiante_id=db_estudiante.id
-                    )
-                    db.add(exp)
+        # Guardado y parseo fuera del event loop (ver _guardar_y_parsear)
+        cv_key, texto, parsed = await run_in_threadpool(_guardar_y_parsear, contents, ext)
+        cv_anterior = db_estudiante.cv_path
+        db_estudiante.cv_path = cv_key
         
+        guardar_texto_cv(db_estudiante, texto)
+        aplicar_cv_a_estudiante(db, db_estudiante, parsed)
         db.commit()
+        # El CV anterior queda huérfano si nadie más comparte su contenido
+        await run_in_threadpool(liberar_cvs_huerfanos, db, [cv_anterior])
         
         # Retornar los datos parseados limpios (sin duplicados)
         return {
             "message": "CV subido y procesado correctamente", 
-            "cv_path": save_path, 
-            "parsed": {
-                "carrera": parsed.get('carrera'),
-                "habilidades": list(set(parsed.get('habilidades', []))),
-                "proyectos": list(set(parsed.get('proyectos', []))),
-                "experiencias": list(set(parsed.get('experiencias', [])))
-            }
+            "cv_path": cv_key, 
+            "parsed": resumen_parseado(parsed)
         }
     except HTTPException:
         raise
@@ -141,7 +138,7 @@ async def update_my_perfil(
     proyectos: str = Form(None),
     experiencias: str = Form(None),
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Permite al estudiante autenticado editar su perfil: carrera, semestre, skills, proyectos, experiencia laboral.
@@ -267,72 +264,27 @@ async def upload_cv(estudiante_id: int, file: UploadFile = File(...), db: Sessio
         if ext not in [".pdf", ".doc", ".docx"]:
             raise HTTPException(status_code=400, detail="Formato de archivo no permitido. Use PDF, DOC o DOCX")
         
-        # Crear directorio si no existe
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        
-        save_path = os.path.join(UPLOAD_DIR, f"cv_{estudiante_id}{ext}")
-        
-        # Leer y guardar archivo
+        # Leer y guardar archivo (por contenido: subir el mismo CV no lo reescribe)
         contents = await file.read()
         if not contents:
             raise HTTPException(status_code=400, detail="El archivo está vacío")
         
-        with open(save_path, "wb") as f:
-            f.write(contents)
-        
-        db_estudiante.cv_path = save_path
-        
-        # Intentar parsear el CV para extraer información
-        parsed = parse_cv(save_path)
-        
-        # Actualizar campos en la base de datos si se encontraron, evitando duplicados
-        if parsed.get('carrera'):
-            db_estudiante.carrera = parsed.get('carrera')
-        
-        if parsed.get('habilidades'):
-            # Mezclar con existentes y eliminar duplicados (case-insensitive)
-            existing_skills = db_estudiante.habilidades_tecnicas or []
-            existing_skills_lower = [s.lower() for s in existing_skills]
-            new_skills = [
-                h for h in parsed.get('habilidades') 
-                if h.lower() not in existing_skills_lower
-            ]
-            db_estudiante.habilidades_tecnicas = list(set(existing_skills + new_skills))
-        
-        if parsed.get('proyectos'):
-            # Mezclar con existentes y eliminar duplicados
-            existing_projects = db_estudiante.proyectos_lista or []
-            new_projects = [
-                p for p in parsed.get('proyectos')
-                if p not in existing_projects
-            ]
-            db_estudiante.proyectos_lista = list(set(existing_projects + new_projects))
-        
-        # Crear experiencias extraídas (si hay), evitando duplicados
-        if parsed.get('experiencias'):
-            existing_descriptions = {e.descripcion for e in db_estudiante.experiencias}
-            for exp_text in parsed.get('experiencias'):
-                if exp_text not in existing_descriptions:
-                    exp = DBExperiencia(
-                        puesto=exp_text[:150], 
-                        empresa='', 
-                        descripcion=exp_text, 
-                        estudiante_id=db_estudiante.id
-                    )
-                    db.add(exp)
+        # Guardado y parseo fuera del event loop (ver _guardar_y_parsear)
+        cv_key, texto, parsed = await run_in_threadpool(_guardar_y_parsear, contents, ext)
+        cv_anterior = db_estudiante.cv_path
+        db_estudiante.cv_path = cv_key
         
+        guardar_texto_cv(db_estudiante, texto)
+        aplicar_cv_a_estudiante(db, db_estudiante, parsed)
         db.commit()
+        # El CV anterior queda huérfano si nadie más comparte su contenido
+        await run_in_threadpool(liberar_cvs_huerfanos, db, [cv_anterior])
         
         # Retornar los datos parseados limpios (sin duplicados)
         return {
             "message": "CV subido y procesado correctamente", 
-            "cv_path": save_path, 
-            "parsed": {
-                "carrera": parsed.get('carrera'),
-                "habilidades": list(set(parsed.get('habilidades', []))),
-                "proyectos": list(set(parsed.get('proyectos', []))),
-                "experiencias": list(set(parsed.get('experiencias', [])))
-            }
+            "cv_path": cv_key, 
+            "parsed": resumen_parseado(parsed)
         }
     except HTTPException:
         raise
@@ -342,30 +294,27 @@ async def upload_cv(estudiante_id: int, file: UploadFile = File(...), db: Sessio
 
 
 @router.get("/{estudiante_id}", status_code=status.HTTP_200_OK)
-def get_estudiante(estudiante_id: int, db: Session = Depends(get_db)):
+def get_estudiante(
+    estudiante_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver, p. ej. `id,carrera,habilidades_tecnicas`"),
+    db: Session = Depends(get_db),
+):
     """
     Devuelve la información del estudiante por su id.
+    Con `fields` solo se consultan y devuelven los campos pedidos.
     """
-    db_estudiante = db.query(DBEstudiante).filter(DBEstudiante.id == estudiante_id).first()
+    campos = parse_campos(fields, CAMPOS_ESTUDIANTE_DETALLE)
+    db_estudiante = (
+        db.query(DBEstudiante)
+        .options(*opciones_de_carga(campos, CAMPOS_ESTUDIANTE_DETALLE))
+        .filter(DBEstudiante.id == estudiante_id)
+        .first()
+    )
     if not db_estudiante:
         raise HTTPException(status_code=404, detail="Estudiante no encontrado")
 
     # Serializar campos relevantes
-    return {
-        "id": db_estudiante.id,
-        "usuario_id": db_estudiante.usuario_id,
-        "matricula": db_estudiante.matricula,
-        "semestre": db_estudiante.semestre,
-        "carrera": db_estudiante.carrera,
-        "gpa": db_estudiante.gpa,
-        "habilidades_tecnicas": db_estudiante.habilidades_tecnicas or [],
-        "habilidades_blandas": db_estudiante.habilidades_blandas or [],
-        "proyectos": db_estudiante.proyectos_lista or [],
-        "experiencias": [
-            {"puesto": e.puesto, "empresa": e.empresa, "descripcion": e.descripcion, "fecha_inicio": e.fecha_inicio, "fecha_fin": e.fecha_fin} for e in db_estudiante.experiencias
-        ],
-        "cv_path": db_estudiante.cv_path,
-    }
+    return proyectar(db_estudiante, campos, CAMPOS_ESTUDIANTE_DETALLE)
 
 
 @router.get("/{estudiante_id}/public", status_code=status.HTTP_200_OK)
@@ -398,12 +347,48 @@ def get_estudiante_public(estudiante_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{estudiante_id}/cv/download", status_code=status.HTTP_200_OK)
-def download_cv(estudiante_id: int, db: Session = Depends(get_db)):
-    """Devuelve el archivo del CV para descarga si existe."""
+def download_cv(estudiante_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Devuelve el archivo del CV para descarga si existe.
+    Incluye ETag (hash del contenido) y Last-Modified: si el cliente ya tiene la versión
+    responde 304 sin cuerpo; también admite descargas parciales con `Range`.
+    """
     db_estudiante = db.query(DBEstudiante).filter(DBEstudiante.id == estudiante_id).first()
     if not db_estudiante or not db_estudiante.cv_path:
         raise HTTPException(status_code=404, detail="CV no encontrado")
-    return FileResponse(path=db_estudiante.cv_path, filename=os.path.basename(db_estudiante.cv_path))
+    cv_path = db_estudiante.cv_path
+    filename = f"cv_{db_estudiante.id}{os.path.splitext(cv_path)[1]}"
+    opciones = dict(media_type=media_type_para(cv_path), filename=filename,
+                    cache_control=CV_DOWNLOAD_CACHE_CONTROL)
+    if not es_clave(cv_path):
+        # CV subido antes del almacenamiento por contenido: ruta de archivo local
+        if not os.path.exists(cv_path):
+            raise HTTPException(status_code=404, detail="CV no encontrado")
+        st = os.stat(cv_path)
+        return respuesta_archivo(
+            request, etag=etag_de_archivo(cv_path), tamano=st.st_size,
+            modificado=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc), ruta=cv_path, **opciones,
+        )
+
+    storage = get_storage()
+    info = storage.stat(cv_path)
+    if info is None:
+        raise HTTPException(status_code=404, detail="CV no encontrado")
+    # La clave es el sha256 del contenido: sirve directamente como ETag fuerte
+    etag = f'"{os.path.splitext(cv_path)[0]}"'
+    if no_modificado(request, etag, info.modificado):
+        return respuesta_archivo(request, etag=etag, modificado=info.modificado, tamano=info.tamano, **opciones)
+    ruta = storage.ruta_directa(cv_path)
+    contenido = None
+    if not ruta:
+        try:
+            contenido = storage.get(cv_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="CV no encontrado")
+    return respuesta_archivo(
+        request, etag=etag, modificado=info.modificado, tamano=info.tamano,
+        ruta=ruta, contenido=contenido, **opciones,
+    )
 
 @router.patch("/{estudiante_id}/perfil", status_code=status.HTTP_200_OK)
 async def update_perfil(
@@ -16,13 +16,13 @@ router = APIRouter(
 def add_experiencia_to_current_user(
     experiencia: models.ExperienciaCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
-    new_experiencia = database.Experiencia(**experiencia.model_dump(), estudiante_id=estudiante.id)
+    new_experiencia = database.Experiencia(**experiencia.model_dump(), estudiante_id=estudiante_id)
     db.add(new_experiencia)
     db.commit()
     db.refresh(new_experiencia)
@@ -34,15 +34,15 @@ def update_experiencia_for_current_user(
     experiencia_id: int,
     experiencia_update: models.ExperienciaCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
     db_experiencia = db.query(database.Experiencia).filter(
         database.Experiencia.id == experiencia_id,
-        database.Experiencia.estudiante_id == estudiante.id
+        database.Experiencia.estudiante_id == estudiante_id
     ).first()
 
     if not db_experiencia:
@@ -60,15 +60,15 @@ def update_experiencia_for_current_user(
 def delete_experiencia_from_current_user(
     experiencia_id: int,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
     db_experiencia = db.query(database.Experiencia).filter(
         database.Experiencia.id == experiencia_id,
-        database.Experiencia.estudiante_id == estudiante.id
+        database.Experiencia.estudiante_id == estudiante_id
     ).first()
 
     if not db_experiencia:
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 
 from db import database
 from schemas import models
 from security import core
+from services.http_cache import respuesta_catalogo
+from services.serializacion import dump_modelos
 
 router = APIRouter(
     prefix="/habilidades",
@@ -25,8 +27,37 @@ def create_habilidad(habilidad: models.HabilidadCreate, db: Session = Depends(da
 
 # Endpoint para obtener todas las habilidades
 @router.get("/", response_model=List[models.Habilidad])
-def get_habilidades(db: Session = Depends(database.get_db)):
-    return db.query(database.Habilidad).all()
+def get_habilidades(request: Request, db: Session = Depends(database.get_db)):
+    # Respuesta cacheada con ETag según la versión de la tabla de habilidades
+    def serializar():
+        habilidades = db.query(database.Habilidad).all()
+        return dump_modelos(models.Habilidad, habilidades)
+    return respuesta_catalogo(request, db, ("habilidades",), "habilidades:todas", serializar)
+
+# Endpoint con la demanda y la oferta de cada habilidad
+@router.get("/estadisticas", response_model=List[models.EstadisticaHabilidad])
+def get_estadisticas_habilidades(
+    request: Request,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(database.get_db),
+):
+    """
+    Habilidades más pedidas en las oportunidades activas y cuántos estudiantes las tienen.
+    Se lee de la tabla que recalcula periódicamente la tarea de mantenimiento
+    `estadisticas_habilidades` (ver services/mantenimiento.py), no de las tablas completas.
+    """
+    def serializar():
+        estadisticas = (
+            db.query(database.EstadisticaHabilidad)
+            .order_by(database.EstadisticaHabilidad.demanda.desc(), database.EstadisticaHabilidad.oferta.desc(),
+                      database.EstadisticaHabilidad.nombre)
+            .limit(limite)
+            .all()
+        )
+        return dump_modelos(models.EstadisticaHabilidad, estadisticas)
+    return respuesta_catalogo(
+        request, db, ("estadisticas_habilidades",), f"habilidades:estadisticas:{limite}", serializar
+    )
 
 # Endpoint para que un estudiante agregue una habilidad a su perfil
 @router.post("/me/{habilidad_id}", response_model=models.User)
@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from core.config import WARMUP_MODELS
+from services.cv_parser import cargar_extractores, get_nlp, estado_nlp
+from services.matching import cargar_tfidf, estado_tfidf
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+# Estado del calentamiento de modelos (spaCy, scikit-learn, pypdf y python-docx) de este proceso
+_calentamiento = {"iniciado": False, "terminado": False}
+
+
+def _calentar():
+    try:
+        get_nlp()
+        cargar_tfidf()
+        cargar_extractores()
+    except Exception as e:
+        logger.error(f"Error al precargar modelos: {e}")
+    finally:
+        _calentamiento["terminado"] = True
+        logger.info(f"Modelos precargados (spacy={estado_nlp()}, sklearn={estado_tfidf()})")
+
+
+def iniciar_calentamiento():
+    """
+    Precarga los modelos en un hilo de fondo para que el primer CV o la primera
+    recomendación no paguen la carga. No bloquea el arranque del servidor.
+    """
+    if not WARMUP_MODELS or _calentamiento["iniciado"]:
+        return
+    _calentamiento["iniciado"] = True
+    threading.Thread(target=_calentar, name="calentamiento-modelos", daemon=True).start()
+
+
+def precargar_modelos():
+    """
+    Carga los modelos de forma síncrona. La usa el proceso maestro de gunicorn
+    (GUNICORN_PRELOAD_MODELS) para que los workers hereden los modelos ya cargados,
+    compartidos copy-on-write, en lugar de cargarlos cada uno.
+    """
+    if _calentamiento["iniciado"]:
+        return
+    _calentamiento["iniciado"] = True
+    _calentar()
+
+
+@router.get("/live")
+async def live():
+    """El proceso está vivo y atiende peticiones."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    El proceso está listo para recibir tráfico: los modelos terminaron de precargarse
+    (o no se precargan y se cargan en el primer uso).
+    """
+    listo = not _calentamiento["iniciado"] or _calentamiento["terminado"]
+    contenido = {
+        "status": "listo" if listo else "calentando",
+        "modelos": {"spacy": estado_nlp(), "sklearn": estado_tfidf()},
+    }
+    return JSONResponse(status_code=200 if listo else 503, content=contenido)
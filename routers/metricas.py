@@ -0,0 +1,44 @@
+import hmac
+import threading
+
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from core import metricas
+from core.config import METRICS_TOKEN
+
+router = APIRouter(tags=["Métricas"])
+
+
+def _hilos_por_pool() -> dict:
+    conteo = {}
+    for hilo in threading.enumerate():
+        # "argon2_0", "AnyIO worker thread", "calentamiento-modelos"...
+        pool = hilo.name.rsplit("_", 1)[0] if "_" in hilo.name else hilo.name
+        conteo[(pool,)] = conteo.get((pool,), 0) + 1
+    return conteo
+
+
+def _threadpool_en_uso():
+    # Limitador de anyio que usan run_in_threadpool y los endpoints `def` (solo dentro del event loop)
+    return anyio.to_thread.current_default_thread_limiter().borrowed_tokens
+
+
+def _threadpool_en_espera():
+    return anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+
+
+metricas.medidor("process_threads", "Hilos del proceso por nombre de pool", _hilos_por_pool, ("pool",))
+metricas.medidor("threadpool_busy_threads", "Hilos del threadpool de Starlette ocupados", _threadpool_en_uso)
+metricas.medidor("threadpool_queued_tasks", "Tareas esperando un hilo del threadpool de Starlette", _threadpool_en_espera)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas de este proceso en formato de texto de Prometheus."""
+    if METRICS_TOKEN:
+        autorizacion = request.headers.get("authorization", "")
+        if not hmac.compare_digest(autorizacion.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autorizado")
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
@@ -1,21 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import datetime
+import time
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.background import BackgroundTask
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from db.database import get_db, Oportunidad as DBOportunidad, Empresa as DBEmpresa
+from core import metricas
+from core.config import SSE_KEEPALIVE_SECONDS, SSE_TICKET_TTL_SECONDS
+from db.database import get_db, SessionLocal, Oportunidad as DBOportunidad
 from schemas.models import Oportunidad as SchemaOportunidad, OportunidadCreate, OportunidadUpdate
-from security.core import get_current_user
-from schemas.models import User as SchemaUser
-from services.matching import calcular_compatibilidad
+from security.core import canjear_ticket, crear_ticket, get_current_principal, Principal
+from services.matching import calcular_compatibilidad, resumen_oportunidad
+from services.http_cache import respuesta_catalogo
+from services.serializacion import JSONRapidoResponse, dump_modelo, dump_modelos, dumps, respuesta_modelos
+from services.eventos import broker, publicar_oportunidad
 from db.database import Estudiante as DBEstudiante
 
 router = APIRouter(prefix="/oportunidades", tags=["Oportunidades"])
 
+_duracion_scoring = metricas.histograma(
+    "recommendation_scoring_duration_seconds", "Tiempo de cálculo de compatibilidad por petición de recomendaciones"
+)
+
 @router.post("/", response_model=SchemaOportunidad, status_code=status.HTTP_201_CREATED)
 async def create_oportunidad(
     oportunidad_create: OportunidadCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Crea una nueva oportunidad de trabajo. Solo para usuarios de tipo 'empresa'.
@@ -29,9 +46,8 @@ async def create_oportunidad(
             detail="Solo las empresas pueden crear oportunidades."
         )
 
-    # Obtener el perfil de la empresa del usuario actual
-    empresa = db.query(DBEmpresa).filter(DBEmpresa.usuario_id == current_user.id).first()
-    if not empresa:
+    # El id del perfil de empresa viene en el principal (sin consultar la base de datos)
+    if not current_user.empresa_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de empresa no encontrado para el usuario actual."
@@ -40,11 +56,13 @@ async def create_oportunidad(
     try:
         db_oportunidad = DBOportunidad(
             **oportunidad_create.model_dump(),
-            empresa_id=empresa.id
+            empresa_id=current_user.empresa_id
         )
         db.add(db_oportunidad)
         db.commit()
         db.refresh(db_oportunidad)
+        # Aviso a los estudiantes conectados por SSE, después de responder
+        background_tasks.add_task(publicar_oportunidad, db_oportunidad.id, "creada")
         return db_oportunidad
     except Exception as e:
         db.rollback()
@@ -55,17 +73,20 @@ async def create_oportunidad(
         )
 
 @router.get("/", response_model=List[SchemaOportunidad])
-async def get_all_oportunidades(db: Session = Depends(get_db)):
+async def get_all_oportunidades(request: Request, db: Session = Depends(get_db)):
     """
     Obtiene una lista de todas las oportunidades de trabajo activas.
+    Respuesta cacheada con ETag según la versión de la tabla de oportunidades.
     """
-    oportunidades = db.query(DBOportunidad).filter(DBOportunidad.activa == True).all()
-    return oportunidades
+    def serializar():
+        oportunidades = db.query(DBOportunidad).filter(DBOportunidad.activa == True).all()
+        return dump_modelos(SchemaOportunidad, oportunidades)
+    return respuesta_catalogo(request, db, ("oportunidades",), "oportunidades:activas", serializar)
 
 @router.get("/me", response_model=List[SchemaOportunidad])
 async def get_my_oportunidades(
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Obtiene una lista de todas las oportunidades de trabajo publicadas por la empresa del usuario actual.
@@ -76,16 +97,88 @@ async def get_my_oportunidades(
             detail="Solo las empresas pueden ver sus oportunidades."
         )
     
-    empresa = db.query(DBEmpresa).filter(DBEmpresa.usuario_id == current_user.id).first()
-    if not empresa:
+    if not current_user.empresa_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de empresa no encontrado."
         )
 
-    return empresa.oportunidades
+    oportunidades = db.query(DBOportunidad).filter(DBOportunidad.empresa_id == current_user.empresa_id).all()
+    return respuesta_modelos(SchemaOportunidad, oportunidades)
+
+def _principal_stream(request: Request, ticket: Optional[str] = None) -> Principal:
+    """
+    Como `get_current_principal`, pero acepta también `?ticket=` (ver POST /stream/ticket)
+    porque EventSource no permite enviar la cabecera Authorization. La sesión se cierra
+    antes de devolver para no retener una conexión durante todo el stream.
+    """
+    autorizacion = request.headers.get("authorization", "")
+    if not autorizacion.lower().startswith("bearer ") and not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales inválidas",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db = SessionLocal()
+    try:
+        if autorizacion.lower().startswith("bearer "):
+            credenciales = HTTPAuthorizationCredentials(scheme="Bearer", credentials=autorizacion[7:])
+            return get_current_principal(credenciales, db)
+        return canjear_ticket(db, ticket, "sse")
+    finally:
+        db.close()
+
+async def _eventos_estudiante(suscripcion):
+    try:
+        # El navegador reintenta a los 5 s si se corta la conexión
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comentario SSE para que proxies y balanceadores no cierren la conexión
+                yield ": ping\n\n"
+                continue
+            yield f"event: oportunidad\ndata: {dumps(evento).decode()}\n\n"
+    finally:
+        broker.cancelar(suscripcion)
+
+@router.post("/stream/ticket")
+async def ticket_stream(current_user: Principal = Depends(get_current_principal)):
+    """
+    Ticket de un solo uso para abrir GET /oportunidades/stream?ticket=... desde un
+    EventSource. Caduca a los SSE_TICKET_TTL_SECONDS segundos; al reconectar hay que
+    pedir uno nuevo. Así el token de acceso no viaja en la URL (ni queda en los logs).
+    """
+    if current_user.tipo != "estudiante" or not current_user.estudiante_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo los estudiantes pueden suscribirse.")
+    return {"ticket": crear_ticket(current_user, "sse", SSE_TICKET_TTL_SECONDS), "expira_en": SSE_TICKET_TTL_SECONDS}
+
+@router.get("/stream")
+async def stream_oportunidades(current_user: Principal = Depends(_principal_stream)):
+    """
+    Stream SSE (text/event-stream) para el estudiante autenticado: envía un evento
+    `oportunidad` con `{tipo, oportunidad, score}` cada vez que se publica o edita una
+    oportunidad activa cuya compatibilidad con él supera SSE_SCORE_MINIMO.
+    Reemplaza el sondeo periódico de /oportunidades/recomendadas/{id}; al reconectar
+    conviene volver a pedir las recomendaciones una vez.
+    """
+    if current_user.tipo != "estudiante" or not current_user.estudiante_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo los estudiantes pueden suscribirse.")
+    # La suscripción se crea aquí y no en el generador: si no hay cupo se responde 429
+    try:
+        suscripcion = broker.suscribir(current_user.estudiante_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return StreamingResponse(
+        _eventos_estudiante(suscripcion),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Si el cliente se desconecta antes de que empiece el generador, su `finally` no corre
+        background=BackgroundTask(broker.cancelar, suscripcion),
+    )
 
-@router.get('/recomendadas/{estudiante_id}')
+@router.get('/recomendadas/{estudiante_id}', response_class=JSONRapidoResponse)
 async def get_recomendadas(estudiante_id: int, db: Session = Depends(get_db)):
     """
     Devuelve una lista de oportunidades activas junto con una puntuación de compatibilidad
@@ -95,65 +188,54 @@ async def get_recomendadas(estudiante_id: int, db: Session = Depends(get_db)):
     if not estudiante:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estudiante no encontrado")
 
-    oportunidades = db.query(DBOportunidad).filter(DBOportunidad.activa == True).all()
+    # Las vencidas se desactivan periódicamente (services/mantenimiento.py); mientras tanto
+    # tampoco se puntúan
+    oportunidades = db.query(DBOportunidad).filter(
+        DBOportunidad.activa == True,
+        or_(DBOportunidad.fecha_cierre.is_(None), DBOportunidad.fecha_cierre >= datetime.datetime.utcnow()),
+    ).all()
 
     recomendaciones = []
+    segundos_scoring = 0.0
     for opp in oportunidades:
+        inicio = time.perf_counter()
         try:
             score = calcular_compatibilidad(estudiante, opp)
         except Exception:
             score = 0.0
-        
-        # Obtener información de la empresa
-        empresa_info = {}
-        if opp.empresa:
-            empresa_info = {
-                "id": opp.empresa.id,
-                "nombre": opp.empresa.nombre,
-                "descripcion": opp.empresa.descripcion,
-                "ubicacion": opp.empresa.ubicacion,
-                "website": opp.empresa.website
-            }
-        
+        segundos_scoring += time.perf_counter() - inicio
+
         recomendaciones.append({
-            "oportunidad": {
-                "id": opp.id,
-                "empresa_id": opp.empresa_id,
-                "empresa": empresa_info,
-                "titulo": opp.titulo,
-                "descripcion": opp.descripcion,
-                "tipo": opp.tipo,
-                "habilidades_requeridas": opp.habilidades_requeridas or [],
-                "semestre_minimo": opp.semestre_minimo,
-                "ubicacion": opp.ubicacion,
-                "modalidad": opp.modalidad,
-                "salario": opp.salario,
-                "activa": opp.activa,
-                "fecha_publicacion": opp.fecha_publicacion
-            },
+            "oportunidad": resumen_oportunidad(opp),
             "score": round(float(score), 2)
         })
 
+    _duracion_scoring.observar(segundos_scoring)
+
     # Ordenar por score descendente
     recomendaciones.sort(key=lambda x: x['score'], reverse=True)
-    return recomendaciones
+    return JSONRapidoResponse(recomendaciones)
 
 @router.get("/{oportunidad_id}", response_model=SchemaOportunidad)
-async def get_oportunidad_by_id(oportunidad_id: int, db: Session = Depends(get_db)):
+async def get_oportunidad_by_id(oportunidad_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Obtiene una oportunidad de trabajo por su ID.
+    Respuesta cacheada con ETag según la versión de la tabla de oportunidades.
     """
-    oportunidad = db.query(DBOportunidad).filter(DBOportunidad.id == oportunidad_id).first()
-    if not oportunidad:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oportunidad no encontrada")
-    return oportunidad
+    def serializar():
+        oportunidad = db.query(DBOportunidad).filter(DBOportunidad.id == oportunidad_id).first()
+        if not oportunidad:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oportunidad no encontrada")
+        return dump_modelo(SchemaOportunidad, oportunidad)
+    return respuesta_catalogo(request, db, ("oportunidades",), f"oportunidades:{oportunidad_id}", serializar)
 
 @router.patch("/{oportunidad_id}", response_model=SchemaOportunidad)
 async def update_oportunidad(
     oportunidad_id: int,
     oportunidad_update: OportunidadUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
 
@@ -164,7 +246,7 @@ async def update_oportunidad(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oportunidad no encontrada")
 
     # Verificar que el usuario es de la empresa que publicó la oportunidad
-    if db_oportunidad.empresa.usuario_id != current_user.id:
+    if db_oportunidad.empresa_id != current_user.empresa_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para editar esta oportunidad."
@@ -176,13 +258,14 @@ async def update_oportunidad(
 
     db.commit()
     db.refresh(db_oportunidad)
+    background_tasks.add_task(publicar_oportunidad, db_oportunidad.id, "actualizada")
     return db_oportunidad
 
 @router.delete("/{oportunidad_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_oportunidad(
     oportunidad_id: int,
     db: Session = Depends(get_db),
-    current_user: SchemaUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Elimina una oportunidad de trabajo. Solo la empresa que la creó puede eliminarla.
@@ -191,7 +274,7 @@ async def delete_oportunidad(
     if not db_oportunidad:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oportunidad no encontrada")
 
-    if db_oportunidad.empresa.usuario_id != current_user.id:
+    if db_oportunidad.empresa_id != current_user.empresa_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para eliminar esta oportunidad."
@@ -0,0 +1,35 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from core.config import PROFILING_DIR
+from core.perfilado import NOMBRE_VALIDO, listar_perfiles
+from security.core import get_current_principal, Principal
+
+router = APIRouter(prefix="/admin/perfiles", tags=["Perfilado"])
+
+
+@router.get("/")
+async def get_perfiles(current_user: Principal = Depends(get_current_principal)):
+    """
+    Perfiles guardados (peticiones con `X-Profile: 1` y ventanas del modo continuo),
+    del más reciente al más antiguo. Solo administradores.
+    """
+    if current_user.tipo != "administrador":
+        raise HTTPException(status_code=403, detail="Solo administradores pueden ver los perfiles.")
+    return listar_perfiles()
+
+
+@router.get("/{nombre}")
+async def get_perfil(nombre: str, current_user: Principal = Depends(get_current_principal)):
+    """
+    Descarga un perfil en formato "folded", listo para `flamegraph.pl perfil.folded > perfil.svg`
+    o para abrirlo en https://www.speedscope.app. Solo administradores.
+    """
+    if current_user.tipo != "administrador":
+        raise HTTPException(status_code=403, detail="Solo administradores pueden ver los perfiles.")
+    ruta = os.path.join(PROFILING_DIR, nombre)
+    if not NOMBRE_VALIDO.match(nombre) or not os.path.isfile(ruta):
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(ruta, media_type="text/plain", filename=nombre)
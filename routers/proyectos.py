@@ -16,13 +16,13 @@ router = APIRouter(
 def add_proyecto_to_current_user(
     proyecto: models.ProyectoCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
-    new_proyecto = database.Proyecto(**proyecto.model_dump(), estudiante_id=estudiante.id)
+    new_proyecto = database.Proyecto(**proyecto.model_dump(), estudiante_id=estudiante_id)
     db.add(new_proyecto)
     db.commit()
     db.refresh(new_proyecto)
@@ -34,15 +34,15 @@ def update_proyecto_for_current_user(
     proyecto_id: int,
     proyecto_update: models.ProyectoCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
     db_proyecto = db.query(database.Proyecto).filter(
         database.Proyecto.id == proyecto_id,
-        database.Proyecto.estudiante_id == estudiante.id
+        database.Proyecto.estudiante_id == estudiante_id
     ).first()
 
     if not db_proyecto:
@@ -60,15 +60,15 @@ def update_proyecto_for_current_user(
 def delete_proyecto_from_current_user(
     proyecto_id: int,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(core.get_current_user)
+    current_user: core.Principal = Depends(core.get_current_principal)
 ):
-    estudiante = current_user.estudiante
-    if not estudiante:
+    estudiante_id = current_user.estudiante_id
+    if not estudiante_id:
         raise HTTPException(status_code=404, detail="Perfil de estudiante no encontrado")
 
     db_proyecto = db.query(database.Proyecto).filter(
         database.Proyecto.id == proyecto_id,
-        database.Proyecto.estudiante_id == estudiante.id
+        database.Proyecto.estudiante_id == estudiante_id
     ).first()
 
     if not db_proyecto:
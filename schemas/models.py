@@ -51,6 +51,15 @@ class Habilidad(HabilidadBase):
     class Config:
         from_attributes = True
 
+class EstadisticaHabilidad(BaseModel):
+    nombre: str
+    demanda: int  # oportunidades activas que la piden
+    oferta: int   # estudiantes que la tienen
+    actualizado: datetime
+
+    class Config:
+        from_attributes = True
+
 class Experiencia(ExperienciaBase):
     id: int
 
@@ -167,6 +176,10 @@ class UserInfo(BaseModel):
 
 class TokenWithUser(Token):
     user: UserInfo
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # --- Modelos de Oportunidades y Vinculaciones ---
 
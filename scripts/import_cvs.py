@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de CVs para una generación completa de estudiantes.
+
+Recibe un directorio (o un .zip) con CVs en PDF/DOC/DOCX, con o sin subcarpetas. Por
+defecto el nombre del archivo (sin extensión) es la matrícula del estudiante:
+`A12345678.pdf`. También se puede pasar un CSV de mapeo con columnas `archivo,matricula`
+(nombre del archivo o ruta relativa). Si dos archivos dan la misma matrícula solo se
+aplica el primero y el otro queda como `duplicada` en el reporte.
+
+Los CVs se parsean en paralelo con un pool de procesos (`parse_cv_con_texto`) y los
+resultados se aplican a las filas de `Estudiante` en transacciones por lote.
+
+Ejecutar desde la raíz del proyecto:
+    python scripts/import_cvs.py cvs_generacion_2025/ --workers 8 --lote 50
+    python scripts/import_cvs.py cvs.zip --mapeo mapeo.csv --reporte reporte.csv
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sqlalchemy.orm import selectinload
+
+# Añadir el directorio raíz del proyecto al sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db.database import SessionLocal, Estudiante as DBEstudiante
+from services.cv_parser import parse_cv_con_texto
+from services.cv_import import aplicar_cv_a_estudiante, guardar_texto_cv, liberar_cvs_huerfanos
+from services.storage import get_storage
+
+EXTENSIONES_PERMITIDAS = (".pdf", ".doc", ".docx")
+
+
+def _parsear(path):
+    """Se ejecuta en un proceso del pool. Devuelve (path, (texto, parsed), error, segundos)."""
+    inicio = time.perf_counter()
+    try:
+        return path, parse_cv_con_texto(path), None, time.perf_counter() - inicio
+    except Exception as e:
+        return path, None, str(e), time.perf_counter() - inicio
+
+
+def recolectar_archivos(origen, destino_tmp):
+    """
+    Lista los CVs del directorio o extrae los del zip en `destino_tmp`, conservando las
+    subcarpetas (dos archivos con el mismo nombre en carpetas distintas no se pisan).
+    Devuelve [(path, ruta relativa al directorio o dentro del zip)].
+    """
+    if zipfile.is_zipfile(origen):
+        with zipfile.ZipFile(origen) as zf:
+            for info in zf.infolist():
+                # Sin componentes vacíos, '.' ni '..': nada se extrae fuera de destino_tmp
+                partes = [p for p in info.filename.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+                if info.is_dir() or not partes or not partes[-1].lower().endswith(EXTENSIONES_PERMITIDAS):
+                    continue
+                destino = os.path.join(destino_tmp, *partes)
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                with zf.open(info) as src, open(destino, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+        base = destino_tmp
+    else:
+        base = origen
+
+    archivos = []
+    for raiz, carpetas, nombres in os.walk(base):
+        carpetas.sort()
+        for nombre in sorted(nombres):
+            if nombre.lower().endswith(EXTENSIONES_PERMITIDAS):
+                path = os.path.join(raiz, nombre)
+                archivos.append((path, os.path.relpath(path, base).replace(os.sep, "/")))
+    return archivos
+
+
+def cargar_mapeo(path_csv):
+    """
+    Lee un CSV `archivo,matricula` y devuelve {archivo: matricula}. `archivo` puede ser
+    el nombre del archivo o su ruta relativa (para distinguir nombres repetidos).
+    """
+    mapeo = {}
+    with open(path_csv, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            archivo = (fila.get('archivo') or '').strip().replace("\\", "/")
+            archivo = "/".join(p for p in archivo.split("/") if p not in ("", "."))
+            matricula = (fila.get('matricula') or '').strip()
+            if archivo and matricula:
+                mapeo[archivo] = matricula
+    return mapeo
+
+
+def _guardar_cv(path):
+    """Guarda el CV en el almacenamiento por contenido y devuelve su clave."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return get_storage().put(data, os.path.splitext(path)[1])
+
+
+def _aplicar_fila(db, db_estudiante, path, resultado, dry_run):
+    """Aplica el CV al estudiante y devuelve la clave del CV que tenía antes (o None)."""
+    texto, parsed = resultado
+    cv_anterior = None
+    if not dry_run:
+        cv_anterior = db_estudiante.cv_path
+        db_estudiante.cv_path = _guardar_cv(path)
+        guardar_texto_cv(db_estudiante, texto)
+    aplicar_cv_a_estudiante(db, db_estudiante, parsed)
+    return cv_anterior
+
+
+def aplicar_lote(lote, dry_run=False):
+    """
+    Aplica un lote de resultados [(matricula, path, (texto, parsed))] en una sola transacción.
+    Si la transacción falla, se reintenta fila por fila para aislar el error.
+    Devuelve una lista de (path, matricula, estado, detalle).
+    """
+    reporte = []
+    db = SessionLocal()
+    try:
+        matriculas = [m for m, _, _ in lote]
+        estudiantes = {
+            e.matricula: e
+            for e in db.query(DBEstudiante)
+            .options(selectinload(DBEstudiante.experiencias))
+            .filter(DBEstudiante.matricula.in_(matriculas))
+            .all()
+        }
+        pendientes = []
+        for matricula, path, resultado in lote:
+            db_estudiante = estudiantes.get(matricula)
+            if db_estudiante is None:
+                reporte.append((path, matricula, "sin_estudiante", "No existe estudiante con esa matrícula"))
+                continue
+            pendientes.append((db_estudiante, matricula, path, resultado))
+
+        try:
+            anteriores = [
+                _aplicar_fila(db, db_estudiante, path, resultado, dry_run)
+                for db_estudiante, matricula, path, resultado in pendientes
+            ]
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+                liberar_cvs_huerfanos(db, anteriores)
+            reporte.extend((path, matricula, "ok", "") for _, matricula, path, _ in pendientes)
+        except Exception:
+            db.rollback()
+            # Reintentar una por una para saber qué filas fallan
+            for db_estudiante, matricula, path, resultado in pendientes:
+                try:
+                    db_estudiante = db.query(DBEstudiante).filter(DBEstudiante.matricula == matricula).first()
+                    cv_anterior = _aplicar_fila(db, db_estudiante, path, resultado, dry_run)
+                    if dry_run:
+                        db.rollback()
+                    else:
+                        db.commit()
+                        liberar_cvs_huerfanos(db, [cv_anterior])
+                    reporte.append((path, matricula, "ok", ""))
+                except Exception as e:
+                    db.rollback()
+                    reporte.append((path, matricula, "error", str(e)))
+    finally:
+        db.close()
+    return reporte
+
+
+def importar(origen, mapeo_csv=None, workers=None, tam_lote=50, path_reporte=None, dry_run=False):
+    inicio = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        archivos = recolectar_archivos(origen, tmp)
+        mapeo = cargar_mapeo(mapeo_csv) if mapeo_csv else None
+
+        trabajos = {}
+        reporte = []
+        relativas = dict(archivos)
+        # matrícula -> archivo que la usa; un segundo archivo con la misma no se aplica
+        origen_matricula = {}
+        for path, relativa in archivos:
+            nombre = os.path.basename(relativa)
+            if mapeo is not None:
+                matricula = mapeo.get(relativa) or mapeo.get(nombre)
+            else:
+                matricula = os.path.splitext(nombre)[0].strip()
+            if not matricula:
+                reporte.append((path, "", "sin_matricula", "El archivo no aparece en el mapeo"))
+                continue
+            if matricula in origen_matricula:
+                reporte.append((path, matricula, "duplicada", f"La matrícula ya corresponde a {origen_matricula[matricula]}"))
+                continue
+            origen_matricula[matricula] = relativa
+            trabajos[path] = matricula
+
+        total = len(trabajos)
+        print(f"Procesando {total} CVs con {workers or os.cpu_count()} procesos (lotes de {tam_lote})...")
+
+        lote = []
+        hechos = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futuros = [executor.submit(_parsear, path) for path in trabajos]
+            for futuro in as_completed(futuros):
+                path, resultado, error, segundos = futuro.result()
+                hechos += 1
+                matricula = trabajos[path]
+                if error:
+                    reporte.append((path, matricula, "error", error))
+                    print(f"[{hechos}/{total}] ✗ {matricula}: {error}")
+                else:
+                    lote.append((matricula, path, resultado))
+                    print(f"[{hechos}/{total}] ✓ {matricula} ({segundos:.2f}s, {len(resultado[1].get('habilidades', []))} habilidades)")
+
+                if len(lote) >= tam_lote:
+                    reporte.extend(aplicar_lote(lote, dry_run))
+                    lote = []
+
+        if lote:
+            reporte.extend(aplicar_lote(lote, dry_run))
+        # En el reporte, la ruta relativa (el nombre solo puede repetirse en varias carpetas)
+        reporte = [(relativas.get(path, path), matricula, estado, detalle) for path, matricula, estado, detalle in reporte]
+
+    _imprimir_resumen(reporte, time.perf_counter() - inicio)
+    if path_reporte:
+        with open(path_reporte, "w", newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["archivo", "matricula", "estado", "detalle"])
+            for path, matricula, estado, detalle in reporte:
+                writer.writerow([path, matricula, estado, detalle])
+        print(f"Reporte guardado en {path_reporte}")
+    return reporte
+
+
+def _imprimir_resumen(reporte, segundos):
+    conteo = {}
+    for _, _, estado, _ in reporte:
+        conteo[estado] = conteo.get(estado, 0) + 1
+    print(f"\n✅ Importación terminada en {segundos:.1f}s")
+    for estado, n in sorted(conteo.items()):
+        print(f"  {estado}: {n}")
+    errores = [r for r in reporte if r[2] != "ok"]
+    for path, matricula, estado, detalle in errores[:20]:
+        print(f"  ✗ {path} ({matricula or '-'}): {estado} {detalle}")
+    if len(errores) > 20:
+        print(f"  ... y {len(errores) - 20} más (ver --reporte)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de CVs por matrícula")
+    parser.add_argument("origen", help="Directorio o archivo .zip con los CVs")
+    parser.add_argument("--mapeo", help="CSV con columnas archivo,matricula")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para parsear (default: núcleos)")
+    parser.add_argument("--lote", type=int, default=50, help="Estudiantes por transacción")
+    parser.add_argument("--reporte", help="Ruta del CSV de reporte de resultados")
+    parser.add_argument("--dry-run", action="store_true", help="Parsear sin guardar cambios")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.origen):
+        print(f"No existe {args.origen}")
+        return 1
+    reporte = importar(args.origen, args.mapeo, args.workers, args.lote, args.reporte, args.dry_run)
+    return 0 if all(r[2] == "ok" for r in reporte) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Alta masiva de estudiantes desde un CSV (una generación completa de una vez).
+
+Columnas: email,nombre,apellido,password y, opcionalmente, matricula,semestre,carrera.
+Las contraseñas se hashean en paralelo y las filas se insertan en transacciones por lote.
+
+Ejecutar desde la raíz del proyecto:
+    python scripts/import_usuarios.py alumnos_2025.csv --lote 200 --reporte errores.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.user_import import importar_estudiantes_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alta masiva de estudiantes desde CSV")
+    parser.add_argument("csv", help="Archivo CSV con los estudiantes")
+    parser.add_argument("--lote", type=int, default=200, help="Filas por transacción")
+    parser.add_argument("--workers", type=int, default=None, help="Hilos para hashear contraseñas (default: núcleos)")
+    parser.add_argument("--reporte", help="Ruta del CSV con las filas que no se crearon")
+    parser.add_argument("--dry-run", action="store_true", help="Validar sin guardar cambios")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"No existe {args.csv}")
+        return 1
+
+    inicio = time.perf_counter()
+    with open(args.csv, encoding="utf-8-sig", newline="") as f:
+        try:
+            resultado = importar_estudiantes_csv(f, args.lote, args.workers, args.dry_run)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return 1
+
+    print(f"\n✅ Importación terminada en {time.perf_counter() - inicio:.1f}s")
+    print(f"  filas: {resultado['total']}")
+    print(f"  creados: {resultado['creados']}{' (dry-run)' if args.dry_run else ''}")
+    print(f"  con error: {resultado['errores']}")
+    for r in resultado["filas"][:20]:
+        print(f"  ✗ fila {r['fila']} ({r['email'] or '-'}): {r['estado']} {r['detalle']}")
+    if len(resultado["filas"]) > 20:
+        print(f"  ... y {len(resultado['filas']) - 20} más (ver --reporte)")
+
+    if args.reporte:
+        with open(args.reporte, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["fila", "email", "estado", "detalle"])
+            writer.writeheader()
+            writer.writerows(resultado["filas"])
+        print(f"Reporte guardado en {args.reporte}")
+    return 0 if resultado["errores"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Worker de mantenimiento aparte de la API (ver services/mantenimiento.py).
+
+Sin argumentos ejecuta el planificador en primer plano hasta Ctrl+C / SIGTERM; usa el
+mismo candado que el planificador en proceso, así que puede convivir con la API. Lo
+normal es desactivar el de la API (MAINTENANCE_IN_PROCESS=false) y dejar este como
+único responsable, p. ej. como un proceso `worker` en el Procfile.
+
+Con --una-vez ejecuta las tareas indicadas (o todas) una sola vez y termina, útil
+desde cron o a mano. También toma el candado: si otro proceso lo tiene (el planificador
+de la API o este mismo script) no ejecuta nada y termina con código 1.
+
+Ejecutar desde la raíz del proyecto:
+    python scripts/mantenimiento.py
+    python scripts/mantenimiento.py --una-vez cerrar_vencidas estadisticas_habilidades
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.mantenimiento import TAREAS, Planificador, ejecutar_tarea
+
+
+def main():
+    nombres = [t.nombre for t in TAREAS]
+    parser = argparse.ArgumentParser(description="Tareas de mantenimiento de la base de datos")
+    parser.add_argument("--una-vez", nargs="*", metavar="TAREA", choices=nombres,
+                        help=f"Ejecutar una vez y terminar (por defecto todas: {', '.join(nombres)})")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    planificador = Planificador(TAREAS)
+    if args.una_vez is not None:
+        if not planificador._tomar_candado():
+            print(f"✗ Otro proceso tiene el candado {planificador.archivo_candado}; no se ejecutó ninguna tarea")
+            return 1
+        errores = 0
+        try:
+            for tarea in TAREAS:
+                if args.una_vez and tarea.nombre not in args.una_vez:
+                    continue
+                inicio = time.perf_counter()
+                filas = ejecutar_tarea(tarea)
+                if filas is None:
+                    errores += 1
+                    print(f"✗ {tarea.nombre}: falló (ver el log)")
+                else:
+                    print(f"✓ {tarea.nombre}: {filas} filas en {time.perf_counter() - inicio:.2f}s")
+        finally:
+            planificador._soltar_candado()
+        return 0 if errores == 0 else 2
+
+    # SIGTERM (docker stop, Railway) termina igual que Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: planificador.detener())
+    print(f"✓ Planificador de mantenimiento iniciado: {', '.join(f'{t.nombre} cada {t.intervalo:.0f}s' for t in planificador.tareas)}")
+    try:
+        planificador.ejecutar()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Script para mover los CVs guardados como `uploaded_cvs/cv_{id}.ext` al almacenamiento
+por contenido (services/storage.py) y actualizar `Estudiante.cv_path` con la clave.
+Los archivos originales no se borran.
+Ejecutar: python scripts/migrate_cvs_to_storage.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db.database import SessionLocal, Estudiante
+from services.storage import get_storage, es_clave
+
+
+def migrate():
+    """Sube cada CV con ruta de archivo al almacenamiento configurado."""
+    storage = get_storage()
+    db = SessionLocal()
+    migrados = 0
+    try:
+        estudiantes = db.query(Estudiante).filter(Estudiante.cv_path.isnot(None)).all()
+        for est in estudiantes:
+            if es_clave(est.cv_path):
+                continue
+            if not os.path.exists(est.cv_path):
+                print(f"✗ Estudiante {est.id}: no existe {est.cv_path}")
+                continue
+            with open(est.cv_path, "rb") as f:
+                clave = storage.put(f.read(), os.path.splitext(est.cv_path)[1])
+            print(f"✓ Estudiante {est.id}: {est.cv_path} → {clave}")
+            est.cv_path = clave
+            migrados += 1
+        db.commit()
+        print(f"\n✅ {migrados} CVs migrados al almacenamiento por contenido")
+        return True
+    except Exception as e:
+        print(f"✗ Error durante la migración: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    success = migrate()
+    exit(0 if success else 1)
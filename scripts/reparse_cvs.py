@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Re-parseo de todos los CVs a partir del texto ya extraído (`Estudiante.cv_texto`),
+sin volver a leer los PDF/DOCX. Útil después de cambiar `simple_parse_sections`.
+
+Con --extraer-faltantes primero se extrae y guarda el texto de los CVs subidos
+antes de que existiera la columna (esto sí lee los archivos, una única vez).
+
+Ejecutar desde la raíz del proyecto:
+    python scripts/reparse_cvs.py --lote 200
+    python scripts/reparse_cvs.py --extraer-faltantes --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import load_only
+
+from db.database import SessionLocal, Estudiante as DBEstudiante
+from services.cv_parser import extract_text
+from services.cv_import import guardar_texto_cv, reparsear_textos_guardados
+from services.storage import ruta_local_cv
+
+
+def extraer_faltantes(tam_lote=50):
+    """Extrae y guarda el texto de los CVs que aún no lo tienen. Devuelve cuántos se guardaron."""
+    guardados = 0
+    ultimo_id = 0
+    while True:
+        db = SessionLocal()
+        try:
+            lote = (
+                db.query(DBEstudiante)
+                .options(load_only(DBEstudiante.id, DBEstudiante.cv_path))
+                .filter(DBEstudiante.id > ultimo_id, DBEstudiante.cv_path.isnot(None),
+                        DBEstudiante.cv_texto.is_(None))
+                .order_by(DBEstudiante.id)
+                .limit(tam_lote)
+                .all()
+            )
+            if not lote:
+                return guardados
+            for est in lote:
+                try:
+                    with ruta_local_cv(est.cv_path) as path:
+                        texto = extract_text(path)
+                except Exception as e:
+                    print(f"✗ Estudiante {est.id}: {e}")
+                    continue
+                if texto:
+                    guardar_texto_cv(est, texto)
+                    guardados += 1
+            db.commit()
+            ultimo_id = lote[-1].id
+            print(f"  ... texto extraído hasta el estudiante {ultimo_id} ({guardados} guardados)")
+        finally:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parseo de CVs desde el texto guardado")
+    parser.add_argument("--lote", type=int, default=200, help="Estudiantes por transacción")
+    parser.add_argument("--desde-id", type=int, default=0, help="Continuar después de este id de estudiante")
+    parser.add_argument("--extraer-faltantes", action="store_true",
+                        help="Extraer antes el texto de los CVs que no lo tienen guardado")
+    parser.add_argument("--dry-run", action="store_true", help="Parsear sin guardar cambios en los perfiles")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.extraer_faltantes:
+        print(f"✓ Texto guardado para {extraer_faltantes()} CVs")
+    try:
+        estado = reparsear_textos_guardados(args.lote, args.dry_run, args.desde_id)
+    except RuntimeError as e:
+        # Otro proceso (la API o este mismo script) tiene el candado del re-parseo
+        print(f"✗ {e}")
+        return 1
+    print(f"\n✅ Re-parseo terminado en {time.perf_counter() - inicio:.1f}s")
+    print(f"  procesados: {estado['procesados']}")
+    print(f"  errores: {estado['errores']}")
+    return 0 if estado["errores"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
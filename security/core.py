@@ -1,21 +1,45 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, object_session
 
 # Importar configuración centralizada
-from core.config import SECRET_KEY, ALGORITHM
+from core.config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES,
+    AUTH_STATELESS_TOKENS, AUTH_REVOCATION_TTL_SECONDS,
+    ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE,
+)
 
 # Importar modelos y "base de datos" para buscar al usuario
+from core import metricas
 from schemas.models import User
-from db.database import get_db, User as DBUser
+from db.database import (
+    get_db, SessionLocal, User as DBUser, Estudiante as DBEstudiante, Empresa as DBEmpresa,
+    TokenRevocado as DBTokenRevocado, RevocacionUsuario as DBRevocacionUsuario,
+)
 
 # --- Configuración de Hashing de Contraseñas ---
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
 
 # --- Mecanismo de Seguridad de FastAPI ---
 security = HTTPBearer()
@@ -29,6 +53,54 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Compara una contraseña en texto plano con su versión hasheada usando Argon2."""
     return pwd_context.verify(plain_password, hashed_password)
 
+# --- Hashing fuera del event loop ---
+# Argon2 es costoso a propósito: en endpoints async se ejecuta en un pool de hilos
+# propio (argon2-cffi libera el GIL, así que escala con los núcleos) con una cola acotada.
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="argon2")
+_hash_pendientes = 0
+_hash_lock = threading.Lock()
+
+
+def estado_hashing() -> dict:
+    """Operaciones de hashing en curso o en cola y tamaño del pool."""
+    return {"pendientes": _hash_pendientes, "workers": PASSWORD_HASH_WORKERS, "max_cola": PASSWORD_HASH_MAX_QUEUE}
+
+
+metricas.medidor("password_hash_pending", "Hashes de Argon2 en curso o en cola", lambda: _hash_pendientes)
+metricas.medidor("password_hash_workers", "Hilos del pool de hashing", lambda: PASSWORD_HASH_WORKERS)
+
+
+async def _en_pool_hashing(func, *args):
+    """Ejecuta `func` en el pool de hashing; 503 con Retry-After si la cola está llena."""
+    global _hash_pendientes
+    with _hash_lock:
+        if _hash_pendientes >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                headers={"Retry-After": "1"},
+            )
+        _hash_pendientes += 1
+    try:
+        return await asyncio.wrap_future(_hash_executor.submit(func, *args))
+    finally:
+        with _hash_lock:
+            _hash_pendientes -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` sin bloquear el event loop."""
+    return await _en_pool_hashing(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña sin bloquear el event loop. Si es correcta pero el hash usa
+    parámetros de Argon2 distintos a los configurados, devuelve también el hash nuevo
+    para guardarlo: (valida, nuevo_hash o None).
+    """
+    return await _en_pool_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crea un JSON Web Token (JWT) para la autenticación."""
     to_encode = data.copy()
@@ -36,7 +108,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # jti identifica el token (para revocarlo) e iat permite revocar todos los de un usuario
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -64,7 +137,332 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     # Buscar al usuario en la base de datos
     usuario = db.query(DBUser).filter(DBUser.email == email).first()
-    if usuario is None:
+    if usuario is None or token_revocado(payload, usuario.id, db):
         raise credentials_exception
         
     return usuario
+
+
+# --- Principal: identidad del usuario autenticado sin cargar el modelo completo ---
+
+@dataclass(frozen=True)
+class Principal:
+    """Datos mínimos del usuario autenticado (lo que necesitan la mayoría de endpoints)."""
+    id: int
+    email: str
+    tipo: str
+    activo: bool
+    estudiante_id: Optional[int] = None
+    empresa_id: Optional[int] = None
+
+
+# email -> (expira_en, Principal). OrderedDict como LRU: el más reciente va al final.
+_principales: "OrderedDict[str, tuple]" = OrderedDict()
+_principales_lock = threading.Lock()
+
+
+def _principal_en_cache(email: str) -> Optional[Principal]:
+    with _principales_lock:
+        entrada = _principales.get(email)
+        if entrada is None:
+            return None
+        if entrada[0] < time.monotonic():
+            del _principales[email]
+            return None
+        _principales.move_to_end(email)
+        return entrada[1]
+
+
+def _guardar_principal(principal: Principal) -> None:
+    if AUTH_CACHE_TTL_SECONDS <= 0:
+        return
+    with _principales_lock:
+        _principales[principal.email] = (time.monotonic() + AUTH_CACHE_TTL_SECONDS, principal)
+        _principales.move_to_end(principal.email)
+        while len(_principales) > AUTH_CACHE_MAX_ENTRIES:
+            _principales.popitem(last=False)
+
+
+def invalidar_principal(email: Optional[str] = None) -> None:
+    """Quita un usuario de la caché de principales (o vacía la caché si no se indica email)."""
+    with _principales_lock:
+        if email is None:
+            _principales.clear()
+        else:
+            _principales.pop(email, None)
+
+
+# Las invalidaciones se aplican al confirmar la transacción (no durante el flush): si se
+# aplicaran antes, otra petición podría volver a guardar en caché el usuario sin el cambio.
+# Mientras tanto se acumulan en `session.info`, igual que las versiones de los catálogos.
+
+@event.listens_for(DBUser, "after_update")
+def _invalidar_al_editar_usuario(mapper, connection, target):
+    """
+    Cualquier cambio de un usuario (rol, activo, email...) invalida su principal en caché.
+    Si cambian datos que viajan en los tokens sin estado, se revocan los ya emitidos.
+    """
+    info = object_session(target).info
+    estado = inspect(target)
+    emails = info.setdefault("principales_modificados", set())
+    emails.add(target.email)
+    emails.update(estado.attrs.email.history.deleted or ())
+    if any(estado.attrs[attr].history.has_changes() for attr in ("email", "tipo", "activo")):
+        info.setdefault("usuarios_revocados", {})[target.id] = revocar_tokens_de_usuario(connection, target.id)
+
+
+@event.listens_for(DBUser, "after_delete")
+def _invalidar_al_borrar_usuario(mapper, connection, target):
+    object_session(target).info.setdefault("principales_modificados", set()).add(target.email)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _aplicar_cambios_de_usuarios(session):
+    for email in session.info.pop("principales_modificados", ()):
+        invalidar_principal(email)
+    revocados = session.info.pop("usuarios_revocados", None)
+    if revocados:
+        with _revocacion_lock:
+            for usuario_id, desde in revocados.items():
+                _revocado_desde[usuario_id] = max(desde, _revocado_desde.get(usuario_id, desde))
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_cambios_de_usuarios(session):
+    session.info.pop("principales_modificados", None)
+    session.info.pop("usuarios_revocados", None)
+
+
+def cargar_principal(db: Session, email: str) -> Optional[Principal]:
+    """Resuelve el principal de un email con una sola consulta (usuario + ids de perfil)."""
+    fila = (
+        db.query(DBUser.id, DBUser.email, DBUser.tipo, DBUser.activo, DBEstudiante.id, DBEmpresa.id)
+        .outerjoin(DBEstudiante, DBEstudiante.usuario_id == DBUser.id)
+        .outerjoin(DBEmpresa, DBEmpresa.usuario_id == DBUser.id)
+        .filter(DBUser.email == email)
+        .first()
+    )
+    if fila is None:
+        return None
+    user_id, email, tipo, activo, estudiante_id, empresa_id = fila
+    return Principal(
+        id=user_id,
+        email=email,
+        tipo=getattr(tipo, "value", tipo),
+        activo=activo is not False,
+        estudiante_id=estudiante_id,
+        empresa_id=empresa_id,
+    )
+
+
+def claims_de_principal(principal: Principal) -> dict:
+    """Claims para `create_access_token`; en modo sin estado incluye rol e ids de perfil."""
+    claims = {"sub": principal.email}
+    if AUTH_STATELESS_TOKENS:
+        claims.update({
+            "uid": principal.id,
+            "tipo": principal.tipo,
+            "est_id": principal.estudiante_id,
+            "emp_id": principal.empresa_id,
+        })
+    return claims
+
+
+# --- Revocación de tokens ---
+# Las revocaciones se guardan en la base de datos (tokens_revocados, revocaciones_usuarios)
+# para que valgan en todos los workers. Cada proceso consulta una copia local que relee
+# cada AUTH_REVOCATION_TTL_SECONDS; las hechas en este proceso se aplican al instante.
+# jti -> exp de los tokens revocados uno a uno (logout)
+_jti_revocados: dict = {}
+# usuario_id -> instante a partir del cual los tokens emitidos antes no son válidos
+_revocado_desde: dict = {}
+_revocaciones_leidas_en = float("-inf")
+_revocacion_lock = threading.Lock()
+
+
+def _sincronizar_revocaciones(db: Session) -> None:
+    """Relee las revocaciones vigentes si la copia local caducó."""
+    global _revocaciones_leidas_en
+    if time.monotonic() - _revocaciones_leidas_en < AUTH_REVOCATION_TTL_SECONDS:
+        return
+    ahora = time.time()
+    # Una revocación por usuario más vieja que la vigencia de los tokens ya no rechaza ninguno
+    limite = ahora - ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    jtis = dict(db.query(DBTokenRevocado.jti, DBTokenRevocado.expira).filter(DBTokenRevocado.expira >= ahora))
+    usuarios = dict(
+        db.query(DBRevocacionUsuario.usuario_id, DBRevocacionUsuario.desde)
+        .filter(DBRevocacionUsuario.desde >= limite)
+    )
+    with _revocacion_lock:
+        # Se conservan las locales que todavía no se vean en la lectura (commit en curso)
+        for jti, exp in _jti_revocados.items():
+            if exp >= ahora:
+                jtis.setdefault(jti, exp)
+        for usuario_id, desde in _revocado_desde.items():
+            if desde >= limite and desde > usuarios.get(usuario_id, float("-inf")):
+                usuarios[usuario_id] = desde
+        _jti_revocados.clear()
+        _jti_revocados.update(jtis)
+        _revocado_desde.clear()
+        _revocado_desde.update(usuarios)
+        _revocaciones_leidas_en = time.monotonic()
+
+
+def revocar_token(payload: dict, db: Session) -> None:
+    """Revoca un token concreto (por su jti) hasta que expire (hace commit)."""
+    jti = payload.get("jti")
+    if not jti:
+        return
+    expira = float(payload.get("exp", time.time()))
+    with _revocacion_lock:
+        _jti_revocados[jti] = expira
+    db.merge(DBTokenRevocado(jti=jti, expira=expira))
+    db.commit()
+
+
+def revocar_tokens_de_usuario(conexion, usuario_id: int) -> float:
+    """
+    Invalida todos los tokens emitidos hasta ahora para el usuario. Se escribe con
+    `conexion`, dentro de la transacción que hizo el cambio; este proceso la aplica al
+    confirmarse (ver `_aplicar_cambios_de_usuarios`). Devuelve el instante de la revocación.
+    """
+    desde = time.time()
+    stmt = sqlite_insert(DBRevocacionUsuario).values(usuario_id=usuario_id, desde=desde)
+    conexion.execute(stmt.on_conflict_do_update(index_elements=[DBRevocacionUsuario.usuario_id], set_={"desde": desde}))
+    return desde
+
+
+def token_revocado(payload: dict, usuario_id: Optional[int], db: Session) -> bool:
+    _sincronizar_revocaciones(db)
+    if payload.get("jti") in _jti_revocados:
+        return True
+    desde = _revocado_desde.get(usuario_id) if usuario_id is not None else None
+    return desde is not None and payload.get("iat", 0) <= desde
+
+
+def purgar_revocaciones(db: Session) -> int:
+    """Borra las revocaciones que ya no pueden rechazar ningún token. Devuelve cuántas."""
+    ahora = time.time()
+    borradas = db.query(DBTokenRevocado).filter(DBTokenRevocado.expira < ahora).delete()
+    borradas += (
+        db.query(DBRevocacionUsuario)
+        .filter(DBRevocacionUsuario.desde < ahora - ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        .delete()
+    )
+    db.commit()
+    return borradas
+
+
+def decodificar_token(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decodifica y valida el JWT; lanza 401 si es inválido o expiró."""
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except (jwt.PyJWTError, jwt.ExpiredSignatureError):
+        payload = None
+    if not payload or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales inválidas",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def _principal_de_claims(payload: dict) -> Optional[Principal]:
+    """Principal construido solo con los claims del token (modo sin estado)."""
+    if not AUTH_STATELESS_TOKENS or "uid" not in payload or "tipo" not in payload:
+        return None
+    return Principal(
+        id=payload["uid"],
+        email=payload["sub"],
+        tipo=payload["tipo"],
+        activo=True,
+        estudiante_id=payload.get("est_id"),
+        empresa_id=payload.get("emp_id"),
+    )
+
+
+def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> Principal:
+    """
+    Como `get_current_user`, pero devuelve un `Principal` en lugar del modelo de la
+    base de datos. Usar en endpoints que solo necesitan la identidad, el rol o los ids
+    de perfil.
+    - Con AUTH_STATELESS_TOKENS y un token con claims de rol, no consulta la base de datos.
+    - Si no, el principal se guarda en una caché con TTL y tamaño acotado, así que la
+      mayoría de peticiones autenticadas tampoco la consultan.
+    En ambos casos se rechazan los tokens revocados (logout, cambio de rol, desactivación).
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Credenciales inválidas",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decodificar_token(credentials)
+    email: str = payload["sub"]
+
+    principal = _principal_de_claims(payload)
+    if principal is None:
+        principal = _principal_en_cache(email)
+    if principal is None:
+        principal = cargar_principal(db, email)
+        if principal is None:
+            raise credentials_exception
+        _guardar_principal(principal)
+
+    if token_revocado(payload, principal.id, db):
+        raise credentials_exception
+    if not principal.activo:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuario inactivo")
+    return principal
+
+
+# --- Tickets de un solo uso ---
+# Para clientes que no pueden enviar la cabecera Authorization (EventSource): en lugar
+# del token de acceso se pasa en la URL un ticket firmado de vida corta, que solo sirve
+# para `uso` (claim `aud`, que hace que no valga como token de acceso) y una sola vez.
+
+def crear_ticket(principal: Principal, uso: str, segundos: float) -> str:
+    ahora = time.time()
+    return jwt.encode({
+        "sub": principal.email,
+        "uid": principal.id,
+        "tipo": principal.tipo,
+        "est_id": principal.estudiante_id,
+        "emp_id": principal.empresa_id,
+        "aud": uso,
+        "iat": ahora,
+        "exp": ahora + segundos,
+        "jti": uuid.uuid4().hex,
+    }, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def canjear_ticket(db: Session, ticket: str, uso: str) -> Principal:
+    """Valida el ticket y lo marca como usado (hace commit). 401 si no es válido, expiró o ya se usó."""
+    invalido = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Ticket inválido",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM], audience=uso)
+    except jwt.PyJWTError:
+        raise invalido
+    if token_revocado(payload, payload.get("uid"), db):
+        raise invalido
+    # El jti se registra como revocado: si ya estaba (en cualquier worker) el ticket ya se usó
+    db.add(DBTokenRevocado(jti=payload["jti"], expira=float(payload["exp"])))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise invalido
+    with _revocacion_lock:
+        _jti_revocados[payload["jti"]] = float(payload["exp"])
+    return Principal(
+        id=payload["uid"],
+        email=payload["sub"],
+        tipo=payload["tipo"],
+        activo=True,
+        estudiante_id=payload.get("est_id"),
+        empresa_id=payload.get("emp_id"),
+    )
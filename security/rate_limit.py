@@ -0,0 +1,166 @@
+"""
+Limitación de peticiones (rate limiting) con token buckets.
+
+Cada regla asocia un método + patrón de ruta con una capacidad (ráfaga permitida) y
+un periodo de recarga, y se aplica por IP o por usuario (el `sub` del token; si la
+petición no trae un token válido se usa la IP). Al agotarse el bucket se responde 429
+con `Retry-After`.
+
+El estado vive en memoria del proceso (`MemoryBackend`, acotado en tamaño). Para
+compartir los límites entre varios workers o instancias basta con implementar
+`RateLimitBackend.consumir` sobre un almacén común (p. ej. Redis).
+"""
+import abc
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import jwt
+
+from core.config import (
+    SECRET_KEY, ALGORITHM, RATE_LIMIT_RULES, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_TRUST_PROXY,
+)
+
+
+@dataclass(frozen=True)
+class Regla:
+    metodo: str
+    patron: "re.Pattern"
+    capacidad: int        # peticiones permitidas en ráfaga
+    periodo: float        # segundos para recargar la capacidad completa
+    por: str = "ip"       # "ip" | "usuario"
+
+    @property
+    def recarga_por_segundo(self) -> float:
+        return self.capacidad / self.periodo
+
+
+def parse_reglas(texto: str) -> List[Regla]:
+    """
+    Interpreta reglas con el formato `MÉTODO RUTA=CAPACIDAD/SEGUNDOS[:ip|usuario]`
+    separadas por `;`. La ruta es una expresión regular completa, p. ej.:
+        POST /auth/login=10/60:ip; POST /estudiantes/[^/]+/upload_cv=5/60:usuario
+    """
+    reglas = []
+    for parte in texto.split(";"):
+        parte = parte.strip()
+        if not parte:
+            continue
+        ruta, _, limite = parte.rpartition("=")
+        metodo, _, patron = ruta.strip().partition(" ")
+        limite, _, por = limite.partition(":")
+        capacidad, _, periodo = limite.partition("/")
+        reglas.append(Regla(
+            metodo=metodo.upper(),
+            patron=re.compile(patron.strip() + "$"),
+            capacidad=int(capacidad),
+            periodo=float(periodo),
+            por=(por.strip() or "ip"),
+        ))
+    return reglas
+
+
+class RateLimitBackend(abc.ABC):
+    """Interfaz del almacén de buckets."""
+
+    @abc.abstractmethod
+    def consumir(self, clave: str, capacidad: int, recarga_por_segundo: float) -> Tuple[bool, float]:
+        """Consume un token del bucket `clave`. Devuelve (permitido, segundos hasta el siguiente token)."""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Buckets en memoria: clave -> (tokens, último instante). Se guardan como tuplas en un
+    OrderedDict usado como LRU, de modo que el número de claves (IPs/usuarios) está acotado.
+    """
+
+    def __init__(self, max_claves: int = RATE_LIMIT_MAX_KEYS):
+        self.max_claves = max_claves
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, clave: str, capacidad: int, recarga_por_segundo: float) -> Tuple[bool, float]:
+        ahora = time.monotonic()
+        with self._lock:
+            tokens, ultimo = self._buckets.pop(clave, (float(capacidad), ahora))
+            tokens = min(float(capacidad), tokens + (ahora - ultimo) * recarga_por_segundo)
+            permitido = tokens >= 1.0
+            if permitido:
+                tokens -= 1.0
+            self._buckets[clave] = (tokens, ahora)
+            if len(self._buckets) > self.max_claves:
+                self._buckets.popitem(last=False)
+        espera = 0.0 if permitido else (1.0 - tokens) / recarga_por_segundo
+        return permitido, espera
+
+
+def _cabecera(scope, nombre: bytes) -> Optional[str]:
+    for clave, valor in scope.get("headers", []):
+        if clave == nombre:
+            return valor.decode("latin-1")
+    return None
+
+
+def ip_cliente(scope) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        reenviado = _cabecera(scope, b"x-forwarded-for")
+        if reenviado:
+            return reenviado.split(",")[0].strip()
+    cliente = scope.get("client")
+    return cliente[0] if cliente else "desconocido"
+
+
+def usuario_de_token(scope) -> Optional[str]:
+    """`sub` del token Bearer si la firma es válida (sin consultar la base de datos)."""
+    autorizacion = _cabecera(scope, b"authorization")
+    if not autorizacion or not autorizacion.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.decode(autorizacion[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.PyJWTError:
+        return None
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI que aplica las reglas antes de llegar al endpoint."""
+
+    def __init__(self, app, reglas: Optional[List[Regla]] = None, backend: Optional[RateLimitBackend] = None):
+        self.app = app
+        self.reglas = parse_reglas(RATE_LIMIT_RULES) if reglas is None else reglas
+        self.backend = backend or MemoryBackend()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.reglas:
+            await self.app(scope, receive, send)
+            return
+        metodo, ruta = scope["method"], scope["path"]
+        for i, regla in enumerate(self.reglas):
+            if regla.metodo != metodo or not regla.patron.match(ruta):
+                continue
+            sujeto = usuario_de_token(scope) if regla.por == "usuario" else None
+            clave = f"{i}:u:{sujeto}" if sujeto else f"{i}:ip:{ip_cliente(scope)}"
+            permitido, espera = self.backend.consumir(clave, regla.capacidad, regla.recarga_por_segundo)
+            if not permitido:
+                await self._responder_429(send, max(1, math.ceil(espera)))
+                return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _responder_429(send, retry_after: int):
+        cuerpo = json.dumps({"detail": "Demasiadas peticiones, intenta más tarde"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
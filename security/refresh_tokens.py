@@ -0,0 +1,145 @@
+"""
+Refresh tokens con rotación.
+
+El token que recibe el cliente es un valor aleatorio opaco; en la base de datos solo
+se guarda su sha256 (columna indexada), así que renovar el acceso es una búsqueda por
+índice en lugar de una verificación de Argon2.
+
+Cada uso rota el token: el presentado se marca como revocado y se emite uno nuevo de la
+misma familia. Si se presenta un token ya rotado (posible robo), se revoca la familia
+completa. Los hashes revocados se recuerdan en memoria hasta su expiración para
+rechazarlos sin consultar la base de datos.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from core.config import REFRESH_TOKEN_EXPIRE_DAYS
+from db.database import RefreshToken as DBRefreshToken
+
+# sha256 del token -> (expira en epoch, familia). Conjunto de revocados con TTL.
+_revocados: dict = {}
+# familia -> expira en epoch, para las familias revocadas completas (reuso o logout)
+_familias_revocadas: dict = {}
+_revocados_lock = threading.Lock()
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _epoch(fecha: datetime) -> float:
+    """Las fechas se guardan en UTC sin zona horaria (datetime.utcnow)."""
+    return fecha.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _recordar_revocado(token_hash: str, expira: datetime, familia: str) -> None:
+    ahora = time.time()
+    with _revocados_lock:
+        _revocados[token_hash] = (_epoch(expira), familia)
+        # Purga perezosa de los que ya expiraron
+        if len(_revocados) % 256 == 0:
+            for clave in [h for h, (exp, _) in _revocados.items() if exp < ahora]:
+                del _revocados[clave]
+            for clave in [f for f, exp in _familias_revocadas.items() if exp < ahora]:
+                del _familias_revocadas[clave]
+
+
+def _familia_revocada_en_memoria(token_hash: str) -> Optional[str]:
+    """Familia del token si se sabe (en memoria) que fue revocado; None si no."""
+    entrada = _revocados.get(token_hash)
+    if entrada is None or entrada[0] < time.time():
+        return None
+    return entrada[1]
+
+
+def _invalido() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def emitir_refresh_token(db: Session, usuario_id: int, familia: Optional[str] = None) -> str:
+    """Crea un refresh token para el usuario (no hace commit) y devuelve el valor en claro."""
+    token = secrets.token_urlsafe(32)
+    db.add(DBRefreshToken(
+        token_hash=_hash(token),
+        usuario_id=usuario_id,
+        familia=familia or secrets.token_hex(16),
+        expira=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def _revocar_familia(db: Session, familia: str) -> None:
+    if familia in _familias_revocadas:
+        return
+    expira_max = time.time()
+    for fila in db.query(DBRefreshToken).filter(DBRefreshToken.familia == familia, DBRefreshToken.revocado == False):
+        fila.revocado = True
+        _recordar_revocado(fila.token_hash, fila.expira, familia)
+        expira_max = max(expira_max, _epoch(fila.expira))
+    with _revocados_lock:
+        _familias_revocadas[familia] = expira_max
+
+
+def rotar_refresh_token(db: Session, token: str) -> Tuple[int, str]:
+    """
+    Valida `token`, lo revoca y emite uno nuevo de la misma familia (hace commit).
+    Devuelve (usuario_id, nuevo_token). Lanza 401 si no es válido.
+    """
+    token_hash = _hash(token)
+    familia = _familia_revocada_en_memoria(token_hash)
+    if familia is not None:
+        # Token ya usado: sin consultar la base de datos si la familia ya está revocada
+        if familia not in _familias_revocadas:
+            _revocar_familia(db, familia)
+            db.commit()
+        raise _invalido()
+    fila = db.query(DBRefreshToken).filter(DBRefreshToken.token_hash == token_hash).first()
+    if fila is None or fila.expira < datetime.utcnow():
+        raise _invalido()
+    if fila.revocado:
+        # Reutilización de un token ya rotado: se invalida toda la familia
+        _revocar_familia(db, fila.familia)
+        db.commit()
+        raise _invalido()
+
+    # Revocación condicional: de dos peticiones concurrentes con el mismo token solo una
+    # actualiza la fila; la otra se trata como reutilización
+    rotados = (
+        db.query(DBRefreshToken)
+        .filter(DBRefreshToken.token_hash == token_hash, DBRefreshToken.revocado == False)
+        .update({DBRefreshToken.revocado: True}, synchronize_session=False)
+    )
+    if rotados != 1:
+        _revocar_familia(db, fila.familia)
+        db.commit()
+        raise _invalido()
+    _recordar_revocado(token_hash, fila.expira, fila.familia)
+    nuevo = emitir_refresh_token(db, fila.usuario_id, fila.familia)
+    db.commit()
+    return fila.usuario_id, nuevo
+
+
+def revocar_refresh_token(db: Session, token: str) -> None:
+    """Revoca la familia del token (logout). No falla si el token no existe."""
+    fila = db.query(DBRefreshToken).filter(DBRefreshToken.token_hash == _hash(token)).first()
+    if fila is not None:
+        _revocar_familia(db, fila.familia)
+        db.commit()
+
+
+def purgar_refresh_tokens(db: Session) -> int:
+    """Borra los refresh tokens expirados. Devuelve cuántos se borraron."""
+    borrados = db.query(DBRefreshToken).filter(DBRefreshToken.expira < datetime.utcnow()).delete()
+    db.commit()
+    return borrados
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import load_only, selectinload
+
+from core.config import REPARSE_LOCK_FILE
+from db.database import SessionLocal, Estudiante as DBEstudiante, Experiencia as DBExperiencia
+from services.cv_parser import simple_parse_sections
+from services.storage import es_clave, get_storage
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def comprimir_texto(texto: str) -> Optional[bytes]:
+    """Texto extraído de un CV comprimido con zlib (None si está vacío)."""
+    return zlib.compress(texto.encode('utf-8'), 6) if texto else None
+
+
+def descomprimir_texto(blob: Optional[bytes]) -> str:
+    return zlib.decompress(blob).decode('utf-8') if blob else ''
+
+
+def guardar_texto_cv(db_estudiante, texto: str) -> None:
+    """Guarda el texto normalizado del CV para poder re-parsearlo sin leer el archivo."""
+    db_estudiante.cv_texto = comprimir_texto(texto)
+
+
+def liberar_cvs_huerfanos(db, claves) -> int:
+    """
+    Borra del almacenamiento los CVs de `claves` que ya ningún estudiante referencia
+    (p. ej. la clave anterior tras subir un CV nuevo). Llamar después del commit; es
+    bloqueante. Los errores solo se registran: un blob que quede sin borrar no afecta
+    a nadie. Devuelve cuántos se borraron.
+
+    Limitación: si otra petición sube ese mismo contenido y aún no ha hecho commit, su
+    `cv_path` quedará apuntando a un blob borrado (la descarga responde 404 hasta que
+    vuelva a subirlo).
+    """
+    claves = {c for c in claves if es_clave(c)}
+    if not claves:
+        return 0
+    en_uso = {c for (c,) in db.query(DBEstudiante.cv_path).filter(DBEstudiante.cv_path.in_(claves))}
+    borrados = 0
+    storage = get_storage()
+    for clave in claves - en_uso:
+        try:
+            storage.delete(clave)
+            borrados += 1
+        except Exception as e:
+            logger.warning(f"No se pudo borrar el CV huérfano {clave}: {e}")
+    return borrados
+
+
+def aplicar_cv_a_estudiante(db, db_estudiante, parsed: Dict[str, List[str]]) -> None:
+    """
+    Mezcla los datos extraídos de un CV con el perfil del estudiante.
+    Evita duplicados en habilidades, proyectos y experiencias.
+    No hace commit: el llamador decide cuándo cerrar la transacción.
+    """
+    # Actualizar campos en la base de datos si se encontraron, evitando duplicados
+    if parsed.get('carrera'):
+        db_estudiante.carrera = parsed.get('carrera')
+
+    if parsed.get('habilidades'):
+        # Mezclar con existentes y eliminar duplicados (case-insensitive)
+        existing_skills = db_estudiante.habilidades_tecnicas or []
+        existing_skills_lower = [s.lower() for s in existing_skills]
+        new_skills = [
+            h for h in parsed.get('habilidades')
+            if h.lower() not in existing_skills_lower
+        ]
+        db_estudiante.habilidades_tecnicas = list(set(existing_skills + new_skills))
+
+    if parsed.get('proyectos'):
+        # Mezclar con existentes y eliminar duplicados
+        existing_projects = db_estudiante.proyectos_lista or []
+        new_projects = [
+            p for p in parsed.get('proyectos')
+            if p not in existing_projects
+        ]
+        db_estudiante.proyectos_lista = list(set(existing_projects + new_projects))
+
+    # Crear experiencias extraídas (si hay), evitando duplicados
+    if parsed.get('experiencias'):
+        existing_descriptions = {e.descripcion for e in db_estudiante.experiencias}
+        for exp_text in parsed.get('experiencias'):
+            if exp_text not in existing_descriptions:
+                exp = DBExperiencia(
+                    puesto=exp_text[:150],
+                    empresa='',
+                    descripcion=exp_text,
+                    estudiante_id=db_estudiante.id
+                )
+                db.add(exp)
+                existing_descriptions.add(exp_text)
+
+
+def resumen_parseado(parsed: Dict[str, List[str]]) -> Dict:
+    """Devuelve los datos parseados limpios (sin duplicados) para la respuesta de la API."""
+    return {
+        "carrera": parsed.get('carrera'),
+        "habilidades": list(set(parsed.get('habilidades', []))),
+        "proyectos": list(set(parsed.get('proyectos', []))),
+        "experiencias": list(set(parsed.get('experiencias', [])))
+    }
+
+
+# --- Re-parseo ---
+# Solo corre uno a la vez entre todos los procesos: candado de archivo (REPARSE_LOCK_FILE),
+# como el planificador de services/mantenimiento.py. Sin `fcntl` (Windows) el candado es
+# solo por proceso. El estado se publica en un archivo JSON para que lo lea cualquier worker.
+_estado_reparseo: Dict = {"en_curso": False}
+_reparseo_lock = threading.Lock()
+_candado_reparseo = None
+
+
+def _archivo_estado() -> str:
+    return os.path.splitext(REPARSE_LOCK_FILE)[0] + ".json"
+
+
+def _publicar_estado() -> None:
+    ruta = _archivo_estado()
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(_estado_reparseo, f)
+        os.replace(temporal, ruta)  # atómico: los lectores nunca ven el archivo a medias
+    except OSError as e:
+        logger.warning(f"No se pudo publicar el estado del re-parseo en {ruta}: {e}")
+
+
+def _abrir_candado():
+    """Archivo del candado con el flock exclusivo tomado, o None si otro proceso lo tiene."""
+    directorio = os.path.dirname(REPARSE_LOCK_FILE)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    archivo = open(REPARSE_LOCK_FILE, "a")
+    try:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        archivo.close()
+        return None
+    return archivo
+
+
+def _soltar_candado() -> None:
+    global _candado_reparseo
+    if _candado_reparseo is not None:
+        _candado_reparseo.close()  # cerrar el archivo libera el flock
+        _candado_reparseo = None
+    _reparseo_lock.release()
+
+
+def estado_reparseo() -> Dict:
+    """Estado del último re-parseo lanzado en cualquier proceso."""
+    if _reparseo_lock.locked():
+        return dict(_estado_reparseo)
+    try:
+        with open(_archivo_estado(), encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return {"en_curso": False}
+    if estado.get("en_curso") and fcntl is not None:
+        # Si nadie tiene el candado, el proceso que lo ejecutaba terminó sin acabarlo
+        archivo = _abrir_candado()
+        if archivo is not None:
+            archivo.close()
+            estado.update({"en_curso": False, "interrumpido": True})
+    return estado
+
+
+def reservar_reparseo(dry_run: bool = False, desde_id: int = 0) -> bool:
+    """
+    Toma el turno del re-parseo y lo marca en curso; False si ya hay uno (en este o en
+    otro proceso). Quien lo reserva debe llamar después a
+    `reparsear_textos_guardados(..., reservado=True)`, que lo libera al terminar.
+    """
+    global _candado_reparseo
+    if not _reparseo_lock.acquire(blocking=False):
+        return False
+    if fcntl is not None:
+        _candado_reparseo = _abrir_candado()
+        if _candado_reparseo is None:
+            _reparseo_lock.release()
+            return False
+    _estado_reparseo.clear()
+    _estado_reparseo.update({"en_curso": True, "procesados": 0, "errores": 0, "ultimo_id": desde_id,
+                             "dry_run": dry_run, "segundos": 0.0, "pid": os.getpid()})
+    _publicar_estado()
+    return True
+
+
+def reparsear_textos_guardados(tam_lote: int = 200, dry_run: bool = False, desde_id: int = 0,
+                               reservado: bool = False) -> Dict:
+    """
+    Vuelve a pasar por `simple_parse_sections` el texto guardado de cada CV y aplica el
+    resultado al perfil. Recorre los estudiantes por id en lotes (paginación por clave,
+    una transacción por lote), de modo que la memoria no crece con el número de CVs.
+    Solo se ejecuta un re-parseo a la vez; si ya hay uno en curso lanza RuntimeError
+    (salvo que el turno ya se haya tomado con `reservar_reparseo`).
+    """
+    if not reservado and not reservar_reparseo(dry_run, desde_id):
+        raise RuntimeError("Ya hay un re-parseo en curso")
+    inicio = time.perf_counter()
+    try:
+        ultimo_id = desde_id
+        while True:
+            db = SessionLocal()
+            try:
+                lote = (
+                    db.query(DBEstudiante)
+                    .options(
+                        load_only(DBEstudiante.id, DBEstudiante.carrera, DBEstudiante.habilidades_tecnicas,
+                                  DBEstudiante.proyectos_lista, DBEstudiante.cv_texto),
+                        selectinload(DBEstudiante.experiencias),
+                    )
+                    .filter(DBEstudiante.id > ultimo_id, DBEstudiante.cv_texto.isnot(None))
+                    .order_by(DBEstudiante.id)
+                    .limit(tam_lote)
+                    .all()
+                )
+                if not lote:
+                    break
+                for db_estudiante in lote:
+                    try:
+                        texto = descomprimir_texto(db_estudiante.cv_texto)
+                        aplicar_cv_a_estudiante(db, db_estudiante, simple_parse_sections(texto))
+                        _estado_reparseo["procesados"] += 1
+                    except Exception as e:
+                        logger.error(f"Error re-parseando CV del estudiante {db_estudiante.id}: {e}")
+                        _estado_reparseo["errores"] += 1
+                if dry_run:
+                    db.rollback()
+                else:
+                    db.commit()
+                ultimo_id = lote[-1].id
+                _estado_reparseo["ultimo_id"] = ultimo_id
+                _estado_reparseo["segundos"] = round(time.perf_counter() - inicio, 2)
+                _publicar_estado()
+            finally:
+                db.close()
+    finally:
+        _estado_reparseo["en_curso"] = False
+        _estado_reparseo["segundos"] = round(time.perf_counter() - inicio, 2)
+        _publicar_estado()
+        _soltar_candado()
+    return dict(_estado_reparseo)
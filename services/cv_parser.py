@@ -1,33 +1,77 @@
+import itertools
+import logging
 import os
-from typing import Dict, List
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-# Importar librerías para leer PDFs y Word
-try:
-    from pypdf import PdfReader
-except Exception:
-    try:
-        from PyPDF2 import PdfReader
-    except Exception:
-        PdfReader = None
-
-from docx import Document
 import re
 
-# Importar spaCy para análisis de lenguaje natural (NLP)
-# Detecta entidades como universidades, organizaciones, etc
-try:
-    import spacy
-    nlp = None
-    try:
-        nlp = spacy.load('es_core_news_sm')  # Modelo en español
-    except Exception:
+from core import metricas
+from core.config import CV_PDF_MAX_PAGES, CV_PDF_MAX_CHARS, CV_PDF_TIME_BUDGET_SECONDS, SPACY_MODEL
+
+logger = logging.getLogger(__name__)
+
+# spaCy para análisis de lenguaje natural (NLP): detecta entidades como universidades,
+# organizaciones, etc. El modelo se carga la primera vez que se necesita (ver `get_nlp`)
+# para no pagar su importación y memoria al arrancar la API.
+_nlp = None
+_nlp_estado = 'pendiente'  # pendiente | cargando | listo | no_disponible
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """Devuelve el modelo spaCy, cargándolo en el primer uso. None si no está disponible."""
+    global _nlp, _nlp_estado
+    if _nlp_estado in ('listo', 'no_disponible'):
+        return _nlp
+    with _nlp_lock:
+        if _nlp_estado in ('listo', 'no_disponible'):
+            return _nlp
+        _nlp_estado = 'cargando'
         try:
-            nlp = spacy.load('en_core_web_sm')  # Fallback: inglés
+            import spacy
         except Exception:
-            nlp = None
-except Exception:
-    spacy = None
-    nlp = None
+            _nlp_estado = 'no_disponible'
+            return None
+        for modelo in (SPACY_MODEL, 'en_core_web_sm'):  # Fallback: inglés
+            try:
+                _nlp = spacy.load(modelo)
+                break
+            except Exception:
+                logger.warning("No se pudo cargar el modelo spaCy %s", modelo)
+        _nlp_estado = 'listo' if _nlp is not None else 'no_disponible'
+    return _nlp
+
+
+def estado_nlp() -> str:
+    """Estado de carga del modelo spaCy: pendiente, cargando, listo o no_disponible."""
+    return _nlp_estado
+
+
+# Palabras clave para detectar habilidades
+SKILL_KEYWORDS = [
+    'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'golang', 'rust', 'kotlin',
+    'sql', 'postgres', 'postgresql', 'mysql', 'mongodb', 'nosql', 'oracle', 'sqlite',
+    'docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'git',
+    'machine learning', 'deep learning', 'data science', 'ai', 'artificial intelligence',
+    'pandas', 'numpy', 'scipy', 'scikit-learn', 'sklearn',
+    'react', 'angular', 'vue', 'node', 'nodejs', 'express',
+    'aws', 'azure', 'gcp', 'cloud', 'devops',
+    'html', 'css', 'bootstrap', 'tailwind',
+    'tensorflow', 'pytorch', 'keras', 'transformers', 'huggingface',
+    'nlp', 'natural language', 'computer vision', 'cv',
+    'rest', 'api', 'graphql', 'websocket',
+    'agile', 'scrum', 'kanban', 'jira',
+    'linux', 'windows', 'macos', 'unix',
+    'excel', 'powerpoint', 'tableau', 'power bi', 'looker',
+    'selenium', 'pytest', 'unittest', 'testing',
+    'fastapi', 'django', 'flask', 'spring',
+    'redis', 'elasticsearch', 'rabbitmq',
+    'spacy', 'nltk', 'gensim',
+    'git', 'svn', 'bitbucket'
+]
 
 KEY_SECTIONS = [
     'habilidad', 'skills', 'habilidades',
@@ -37,31 +81,129 @@ KEY_SECTIONS = [
 ]
 
 
-def extract_text_from_pdf(path: str) -> str:
-    """Extrae texto de PDF. Si falla, devuelve string vacío."""
+# Expresiones regulares precompiladas para normalizar el texto de cada página
+_RE_ESPACIOS = re.compile(r'\s+')
+_RE_LETRAS_SEPARADAS = re.compile(r'(\w)\s+(?=\w)')
+
+# Métricas de extracción de PDFs (ver core/metricas.py). La duración por documento está
+# en cv_parse_duration_seconds{etapa="extraccion"}.
+_duracion_pagina_pdf = metricas.histograma(
+    "cv_pdf_page_seconds", "Tiempo de extracción de texto por página de PDF"
+)
+_documentos_pdf = metricas.contador("cv_pdf_documents_total", "PDFs procesados")
+_truncados_pdf = metricas.contador(
+    "cv_pdf_truncated_total", "PDFs con la extracción detenida antes del final, por límite alcanzado", ("motivo",)
+)
+
+
+def _normalizar_pagina(page_text: str) -> str:
+    # Normalizar espacios entre caracteres (problema común en PDFs escaneados)
+    # "C A R L O S" → "CARLOS"
+    page_text = _RE_ESPACIOS.sub(' ', page_text)
+    # Detectar y arreglar caracteres separados por espacios
+    # Si hay muchos espacios entre caracteres, probablemente sea un PDF mal formateado
+    if page_text.count(' ') > len(page_text) * 0.3:
+        # Remover espacios entre caracteres individuales
+        page_text = _RE_LETRAS_SEPARADAS.sub(r'\1', page_text)
+    return page_text
+
+
+# Las librerías de PDF y Word se importan con el primer CV (o en el calentamiento, ver
+# routers/health.py) para no sumarlas al arranque de la API.
+@lru_cache(maxsize=None)
+def _pdf_reader():
+    """Clase PdfReader de pypdf (o PyPDF2). None si no hay ninguna instalada."""
+    try:
+        from pypdf import PdfReader
+    except Exception:
+        try:
+            from PyPDF2 import PdfReader
+        except Exception:
+            return None
+    return PdfReader
+
+
+@lru_cache(maxsize=None)
+def _docx_document():
+    """Constructor Document de python-docx. None si no está instalado."""
+    try:
+        from docx import Document
+    except Exception:
+        return None
+    return Document
+
+
+def cargar_extractores() -> None:
+    """Importa ya las librerías de PDF y Word (calentamiento)."""
+    _pdf_reader()
+    _docx_document()
+
+
+def extract_text_from_pdf(
+    path: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    time_budget: Optional[float] = None,
+) -> str:
+    """
+    Extrae texto de PDF. Si falla, devuelve string vacío.
+    Las páginas se leen de forma perezosa y la extracción se detiene al alcanzar
+    el máximo de páginas, de caracteres o el presupuesto de tiempo del documento
+    (por defecto los valores de `core.config`). El presupuesto se revisa entre
+    páginas: una sola página lenta no se interrumpe a la mitad.
+    """
+    max_pages = CV_PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = CV_PDF_MAX_CHARS if max_chars is None else max_chars
+    time_budget = CV_PDF_TIME_BUDGET_SECONDS if time_budget is None else time_budget
+
     text = []
+    total_chars = 0
+    paginas = 0
+    inicio = time.perf_counter()
     try:
-        reader = PdfReader(path)
-        for page in reader.pages:
+        PdfReader = _pdf_reader()
+        if PdfReader is None:
+            return ''
+        reader = PdfReader(path, strict=False)
+        for page in itertools.islice(reader.pages, max_pages):
+            if time.perf_counter() - inicio > time_budget:
+                _truncados_pdf.inc("tiempo")
+                logger.warning("Extracción de %s detenida: presupuesto de %.1fs agotado en la página %d", path, time_budget, paginas + 1)
+                break
+
+            inicio_pagina = time.perf_counter()
             page_text = page.extract_text()
+            paginas += 1
+            duracion = time.perf_counter() - inicio_pagina
+            _duracion_pagina_pdf.observar(duracion)
+            logger.debug("Página %d de %s extraída en %.3fs", paginas, path, duracion)
+
             if page_text:
-                # Normalizar espacios entre caracteres (problema común en PDFs escaneados)
-                # "C A R L O S" → "CARLOS"
-                page_text = re.sub(r'\s+', ' ', page_text)
-                # Detectar y arreglar caracteres separados por espacios
-                # Si hay muchos espacios entre caracteres, probablemente sea un PDF mal formateado
-                if page_text.count(' ') > len(page_text) * 0.3:
-                    # Remover espacios entre caracteres individuales
-                    page_text = re.sub(r'(\w)\s+(?=\w)', r'\1', page_text)
+                page_text = _normalizar_pagina(page_text)
+                if total_chars + len(page_text) > max_chars:
+                    text.append(page_text[:max_chars - total_chars])
+                    _truncados_pdf.inc("caracteres")
+                    logger.warning("Extracción de %s truncada a %d caracteres", path, max_chars)
+                    break
+                total_chars += len(page_text)
                 text.append(page_text)
+        else:
+            if len(reader.pages) > max_pages:
+                _truncados_pdf.inc("paginas")
+                logger.warning("Extracción de %s limitada a %d páginas", path, max_pages)
     except Exception:
         return ''
+    finally:
+        _documentos_pdf.inc()
     return '\n'.join(text)
 
 
 def extract_text_from_docx(path: str) -> str:
     """Extrae texto de Word (.docx). Si falla, devuelve string vacío."""
     try:
+        Document = _docx_document()
+        if Document is None:
+            return ''
         doc = Document(path)
         paragraphs = [p.text for p in doc.paragraphs if p.text]
         return '\n'.join(paragraphs)
@@ -80,10 +222,86 @@ def extract_text(path: str) -> str:
         return ''
 
 
-def simple_parse_sections(text: str) -> Dict[str, List[str]]:
+# Palabras clave de habilidades en una sola expresión (las más largas primero)
+_RE_SKILL_KEYWORDS = re.compile(
+    r'\b(?:' + '|'.join(re.escape(k) for k in sorted(set(SKILL_KEYWORDS), key=len, reverse=True)) + r')\b'
+)
+
+# Palabras que abren una sección cuando no estamos dentro de ninguna
+_CLAVES_INICIO = {
+    'habilidades': ('habilidad', 'skills', 'competencia', 'técnica'),
+    'proyectos': ('proyecto', 'portfolio', 'desarrollo de'),
+    'experiencias': ('experiencia', 'laboral', 'profesional', 'trabajo', 'empleo'),
+}
+# Palabras que, dentro de una sección, indican que empieza otra.
+# Las de educación/contacto cierran la sección actual sin abrir otra (None).
+_SECCION_DE_CIERRE = {
+    'habilidad': 'habilidades', 'skill': 'habilidades',
+    'proyecto': 'proyectos', 'experiencia': 'experiencias',
+    'educación': None, 'formación': None, 'carrera': None, 'contacto': None,
+}
+_CLAVES_CIERRE = {
+    'habilidades': ('experiencia', 'proyecto', 'educación', 'carrera', 'formación', 'contacto'),
+    'proyectos': ('habilidad', 'skill', 'educación', 'carrera', 'formación', 'contacto', 'experiencia'),
+    'experiencias': ('proyecto', 'habilidad', 'skill', 'educación', 'carrera', 'formación', 'contacto'),
+}
+_MAX_LINEAS_SECCION = {'habilidades': 5, 'proyectos': 14, 'experiencias': 14}
+
+
+def _regex_claves(claves):
+    return re.compile('|'.join(re.escape(k) for k in sorted(claves, key=len, reverse=True)))
+
+
+_SECCION_DE_INICIO = {k: seccion for seccion, claves in _CLAVES_INICIO.items() for k in claves}
+_RE_INICIO = _regex_claves(_SECCION_DE_INICIO)
+_RE_CIERRE = {seccion: _regex_claves(claves) for seccion, claves in _CLAVES_CIERRE.items()}
+_CONTENIDO = object()  # marcador: la línea es contenido, no encabezado
+
+
+def _clasificar_linea(line: str, low: str, seccion_actual):
+    """
+    Devuelve (seccion, tail) si la línea es un encabezado, o (_CONTENIDO, None).
+    - "Título: texto" con una palabra clave antes de ":" siempre es encabezado.
+    - Fuera de una sección, cualquier palabra clave de inicio abre su sección.
+    - Dentro de una sección, solo sus palabras de cierre la terminan.
+    Si hay varias palabras clave gana la que aparece primero en la línea.
+    """
+    if ':' in low:
+        prefijo, tail = line.split(':', 1)
+        m = _RE_INICIO.search(prefijo.lower())
+        if m and len(prefijo) <= 40:
+            return _SECCION_DE_INICIO[m.group(0)], tail
+    if seccion_actual is None:
+        m = _RE_INICIO.search(low)
+        if m:
+            return _SECCION_DE_INICIO[m.group(0)], None
+        return _CONTENIDO, None
+    m = _RE_CIERRE[seccion_actual].search(low)
+    if m:
+        clave = m.group(0)
+        return _SECCION_DE_CIERRE.get(clave, _SECCION_DE_INICIO.get(clave)), None
+    return _CONTENIDO, None
+
+
+def _agregar_contenido(result, seccion: str, c: str, es_encabezado: bool) -> None:
+    c = c.strip()
+    if seccion == 'habilidades':
+        if ',' in c:
+            result['habilidades'].extend([x.strip() for x in c.split(',') if x.strip()])
+        elif c:
+            result['habilidades'].append(c)
+    elif es_encabezado:
+        result[seccion].append(c)
+    # Agregar solo si tiene contenido significativo (no solo números o símbolos)
+    elif len(c) > 5 and any(char.isalpha() for char in c):
+        result[seccion].append(c)
+
+
+def simple_parse_sections(text: str, usar_nlp: bool = True) -> Dict[str, List[str]]:
     """
     Parser mejorado de CVs v2.0. 
     Extrae: carrera, habilidades, proyectos, experiencias.
+    Con `usar_nlp=False` se omite el enriquecimiento con spaCy.
     """
     # Preparar texto: líneas individuales
     lines = [l.strip() for l in text.splitlines() if l.strip()]
@@ -100,29 +318,6 @@ def simple_parse_sections(text: str) -> Dict[str, List[str]]:
     text_norm = re.sub(r"\s+", " ", text)
     text_lower = text_norm.lower()
 
-    # Palabras clave para detectar habilidades
-    skill_keywords = [
-        'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'golang', 'rust', 'kotlin',
-        'sql', 'postgres', 'postgresql', 'mysql', 'mongodb', 'nosql', 'oracle', 'sqlite',
-        'docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'git',
-        'machine learning', 'deep learning', 'data science', 'ai', 'artificial intelligence',
-        'pandas', 'numpy', 'scipy', 'scikit-learn', 'sklearn',
-        'react', 'angular', 'vue', 'node', 'nodejs', 'express',
-        'aws', 'azure', 'gcp', 'cloud', 'devops',
-        'html', 'css', 'bootstrap', 'tailwind',
-        'tensorflow', 'pytorch', 'keras', 'transformers', 'huggingface',
-        'nlp', 'natural language', 'computer vision', 'cv',
-        'rest', 'api', 'graphql', 'websocket',
-        'agile', 'scrum', 'kanban', 'jira',
-        'linux', 'windows', 'macos', 'unix',
-        'excel', 'powerpoint', 'tableau', 'power bi', 'looker',
-        'selenium', 'pytest', 'unittest', 'testing',
-        'fastapi', 'django', 'flask', 'spring',
-        'redis', 'elasticsearch', 'rabbitmq',
-        'spacy', 'nltk', 'gensim',
-        'git', 'svn', 'bitbucket'
-    ]
-
     # CARRERA: Buscar patrones "EDUCACIÓN:" o "CARRERA:"
     # Validar que no sea demasiado larga (máx 200 caracteres)
     carrera_patterns = [
@@ -175,80 +370,32 @@ def simple_parse_sections(text: str) -> Dict[str, List[str]]:
                     result['carrera'] = candidate
                     break
 
-    # HABILIDADES: Buscar por palabras clave (python, java, etc)
-    found_skills = set()
-    for kw in skill_keywords:
-        pattern = r'\b' + re.escape(kw) + r'\b'
-        if re.search(pattern, text_lower):
-            found_skills.add(kw.title())
+    # HABILIDADES: Buscar por palabras clave (python, java, etc) con una sola regex
+    found_skills = {m.group(0).title() for m in _RE_SKILL_KEYWORDS.finditer(text_lower)}
     
     if found_skills:
         result['habilidades'].extend(sorted(found_skills))
 
-    # HABILIDADES: Buscar sección "HABILIDADES:" y extraer líneas siguientes
-    for i, l in enumerate(lower_lines):
-        if any(k in l for k in ('habilidad', 'skills', 'competencia', 'técnica')):
-            chunk = lines[i+1:i+6]
-            for c in chunk:
-                if c and not any(keyword in c.lower() for keyword in 
-                               ('experiencia', 'proyecto', 'formación', 'educación')):
-                    if ',' in c:
-                        result['habilidades'].extend([x.strip() for x in c.split(',') if x.strip()])
-                    else:
-                        result['habilidades'].append(c.strip())
-
-    # PROYECTOS: Buscar sección "PROYECTOS:" y extraer líneas siguientes
-    # Mejorado: detectar mejor dónde termina la sección
-    for i, l in enumerate(lower_lines):
-        if any(k in l for k in ('proyecto', 'portfolio', 'proyecto', 'desarrollo', 'solución')):
-            # Pero evitar falsos positivos
-            if 'proyecto' in l.lower() or 'portfolio' in l.lower() or 'desarrollo de' in l.lower():
-                chunk = lines[i+1:i+15]  # Aumentar límite
-                for c in chunk:
-                    # Detener si encontramos otra sección
-                    if any(section in c.lower() for section in 
-                           ['habilidad', 'skill', 'educación', 'carrera', 'formación', 'contacto', 'experiencia']):
-                        break
-                    
-                    if c and len(c) > 5:
-                        # Filtrar líneas que sean solo números
-                        if any(char.isalpha() for char in c):
-                            result['proyectos'].append(c.strip())
-
-    # EXPERIENCIA: Buscar sección "EXPERIENCIA:" y extraer líneas siguientes
-    # Mejorado: detectar mejor dónde termina la sección
-    for i, l in enumerate(lower_lines):
-        if any(k in l for k in ('experiencia', 'laboral', 'profesional', 'trabajo', 'empleo')):
-            # Extraer líneas hasta la siguiente sección
-            chunk = lines[i+1:i+15]  # Aumentar de 10 a 15
-            in_experience = True
-            for c in chunk:
-                # Detectar si llegamos a otra sección
-                if any(section in c.lower() for section in 
-                       ['proyecto', 'habilidad', 'skill', 'educación', 'carrera', 'formación', 'contacto']):
-                    in_experience = False
-                    break
-                
-                # Agregar solo si tiene contenido significativo
-                if c and len(c) > 5 and in_experience:
-                    # Filtrar líneas que sean solo números o símbolos
-                    if any(char.isalpha() for char in c):
-                        result['experiencias'].append(c.strip())
-
-    # Fallback: líneas que empiezan con "skills:", "proyecto:", etc
-    for l in lines:
-        low = l.lower()
-        if any(low.startswith(prefix) for prefix in ('skills:', 'habilidades:', 'habilidad:')):
-            tail = l.split(':', 1)[1]
-            result['habilidades'].extend([x.strip() for x in tail.split(',') if x.strip()])
-        if any(low.startswith(prefix) for prefix in ('proyecto:', 'proyectos:')):
-            tail = l.split(':', 1)[1]
-            if tail.strip():
-                result['proyectos'].append(tail.strip())
-        if any(low.startswith(prefix) for prefix in ('experiencia:', 'experiencias:', 'empleo:')):
-            tail = l.split(':', 1)[1]
-            if tail.strip():
-                result['experiencias'].append(tail.strip())
+    # HABILIDADES, PROYECTOS y EXPERIENCIA: una sola pasada por las líneas.
+    # Cada línea se clasifica una vez como encabezado de sección o como contenido,
+    # y el contenido se asigna a la sección actual (máximo _MAX_LINEAS_SECCION líneas).
+    seccion = None
+    restantes = 0
+    for l, low in zip(lines, lower_lines):
+        nueva, tail = _clasificar_linea(l, low, seccion)
+        if nueva is not _CONTENIDO:
+            seccion = nueva
+            restantes = _MAX_LINEAS_SECCION.get(seccion, 0)
+            # "Habilidades: Python, SQL" → el texto tras ":" es contenido de la sección
+            if seccion and tail and tail.strip():
+                _agregar_contenido(result, seccion, tail, es_encabezado=True)
+            continue
+        if seccion is None:
+            continue
+        _agregar_contenido(result, seccion, l, es_encabezado=False)
+        restantes -= 1
+        if restantes <= 0:
+            seccion = None
 
     # Limpiar: eliminar duplicados y validar longitud mínima
     # Carrera: máximo 1 línea, entre 5-150 caracteres
@@ -276,36 +423,57 @@ def simple_parse_sections(text: str) -> Dict[str, List[str]]:
     ]))
 
     # Usar spaCy NLP para enriquecer si está disponible
-    if nlp is not None:
-        try:
-            doc = nlp(text)
-            # Detectar universidades si carrera no está definida
-            if not result['carrera']:
-                for ent in doc.ents:
-                    if ent.label_ in ('ORG',) and any(edu_word in ent.text.lower() 
-                                                      for edu_word in ('universidad', 'escuela', 'instituto', 'college')):
-                        result['carrera'] = ent.text
-                        break
-            # Usar noun chunks para encontrar habilidades adicionales
-            for chunk in doc.noun_chunks:
-                ch = chunk.text.lower()
-                for kw in skill_keywords:
-                    if kw in ch and kw not in [h.lower() for h in result['habilidades']]:
-                        result['habilidades'].append(chunk.text.title())
-        except Exception:
-            pass
+    if usar_nlp:
+        enriquecer_con_nlp(text, result)
 
     return result
 
 
-def parse_cv(path: str) -> Dict[str, List[str]]:
-    """Extrae texto de CV y parsea para obtener datos estructurados."""
+def enriquecer_con_nlp(text: str, result: Dict[str, List[str]]) -> None:
+    """Completa `result` con entidades y noun chunks de spaCy (si el modelo está disponible)."""
+    nlp = get_nlp()
+    if nlp is None:
+        return
+    try:
+        doc = nlp(text)
+        # Detectar universidades si carrera no está definida
+        if not result['carrera']:
+            for ent in doc.ents:
+                if ent.label_ in ('ORG',) and any(edu_word in ent.text.lower() 
+                                                  for edu_word in ('universidad', 'escuela', 'instituto', 'college')):
+                    result['carrera'] = ent.text
+                    break
+        # Usar noun chunks para encontrar habilidades adicionales
+        habilidades_lower = {h.lower() for h in result['habilidades']}
+        for chunk in doc.noun_chunks:
+            ch = chunk.text.lower()
+            for kw in SKILL_KEYWORDS:
+                if kw in ch and kw not in habilidades_lower:
+                    result['habilidades'].append(chunk.text.title())
+                    habilidades_lower.add(chunk.text.title().lower())
+    except Exception:
+        pass
+
+
+_duracion_parseo = metricas.histograma(
+    "cv_parse_duration_seconds", "Duración del procesamiento de CVs por etapa", ("etapa",)
+)
+
+
+def parse_cv_con_texto(path: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Como `parse_cv`, pero devuelve también el texto extraído: (texto, datos)."""
     try:
-        text = extract_text(path)
+        with _duracion_parseo.medir("extraccion"):
+            text = extract_text(path)
         if not text:
-            return {'carrera': None, 'habilidades': [], 'proyectos': [], 'experiencias': []}
-        return simple_parse_sections(text)
+            return '', {'carrera': None, 'habilidades': [], 'proyectos': [], 'experiencias': []}
+        with _duracion_parseo.medir("analisis"):
+            return text, simple_parse_sections(text)
     except Exception as e:
         print(f"Error parsing CV: {e}")
-        return {'carrera': None, 'habilidades': [], 'proyectos': [], 'experiencias': []}
+        return '', {'carrera': None, 'habilidades': [], 'proyectos': [], 'experiencias': []}
+
 
+def parse_cv(path: str) -> Dict[str, List[str]]:
+    """Extrae texto de CV y parsea para obtener datos estructurados."""
+    return parse_cv_con_texto(path)[1]
@@ -0,0 +1,149 @@
+"""
+Pub/sub en memoria para avisar a los estudiantes conectados por SSE
+(GET /oportunidades/stream) de oportunidades nuevas o editadas que les convienen.
+
+Al publicarse una oportunidad se calcula su compatibilidad una sola vez con cada
+estudiante conectado (no con todos los estudiantes) y solo se envía a quienes superan
+SSE_SCORE_MINIMO. Cada conexión tiene una cola acotada: si el cliente no la vacía se
+descartan los eventos más antiguos en lugar de acumular memoria.
+
+El broker es por proceso: con varios workers, un estudiante solo recibe lo que se
+publica en el worker que atiende su conexión. Para repartir entre workers o instancias
+basta con reemplazar `Broker.publicar` por un canal común (p. ej. Redis pub/sub).
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Set
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from core import metricas
+from core.config import SSE_MAX_CONEXIONES, SSE_MAX_CONEXIONES_POR_ESTUDIANTE, SSE_SCORE_MINIMO
+from db.database import SessionLocal, Estudiante as DBEstudiante, Oportunidad as DBOportunidad
+from services.matching import calcular_compatibilidad, resumen_oportunidad
+
+logger = logging.getLogger(__name__)
+
+TAMANO_COLA = 100
+
+
+class Suscripcion:
+    """Una conexión SSE: cola de eventos ligada al event loop que la atiende."""
+
+    __slots__ = ("estudiante_id", "cola", "loop")
+
+    def __init__(self, estudiante_id: int):
+        self.estudiante_id = estudiante_id
+        self.loop = asyncio.get_running_loop()
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=TAMANO_COLA)
+
+    def entregar(self, evento: dict) -> None:
+        # Se ejecuta en el event loop de la conexión
+        if self.cola.full():
+            self.cola.get_nowait()
+        self.cola.put_nowait(evento)
+
+
+class Broker:
+    def __init__(self):
+        self._suscripciones: Dict[int, Set[Suscripcion]] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def suscribir(self, estudiante_id: int) -> Suscripcion:
+        """
+        Registra una conexión (llamar desde el event loop). Lanza RuntimeError si no se
+        admiten más conexiones (global o del estudiante).
+        """
+        suscripcion = Suscripcion(estudiante_id)
+        with self._lock:
+            if self._total >= SSE_MAX_CONEXIONES:
+                raise RuntimeError("Demasiadas conexiones abiertas, intenta más tarde")
+            if len(self._suscripciones.get(estudiante_id, ())) >= SSE_MAX_CONEXIONES_POR_ESTUDIANTE:
+                raise RuntimeError("Demasiadas conexiones abiertas para este estudiante")
+            self._suscripciones.setdefault(estudiante_id, set()).add(suscripcion)
+            self._total += 1
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            conjunto = self._suscripciones.get(suscripcion.estudiante_id)
+            if conjunto is None or suscripcion not in conjunto:
+                return
+            conjunto.discard(suscripcion)
+            self._total -= 1
+            if not conjunto:
+                del self._suscripciones[suscripcion.estudiante_id]
+
+    def estudiantes_conectados(self) -> List[int]:
+        with self._lock:
+            return list(self._suscripciones)
+
+    def total(self) -> int:
+        return self._total
+
+    def publicar(self, estudiante_id: int, evento: dict) -> None:
+        """Encola `evento` en todas las conexiones del estudiante (seguro desde cualquier hilo)."""
+        with self._lock:
+            suscripciones = list(self._suscripciones.get(estudiante_id, ()))
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, evento)
+            except RuntimeError:
+                # El event loop ya se cerró (apagado del worker)
+                self.cancelar(suscripcion)
+
+
+broker = Broker()
+
+metricas.medidor("sse_connections", "Conexiones SSE abiertas", broker.total)
+_duracion_publicacion = metricas.histograma(
+    "sse_publish_duration_seconds", "Cálculo de compatibilidad y envío de una oportunidad a los conectados"
+)
+_eventos_enviados = metricas.contador("sse_events_total", "Eventos SSE enviados a estudiantes", ("tipo",))
+
+
+def publicar_oportunidad(oportunidad_id: int, tipo: str = "creada") -> int:
+    """
+    Envía la oportunidad a los estudiantes conectados cuya compatibilidad supera
+    SSE_SCORE_MINIMO. Pensada para ejecutarse como tarea de fondo tras el commit.
+    Devuelve a cuántos estudiantes se envió.
+    """
+    conectados = broker.estudiantes_conectados()
+    if not conectados:
+        return 0
+    db = SessionLocal()
+    try:
+        with _duracion_publicacion.medir():
+            oportunidad = (
+                db.query(DBOportunidad)
+                .options(joinedload(DBOportunidad.empresa))
+                .filter(DBOportunidad.id == oportunidad_id)
+                .first()
+            )
+            if oportunidad is None or not oportunidad.activa:
+                return 0
+            estudiantes = (
+                db.query(DBEstudiante)
+                .options(selectinload(DBEstudiante.experiencias))
+                .filter(DBEstudiante.id.in_(conectados))
+                .all()
+            )
+            datos = resumen_oportunidad(oportunidad)
+            enviados = 0
+            for estudiante in estudiantes:
+                try:
+                    score = calcular_compatibilidad(estudiante, oportunidad)
+                except Exception:
+                    continue
+                if score >= SSE_SCORE_MINIMO:
+                    broker.publicar(estudiante.id, {"tipo": tipo, "oportunidad": datos, "score": round(float(score), 2)})
+                    enviados += 1
+        _eventos_enviados.inc(tipo, valor=enviados)
+        return enviados
+    except Exception as e:
+        logger.error(f"Error al publicar la oportunidad {oportunidad_id}: {e}")
+        return 0
+    finally:
+        db.close()
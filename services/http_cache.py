@@ -0,0 +1,272 @@
+"""
+Utilidades de caché HTTP: validadores (ETag / Last-Modified), respuestas 304,
+peticiones por rangos de bytes para descargas de archivos y caché de respuestas
+de los endpoints de catálogo.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event
+
+from core.config import CATALOG_VERSION_TTL_SECONDS, CATALOG_CACHE_MAX_ENTRIES, CATALOG_CACHE_CONTROL
+from db.database import SessionLocal, leer_versiones
+
+CHUNK_SIZE = 64 * 1024
+
+# ETags de archivos sin clave de contenido: ruta -> (mtime_ns, tamaño, etag)
+_etags_archivos: dict = {}
+
+
+def _normalizar_etag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110 §13.1.2): '*' o alguna ETag igual."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    objetivo = _normalizar_etag(etag)
+    return any(_normalizar_etag(e) == objetivo for e in if_none_match.split(','))
+
+
+def etag_coincide_fuerte(etag_cliente: Optional[str], etag: str) -> bool:
+    """Comparación fuerte (RFC 9110 §8.8.3.2), la que exige If-Range: ninguna de las dos puede ser débil."""
+    if not etag_cliente:
+        return False
+    etag_cliente = etag_cliente.strip()
+    return not etag_cliente.startswith('W/') and not etag.startswith('W/') and etag_cliente == etag
+
+
+def etag_de_archivo(ruta: str) -> str:
+    """
+    ETag fuerte (sha256) de un archivo local. Se recalcula solo si cambian
+    la fecha de modificación o el tamaño del archivo.
+    """
+    st = os.stat(ruta)
+    guardado = _etags_archivos.get(ruta)
+    if guardado and guardado[:2] == (st.st_mtime_ns, st.st_size):
+        return guardado[2]
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(bloque)
+    etag = f'"{h.hexdigest()}"'
+    _etags_archivos[ruta] = (st.st_mtime_ns, st.st_size, etag)
+    return etag
+
+
+def no_modificado(request: Request, etag: str, modificado: Optional[datetime]) -> bool:
+    """True si el cliente ya tiene esta versión (If-None-Match tiene prioridad sobre If-Modified-Since)."""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_coincide(if_none_match, etag)
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and modificado is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return modificado.replace(microsecond=0) <= desde
+    return False
+
+
+def parse_range(header: Optional[str], tamano: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un header `Range: bytes=...` con un solo rango.
+    Devuelve (inicio, fin) inclusivos, None si no aplica (se sirve el archivo completo)
+    o lanza ValueError si el rango no es satisfacible (416).
+    Los rangos múltiples se ignoran y se responde el archivo completo.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    inicio_txt, guion, fin_txt = header[len('bytes='):].strip().partition('-')
+    # Sintácticamente inválido (sin '-', valores no numéricos o con signo): se ignora
+    valido = guion and (inicio_txt or fin_txt) and all(v.isdigit() for v in (inicio_txt, fin_txt) if v)
+    if not valido:
+        return None
+    if inicio_txt == '':
+        # Sufijo: los últimos N bytes; un sufijo vacío (`bytes=-0`) o un archivo vacío no se pueden servir
+        n = int(fin_txt)
+        if n == 0 or tamano == 0:
+            raise ValueError("Rango no satisfacible")
+        return max(tamano - n, 0), tamano - 1
+    inicio = int(inicio_txt)
+    fin = int(fin_txt) if fin_txt else tamano - 1
+    if fin_txt and fin < inicio:
+        return None  # Rango inválido (p. ej. `bytes=5-2`): se ignora y se sirve completo
+    if inicio >= tamano:
+        raise ValueError("Rango no satisfacible")
+    return inicio, min(fin, tamano - 1)
+
+
+class RangeFileResponse(Response):
+    """
+    Respuesta con un archivo local (o bytes) que admite rangos.
+    Si el servidor ASGI soporta las extensiones `http.response.pathsend` o
+    `http.response.zerocopysend`, el archivo se envía sin copiarlo al proceso
+    (sendfile); si no, se lee por bloques en un hilo para no bloquear el event loop.
+    """
+
+    def __init__(self, ruta: Optional[str] = None, contenido: Optional[bytes] = None,
+                 rango: Optional[Tuple[int, int]] = None, tamano: int = 0,
+                 status_code: int = 200, headers: Optional[dict] = None, media_type: Optional[str] = None):
+        self.ruta = ruta
+        self.contenido = contenido
+        self.inicio, self.fin = rango if rango else (0, tamano - 1)
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.body = b''
+        self.init_headers(headers)
+        self.headers['content-length'] = str(max(self.fin - self.inicio + 1, 0))
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.contenido is not None:
+            await send({"type": "http.response.body", "body": self.contenido[self.inicio:self.fin + 1]})
+            return
+
+        extensiones = scope.get("extensions") or {}
+        completo = self.inicio == 0 and self.status_code == 200
+        if completo and "http.response.pathsend" in extensiones:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.ruta)})
+            return
+
+        async with await anyio.open_file(self.ruta, mode="rb") as f:
+            if "http.response.zerocopysend" in extensiones:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.wrapped.fileno(),
+                    "offset": self.inicio,
+                    "count": self.fin - self.inicio + 1,
+                    "more_body": False,
+                })
+                return
+            await f.seek(self.inicio)
+            restantes = self.fin - self.inicio + 1
+            while restantes > 0:
+                chunk = await f.read(min(CHUNK_SIZE, restantes))
+                if not chunk:
+                    break
+                restantes -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": restantes > 0})
+            if restantes > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def respuesta_archivo(request: Request, *, etag: str, modificado: Optional[datetime], tamano: int,
+                      media_type: str, filename: str, cache_control: str,
+                      ruta: Optional[str] = None, contenido: Optional[bytes] = None) -> Response:
+    """
+    Respuesta de descarga con validadores: 304 si el cliente ya tiene la versión,
+    206 para un rango válido (`If-Range` incluido), 416 si el rango no es satisfacible
+    y 200 con el archivo completo en otro caso. Sirve `ruta` (archivo local) o `contenido`.
+    """
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+    if modificado is not None:
+        headers["last-modified"] = format_datetime(modificado.astimezone(timezone.utc), usegmt=True)
+
+    if no_modificado(request, etag, modificado):
+        return Response(status_code=304, headers=headers)
+
+    headers["content-disposition"] = f'attachment; filename="{filename}"'
+    rango = None
+    # Con If-Range el rango solo se sirve si la ETag coincide en comparación fuerte; si no
+    # (ETag débil, distinta o una fecha) se responde el archivo completo
+    if_range = request.headers.get("if-range")
+    if if_range is None or etag_coincide_fuerte(if_range, etag):
+        try:
+            rango = parse_range(request.headers.get("range"), tamano)
+        except ValueError:
+            return Response(status_code=416, headers={"content-range": f"bytes */{tamano}", **headers})
+
+    if rango:
+        headers["content-range"] = f"bytes {rango[0]}-{rango[1]}/{tamano}"
+        return RangeFileResponse(ruta, contenido, rango, tamano, 206, headers, media_type)
+    return RangeFileResponse(ruta, contenido, None, tamano, 200, headers, media_type)
+
+
+# --- Caché de catálogos ---
+# Versiones de tabla leídas de la base de datos: tabla -> (leída_en, version)
+_versiones: Dict[str, Tuple[float, int]] = {}
+# Cuerpos ya serializados: clave -> (etag, bytes). LRU acotado.
+_cuerpos: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+_catalogo_lock = threading.Lock()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _olvidar_versiones(session):
+    """Tras un commit que cambió tablas versionadas, este worker vuelve a leer su versión."""
+    tablas = session.info.pop("tablas_modificadas", None)
+    if tablas:
+        with _catalogo_lock:
+            for tabla in tablas:
+                _versiones.pop(tabla, None)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_tablas_modificadas(session):
+    session.info.pop("tablas_modificadas", None)
+
+
+def versiones_de(db, tablas: Sequence[str]) -> Tuple[int, ...]:
+    """Versiones de `tablas`, consultando la base de datos solo si caducó la copia local."""
+    ahora = time.monotonic()
+    with _catalogo_lock:
+        vigentes = {t: _versiones[t][1] for t in tablas
+                    if t in _versiones and ahora - _versiones[t][0] < CATALOG_VERSION_TTL_SECONDS}
+    faltantes = [t for t in tablas if t not in vigentes]
+    if faltantes:
+        leidas = leer_versiones(db, faltantes)
+        with _catalogo_lock:
+            for tabla, version in leidas.items():
+                _versiones[tabla] = (ahora, version)
+        vigentes.update(leidas)
+    return tuple(vigentes[t] for t in tablas)
+
+
+def respuesta_catalogo(request: Request, db, tablas: Sequence[str], clave: str,
+                       serializar: Callable[[], bytes]) -> Response:
+    """
+    Respuesta JSON de un endpoint de catálogo con ETag débil derivada de la versión de
+    las tablas de las que depende. Si el cliente ya tiene esa versión responde 304; si
+    el cuerpo de esa versión ya está en memoria lo reutiliza sin consultar ni serializar.
+    `serializar` solo se llama cuando hace falta construir el cuerpo.
+    """
+    version = "-".join(str(v) for v in versiones_de(db, tablas))
+    etag = f'W/"{clave}-{version}"'
+    headers = {"etag": etag, "cache-control": CATALOG_CACHE_CONTROL}
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    with _catalogo_lock:
+        guardado = _cuerpos.get(clave)
+        if guardado and guardado[0] == etag:
+            _cuerpos.move_to_end(clave)
+            cuerpo = guardado[1]
+        else:
+            cuerpo = None
+    if cuerpo is None:
+        cuerpo = serializar()
+        with _catalogo_lock:
+            _cuerpos[clave] = (etag, cuerpo)
+            _cuerpos.move_to_end(clave)
+            while len(_cuerpos) > CATALOG_CACHE_MAX_ENTRIES:
+                _cuerpos.popitem(last=False)
+    return Response(content=cuerpo, media_type="application/json", headers=headers)
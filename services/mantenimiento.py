@@ -0,0 +1,245 @@
+"""
+Tareas de mantenimiento periódicas y su planificador.
+
+- cerrar_vencidas: marca `activa=False` en las oportunidades cuya `fecha_cierre` ya pasó.
+  Mantiene chico el conjunto activo que se puntúa en cada recomendación, y como se hace
+  con el ORM incrementa la versión de `oportunidades` (las ETags del catálogo cambian).
+- estadisticas_habilidades: recalcula la tabla `estadisticas_habilidades` (demanda en
+  oportunidades activas y oferta en estudiantes, por habilidad) que sirve
+  GET /habilidades/estadisticas sin recorrer las tablas en cada petición.
+- purgar_tokens: borra los refresh tokens expirados y las revocaciones de tokens de
+  acceso que ya no pueden rechazar ninguno.
+- optimizar_base: `ANALYZE` para que SQLite elija bien los índices y, con
+  MAINTENANCE_VACUUM, `VACUUM` para devolver el espacio de las filas borradas.
+
+El planificador es un hilo por proceso. Con varios workers todos lo arrancan, pero solo
+ejecuta tareas el que obtiene el candado de archivo (MAINTENANCE_LOCK_FILE); los demás
+reintentan cada minuto, así que si ese worker se recicla otro toma el relevo. Sin
+`fcntl` (Windows) no hay candado y cada proceso ejecuta las tareas.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session, load_only
+
+from core import metricas
+from core.config import (
+    MAINTENANCE_CLOSE_EXPIRED_SECONDS, MAINTENANCE_INITIAL_DELAY_SECONDS, MAINTENANCE_LOCK_FILE, MAINTENANCE_OPTIMIZE_DB_SECONDS,
+    MAINTENANCE_PURGE_TOKENS_SECONDS, MAINTENANCE_SKILL_STATS_SECONDS, MAINTENANCE_VACUUM,
+)
+from db.database import (
+    SessionLocal, engine, EstadisticaHabilidad as DBEstadisticaHabilidad, Estudiante as DBEstudiante,
+    Oportunidad as DBOportunidad,
+)
+from security.core import purgar_revocaciones
+from security.refresh_tokens import purgar_refresh_tokens
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_duracion_tareas = metricas.histograma(
+    "maintenance_job_duration_seconds", "Duración de las tareas de mantenimiento", ("tarea",),
+    (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+_ejecuciones = metricas.contador(
+    "maintenance_job_runs_total", "Ejecuciones de tareas de mantenimiento", ("tarea", "resultado"))
+_filas_afectadas = metricas.contador(
+    "maintenance_job_rows_total", "Filas modificadas por las tareas de mantenimiento", ("tarea",))
+_ultimo_exito: Dict[tuple, float] = {}
+metricas.medidor(
+    "maintenance_job_last_success_timestamp_seconds", "Último fin correcto de cada tarea (epoch)",
+    lambda: dict(_ultimo_exito), ("tarea",),
+)
+
+
+# --- Tareas ---
+
+def cerrar_oportunidades_vencidas(db: Session) -> int:
+    """Desactiva las oportunidades activas con `fecha_cierre` pasada. Devuelve cuántas."""
+    vencidas = (
+        db.query(DBOportunidad)
+        .options(load_only(DBOportunidad.id, DBOportunidad.activa))
+        .filter(DBOportunidad.activa == True, DBOportunidad.fecha_cierre < datetime.datetime.utcnow())
+        .all()
+    )
+    for oportunidad in vencidas:
+        oportunidad.activa = False
+    db.commit()
+    return len(vencidas)
+
+
+def recalcular_estadisticas_habilidades(db: Session) -> int:
+    """Reescribe `estadisticas_habilidades`. Devuelve cuántas habilidades distintas hay."""
+    demanda: Counter = Counter()
+    for (requeridas,) in db.query(DBOportunidad.habilidades_requeridas).filter(DBOportunidad.activa == True):
+        demanda.update({str(h).strip().lower() for h in requeridas or [] if h and str(h).strip()})
+    oferta: Counter = Counter()
+    for (tecnicas,) in db.query(DBEstudiante.habilidades_tecnicas):
+        oferta.update({str(h).strip().lower() for h in tecnicas or [] if h and str(h).strip()})
+
+    # Se actualiza con el ORM (no con un DELETE masivo) para que el flush incremente la
+    # versión de la tabla también cuando el conjunto nuevo queda vacío
+    ahora = datetime.datetime.utcnow()
+    nombres = demanda.keys() | oferta.keys()
+    existentes = {fila.nombre: fila for fila in db.query(DBEstadisticaHabilidad)}
+    for nombre, fila in existentes.items():
+        if nombre not in nombres:
+            db.delete(fila)
+    for nombre in nombres:
+        fila = existentes.get(nombre)
+        if fila is None:
+            fila = DBEstadisticaHabilidad(nombre=nombre)
+            db.add(fila)
+        fila.demanda, fila.oferta, fila.actualizado = demanda[nombre], oferta[nombre], ahora
+    db.commit()
+    return len(nombres)
+
+
+def purgar_tokens(db: Session) -> int:
+    """Borra refresh tokens expirados y revocaciones caducadas. Devuelve cuántas filas."""
+    return purgar_refresh_tokens(db) + purgar_revocaciones(db)
+
+
+def optimizar_base(db: Session) -> int:
+    """ANALYZE (y VACUUM con MAINTENANCE_VACUUM). Devuelve 0: no modifica filas."""
+    db.close()
+    # VACUUM no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+        conexion.exec_driver_sql("ANALYZE")
+        if MAINTENANCE_VACUUM:
+            conexion.exec_driver_sql("VACUUM")
+    return 0
+
+
+@dataclass
+class Tarea:
+    nombre: str
+    funcion: Callable[[Session], int]
+    intervalo: float  # segundos; 0 desactiva la tarea
+
+
+TAREAS: List[Tarea] = [
+    Tarea("cerrar_vencidas", cerrar_oportunidades_vencidas, MAINTENANCE_CLOSE_EXPIRED_SECONDS),
+    Tarea("estadisticas_habilidades", recalcular_estadisticas_habilidades, MAINTENANCE_SKILL_STATS_SECONDS),
+    Tarea("purgar_tokens", purgar_tokens, MAINTENANCE_PURGE_TOKENS_SECONDS),
+    Tarea("optimizar_base", optimizar_base, MAINTENANCE_OPTIMIZE_DB_SECONDS),
+]
+
+
+def ejecutar_tarea(tarea: Tarea) -> Optional[int]:
+    """Ejecuta la tarea con su propia sesión y registra sus métricas. None si falló."""
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    try:
+        filas = tarea.funcion(db)
+    except Exception as e:
+        db.rollback()
+        _ejecuciones.inc(tarea.nombre, "error")
+        logger.error(f"Tarea de mantenimiento {tarea.nombre} falló: {e}")
+        return None
+    finally:
+        _duracion_tareas.observar(time.perf_counter() - inicio, tarea.nombre)
+        db.close()
+    _ejecuciones.inc(tarea.nombre, "ok")
+    _filas_afectadas.inc(tarea.nombre, valor=filas)
+    _ultimo_exito[(tarea.nombre,)] = time.time()
+    logger.info(f"Tarea de mantenimiento {tarea.nombre}: {filas} filas en {time.perf_counter() - inicio:.2f} s")
+    return filas
+
+
+# --- Planificador ---
+
+class Planificador:
+    """Ejecuta cada tarea cada `intervalo` segundos mientras este proceso tenga el candado."""
+
+    REINTENTO_CANDADO = 60.0
+
+    def __init__(self, tareas: List[Tarea], archivo_candado: str = MAINTENANCE_LOCK_FILE,
+                 retraso_inicial: float = 0.0):
+        self.tareas = [t for t in tareas if t.intervalo > 0]
+        self.archivo_candado = archivo_candado
+        self.retraso_inicial = retraso_inicial
+        self._candado = None
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def _tomar_candado(self) -> bool:
+        if self._candado is not None:
+            return True
+        if fcntl is None:
+            self._candado = True
+            return True
+        directorio = os.path.dirname(self.archivo_candado)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        archivo = open(self.archivo_candado, "a")
+        try:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            archivo.close()
+            return False
+        self._candado = archivo
+        logger.info(f"Planificador de mantenimiento activo en el proceso {os.getpid()}")
+        return True
+
+    def _soltar_candado(self) -> None:
+        if self._candado not in (None, True):
+            self._candado.close()  # cerrar el archivo libera el flock
+        self._candado = None
+
+    def ejecutar(self) -> None:
+        """Bucle del planificador (bloquea hasta `detener`)."""
+        # La primera ronda se ejecuta tras `retraso_inicial`; luego cada tarea en su intervalo
+        primera = time.monotonic() + self.retraso_inicial
+        proxima = {t.nombre: primera for t in self.tareas}
+        try:
+            while not self._parar.is_set():
+                if not self._tomar_candado():
+                    self._parar.wait(self.REINTENTO_CANDADO)
+                    continue
+                for tarea in self.tareas:
+                    if self._parar.is_set():
+                        break
+                    if time.monotonic() >= proxima[tarea.nombre]:
+                        ejecutar_tarea(tarea)
+                        proxima[tarea.nombre] = time.monotonic() + tarea.intervalo
+                espera = min(proxima.values(), default=time.monotonic() + self.REINTENTO_CANDADO) - time.monotonic()
+                self._parar.wait(max(espera, 1.0))
+        finally:
+            self._soltar_candado()
+
+    def iniciar(self) -> "Planificador":
+        self._hilo = threading.Thread(target=self.ejecutar, name="mantenimiento", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        self._parar.set()
+        if self._hilo is not None:
+            # Una tarea larga (VACUUM) no debe retrasar el apagado: el hilo es daemon
+            self._hilo.join(timeout=10)
+
+
+_planificador: Dict[str, Planificador] = {}
+
+
+def iniciar_planificador() -> None:
+    """Arranca el planificador en un hilo de fondo (una vez por proceso)."""
+    if "activo" not in _planificador:
+        _planificador["activo"] = Planificador(TAREAS, retraso_inicial=MAINTENANCE_INITIAL_DELAY_SECONDS).iniciar()
+
+
+def detener_planificador() -> None:
+    planificador = _planificador.pop("activo", None)
+    if planificador is not None:
+        planificador.detener()
@@ -1,6 +1,32 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import threading
+
+# scikit-learn se importa en el primer uso (ver `cargar_tfidf`) para no pagar
+# su importación (y la de NumPy/SciPy) al arrancar la API.
+_tfidf = None
+_tfidf_estado = 'pendiente'  # pendiente | listo | no_disponible
+_tfidf_lock = threading.Lock()
+
+
+def cargar_tfidf():
+    """Devuelve (TfidfVectorizer, cosine_similarity) o None si scikit-learn no está instalado."""
+    global _tfidf, _tfidf_estado
+    if _tfidf_estado != 'pendiente':
+        return _tfidf
+    with _tfidf_lock:
+        if _tfidf_estado == 'pendiente':
+            try:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                from sklearn.metrics.pairwise import cosine_similarity
+                _tfidf = (TfidfVectorizer, cosine_similarity)
+                _tfidf_estado = 'listo'
+            except Exception:
+                _tfidf_estado = 'no_disponible'
+    return _tfidf
+
+
+def estado_tfidf() -> str:
+    """Estado de carga de scikit-learn: pendiente, listo o no_disponible."""
+    return _tfidf_estado
 
 
 def calcular_compatibilidad(estudiante, oportunidad) -> float:
@@ -117,6 +143,11 @@ def calcular_similitud_habilidades_tfidf(habilidades_est, habilidades_req) -> fl
         doc_estudiante = " ".join(habilidades_est)
         doc_requerido = " ".join(habilidades_req)
         
+        tfidf = cargar_tfidf()
+        if tfidf is None:
+            return calcular_similitud_substrings(habilidades_est, habilidades_req)
+        TfidfVectorizer, cosine_similarity = tfidf
+
         # Vectorizar usando TF-IDF
         vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 2))
         try:
@@ -167,4 +198,32 @@ def calcular_similitud_substrings(habilidades_est, habilidades_req) -> float:
     
     # Promedio de similitudes
     resultado = (sum(similitudes) / len(similitudes)) * 100.0 if similitudes else 0.0
-    return resultado
\ No newline at end of file
+    return resultado
+
+
+def resumen_oportunidad(oportunidad) -> dict:
+    """Datos de la oportunidad (y de su empresa) que acompañan a una puntuación de compatibilidad."""
+    empresa_info = {}
+    if oportunidad.empresa:
+        empresa_info = {
+            "id": oportunidad.empresa.id,
+            "nombre": oportunidad.empresa.nombre,
+            "descripcion": oportunidad.empresa.descripcion,
+            "ubicacion": oportunidad.empresa.ubicacion,
+            "website": oportunidad.empresa.website
+        }
+    return {
+        "id": oportunidad.id,
+        "empresa_id": oportunidad.empresa_id,
+        "empresa": empresa_info,
+        "titulo": oportunidad.titulo,
+        "descripcion": oportunidad.descripcion,
+        "tipo": oportunidad.tipo,
+        "habilidades_requeridas": oportunidad.habilidades_requeridas or [],
+        "semestre_minimo": oportunidad.semestre_minimo,
+        "ubicacion": oportunidad.ubicacion,
+        "modalidad": oportunidad.modalidad,
+        "salario": oportunidad.salario,
+        "activa": oportunidad.activa,
+        "fecha_publicacion": oportunidad.fecha_publicacion
+    }
@@ -0,0 +1,166 @@
+"""
+Proyecciones de estudiantes para el parámetro `fields=` (sparse fieldsets).
+
+Cada endpoint declara un catálogo de campos: qué columnas de `estudiantes` necesita
+cada uno, qué relación hay que cargar y cómo se serializa. A partir de los campos
+pedidos se arma la consulta (`load_only` para las columnas, `joinedload`/`selectinload`
+solo para las relaciones pedidas) y el diccionario de salida, así que el costo de la
+consulta y el tamaño de la respuesta dependen de lo que pide el cliente.
+
+Sin `fields` se devuelven todos los campos del catálogo (la respuesta de siempre).
+Los campos de una relación anidada se piden con punto: `fields=id,carrera,usuario.nombre`.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from db.database import Estudiante as DBEstudiante
+
+
+@dataclass(frozen=True)
+class Campo:
+    valor: Optional[Callable[[Any], Any]] = None   # estudiante (u objeto relacionado) -> valor
+    columnas: tuple = ()                           # atributos de la tabla a cargar
+    relacion: Optional[str] = None                 # relación de Estudiante a cargar
+    subcampos: Dict[str, "Campo"] = field(default_factory=dict)  # para relaciones a uno (usuario)
+
+
+def parse_campos(fields: Optional[str], catalogo: Dict[str, Campo]) -> Dict[str, Optional[List[str]]]:
+    """
+    `"id,carrera,usuario.nombre"` -> {"id": None, "carrera": None, "usuario": ["nombre"]}
+    en el orden del catálogo. None (o vacío) pide todos los campos. 400 si alguno no existe.
+    """
+    if not fields or not fields.strip():
+        return {nombre: None for nombre in catalogo}
+    pedidos: Dict[str, Optional[List[str]]] = {}
+    desconocidos = []
+    for parte in fields.split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        nombre, _, sub = parte.partition(".")
+        campo = catalogo.get(nombre)
+        if campo is None or (sub and sub not in campo.subcampos):
+            desconocidos.append(parte)
+        elif sub:
+            actual = pedidos.get(nombre, [])
+            # `usuario` completo tiene prioridad sobre `usuario.x`
+            if actual is not None and sub not in actual:
+                pedidos[nombre] = actual + [sub]
+        else:
+            pedidos[nombre] = None
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(_nombres(catalogo))}",
+        )
+    return {nombre: pedidos[nombre] for nombre in catalogo if nombre in pedidos}
+
+
+def _nombres(catalogo: Dict[str, Campo]) -> List[str]:
+    nombres = []
+    for nombre, campo in catalogo.items():
+        nombres.append(nombre)
+        nombres.extend(f"{nombre}.{sub}" for sub in campo.subcampos)
+    return nombres
+
+
+def opciones_de_carga(campos: Dict[str, Optional[List[str]]], catalogo: Dict[str, Campo]) -> list:
+    """Opciones de `Query.options` que cargan solo las columnas y relaciones necesarias."""
+    columnas = []
+    opciones = []
+    for nombre, sub in campos.items():
+        campo = catalogo[nombre]
+        columnas.extend(c for c in campo.columnas if c not in columnas)
+        if campo.relacion is None:
+            continue
+        relacion = getattr(DBEstudiante, campo.relacion)
+        if campo.subcampos:
+            modelo = relacion.property.mapper.class_
+            sub_columnas = {c for s in (sub or campo.subcampos) for c in campo.subcampos[s].columnas}
+            opciones.append(joinedload(relacion).load_only(*[getattr(modelo, c) for c in sorted(sub_columnas)]))
+        else:
+            opciones.append(selectinload(relacion))
+    # load_only siempre incluye la clave primaria
+    opciones.insert(0, load_only(*[getattr(DBEstudiante, c) for c in columnas] or [DBEstudiante.id]))
+    return opciones
+
+
+def proyectar(estudiante, campos: Dict[str, Optional[List[str]]], catalogo: Dict[str, Campo]) -> dict:
+    salida = {}
+    for nombre, sub in campos.items():
+        campo = catalogo[nombre]
+        if campo.subcampos:
+            relacionado = getattr(estudiante, campo.relacion)
+            salida[nombre] = {
+                s: campo.subcampos[s].valor(relacionado) for s in (sub or campo.subcampos)
+            } if relacionado is not None else None
+        else:
+            salida[nombre] = campo.valor(estudiante)
+    return salida
+
+
+# --- Catálogos ---
+
+def _columna(nombre: str, por_defecto=None) -> Campo:
+    if por_defecto is None:
+        return Campo(valor=lambda obj: getattr(obj, nombre), columnas=(nombre,))
+    return Campo(valor=lambda obj: getattr(obj, nombre) or por_defecto(), columnas=(nombre,))
+
+
+CAMPOS_USUARIO: Dict[str, Campo] = {
+    "id": _columna("id"),
+    "nombre": _columna("nombre"),
+    "apellido": _columna("apellido"),
+    "email": _columna("email"),
+    "tipo": _columna("tipo"),
+    "activo": _columna("activo"),
+    "fecha_creacion": Campo(
+        valor=lambda u: str(u.fecha_creacion) if u.fecha_creacion else None, columnas=("fecha_creacion",)
+    ),
+}
+
+# GET /auth/usuarios/estudiantes
+CAMPOS_ESTUDIANTE_LISTA: Dict[str, Campo] = {
+    "id": _columna("id"),
+    "usuario_id": _columna("usuario_id"),
+    "matricula": _columna("matricula"),
+    "semestre": _columna("semestre"),
+    "carrera": _columna("carrera"),
+    "gpa": _columna("gpa"),
+    "habilidades_tecnicas": _columna("habilidades_tecnicas", list),
+    "habilidades_blandas": _columna("habilidades_blandas", list),
+    "proyectos": Campo(valor=lambda e: e.proyectos_lista or [], columnas=("proyectos_lista",)),
+    "disponibilidad": _columna("disponibilidad"),
+    "experiencias": Campo(
+        valor=lambda e: [
+            {"id": x.id, "puesto": x.puesto, "empresa": x.empresa, "descripcion": x.descripcion,
+             "fecha_inicio": x.fecha_inicio, "fecha_fin": x.fecha_fin, "estudiante_id": x.estudiante_id}
+            for x in e.experiencias
+        ],
+        relacion="experiencias",
+    ),
+    "habilidades": Campo(
+        valor=lambda e: [{"id": h.id, "nombre": h.nombre} for h in e.habilidades], relacion="habilidades"
+    ),
+    "usuario": Campo(relacion="usuario", subcampos=CAMPOS_USUARIO),
+}
+
+# GET /estudiantes/{estudiante_id}
+CAMPOS_ESTUDIANTE_DETALLE: Dict[str, Campo] = {
+    **{nombre: CAMPOS_ESTUDIANTE_LISTA[nombre] for nombre in (
+        "id", "usuario_id", "matricula", "semestre", "carrera", "gpa",
+        "habilidades_tecnicas", "habilidades_blandas", "proyectos",
+    )},
+    "experiencias": Campo(
+        valor=lambda e: [
+            {"puesto": x.puesto, "empresa": x.empresa, "descripcion": x.descripcion,
+             "fecha_inicio": x.fecha_inicio, "fecha_fin": x.fecha_fin}
+            for x in e.experiencias
+        ],
+        relacion="experiencias",
+    ),
+    "cv_path": _columna("cv_path"),
+}
@@ -0,0 +1,297 @@
+"""
+Almacenamiento de CVs direccionado por contenido.
+
+Cada archivo se guarda bajo una clave `<sha256><ext>` (p. ej. `3fa4...e1.pdf`), de modo
+que subir dos veces el mismo archivo no lo vuelve a escribir y cualquier instancia de
+la API puede resolver la clave guardada en `Estudiante.cv_path`.
+
+Backends:
+- `LocalStorage`: sistema de archivos con directorios repartidos (`ab/cd/<clave>`).
+- `S3Storage`: cualquier servicio compatible con S3 (AWS, MinIO, etc.); requiere boto3.
+
+Opcionalmente los blobs se comprimen con gzip cuando eso reduce su tamaño.
+
+Como varios estudiantes pueden compartir una clave, un blob solo se borra cuando ningún
+`cv_path` lo referencia ya (ver `services.cv_import.liberar_cvs_huerfanos`).
+"""
+import abc
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+
+from core.config import (
+    CV_STORAGE_BACKEND,
+    CV_STORAGE_DIR,
+    CV_STORAGE_COMPRESS,
+    CV_STORAGE_S3_BUCKET,
+    CV_STORAGE_S3_PREFIX,
+    CV_STORAGE_S3_ENDPOINT_URL,
+)
+
+_RE_CLAVE = re.compile(r'^[0-9a-f]{64}\.(pdf|doc|docx)$')
+
+MEDIA_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Solo se guarda comprimido si ahorra al menos este porcentaje (los PDF suelen venir comprimidos)
+_AHORRO_MINIMO = 0.10
+
+
+class BlobInfo(NamedTuple):
+    clave: str
+    tamano: int          # tamaño del contenido original (sin comprimir)
+    modificado: datetime
+    comprimido: bool
+
+
+def clave_para(data: bytes, ext: str) -> str:
+    """Clave de contenido: sha256 del archivo + extensión en minúsculas."""
+    return hashlib.sha256(data).hexdigest() + ext.lower()
+
+
+def es_clave(valor: Optional[str]) -> bool:
+    """True si `valor` es una clave del almacenamiento (y no una ruta de archivo antigua)."""
+    return bool(valor) and bool(_RE_CLAVE.match(valor))
+
+
+def media_type_para(clave_o_ruta: str) -> str:
+    return MEDIA_TYPES.get(os.path.splitext(clave_o_ruta)[1].lower(), 'application/octet-stream')
+
+
+def _comprimir(data: bytes, comprimir: bool):
+    """Devuelve (bytes a guardar, comprimido)."""
+    if comprimir:
+        comprimido = gzip.compress(data, compresslevel=6, mtime=0)
+        if len(comprimido) <= len(data) * (1 - _AHORRO_MINIMO):
+            return comprimido, True
+    return data, False
+
+
+class CVStorage(abc.ABC):
+    """
+    Interfaz común de los backends de almacenamiento de CVs. Todas las operaciones son
+    bloqueantes (disco o red): desde un endpoint async se llaman con `run_in_threadpool`.
+    """
+
+    @abc.abstractmethod
+    def put(self, data: bytes, ext: str) -> str:
+        """Guarda el contenido (si no existe ya) y devuelve su clave."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, clave: str) -> bytes:
+        """Devuelve el contenido original (descomprimido). FileNotFoundError si no existe."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stat(self, clave: str) -> Optional[BlobInfo]:
+        """Metadatos del blob, o None si no existe."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, clave: str) -> None:
+        """Borra el blob; no falla si no existe."""
+        raise NotImplementedError
+
+    def exists(self, clave: str) -> bool:
+        return self.stat(clave) is not None
+
+    def ruta_directa(self, clave: str) -> Optional[str]:
+        """Ruta local del archivo sin comprimir si existe (permite servirlo sin copiarlo)."""
+        return None
+
+    @contextmanager
+    def local_path(self, clave: str) -> Iterator[str]:
+        """
+        Ruta local con el contenido original, para librerías que necesitan un archivo
+        (pypdf, python-docx). Si hace falta, se usa un archivo temporal que se borra al salir.
+        """
+        ruta = self.ruta_directa(clave)
+        if ruta:
+            yield ruta
+            return
+        ext = os.path.splitext(clave)[1]
+        fd, tmp = tempfile.mkstemp(suffix=ext)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.get(clave))
+            yield tmp
+        finally:
+            os.unlink(tmp)
+
+
+class LocalStorage(CVStorage):
+    """Blobs en el sistema de archivos local: `<raiz>/ab/cd/<clave>[.gz]`."""
+
+    def __init__(self, raiz: str = CV_STORAGE_DIR, comprimir: bool = CV_STORAGE_COMPRESS):
+        self.raiz = raiz
+        self.comprimir = comprimir
+
+    def _ruta(self, clave: str) -> str:
+        if not es_clave(clave):
+            raise ValueError(f"Clave de CV inválida: {clave}")
+        return os.path.join(self.raiz, clave[:2], clave[2:4], clave)
+
+    def _existente(self, clave: str):
+        """Devuelve (ruta, comprimido) del archivo guardado o (None, False)."""
+        ruta = self._ruta(clave)
+        if os.path.exists(ruta):
+            return ruta, False
+        if os.path.exists(ruta + '.gz'):
+            return ruta + '.gz', True
+        return None, False
+
+    def put(self, data: bytes, ext: str) -> str:
+        clave = clave_para(data, ext)
+        if self._existente(clave)[0]:
+            return clave  # Deduplicado: el mismo contenido ya está guardado
+        contenido, comprimido = _comprimir(data, self.comprimir)
+        ruta = self._ruta(clave) + ('.gz' if comprimido else '')
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Escritura atómica: archivo temporal en el mismo directorio + rename
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(contenido)
+            os.replace(tmp, ruta)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return clave
+
+    def get(self, clave: str) -> bytes:
+        ruta, comprimido = self._existente(clave)
+        if ruta is None:
+            raise FileNotFoundError(clave)
+        with open(ruta, 'rb') as f:
+            data = f.read()
+        return gzip.decompress(data) if comprimido else data
+
+    def stat(self, clave: str) -> Optional[BlobInfo]:
+        ruta, comprimido = self._existente(clave)
+        if ruta is None:
+            return None
+        st = os.stat(ruta)
+        tamano = st.st_size
+        if comprimido:
+            # El tamaño original está en los últimos 4 bytes del gzip (módulo 2^32)
+            with open(ruta, 'rb') as f:
+                f.seek(-4, os.SEEK_END)
+                tamano = int.from_bytes(f.read(4), 'little')
+        return BlobInfo(clave, tamano, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc), comprimido)
+
+    def delete(self, clave: str) -> None:
+        ruta, _ = self._existente(clave)
+        if ruta:
+            os.unlink(ruta)
+
+    def ruta_directa(self, clave: str) -> Optional[str]:
+        ruta, comprimido = self._existente(clave)
+        return ruta if ruta and not comprimido else None
+
+
+class S3Storage(CVStorage):
+    """
+    Blobs en un bucket compatible con S3. Con `endpoint_url` se puede apuntar a un
+    servicio local (p. ej. MinIO en http://localhost:9000) para desarrollo y pruebas.
+    Las credenciales se toman de las variables estándar de AWS (AWS_ACCESS_KEY_ID, ...).
+    """
+
+    def __init__(self, bucket: str = CV_STORAGE_S3_BUCKET, prefijo: str = CV_STORAGE_S3_PREFIX,
+                 endpoint_url: Optional[str] = CV_STORAGE_S3_ENDPOINT_URL,
+                 comprimir: bool = CV_STORAGE_COMPRESS, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("CV_STORAGE_BACKEND=s3 requiere instalar boto3")
+            client = boto3.client('s3', endpoint_url=endpoint_url or None)
+        if not bucket:
+            raise RuntimeError("CV_STORAGE_S3_BUCKET no está configurado")
+        self.client = client
+        self.bucket = bucket
+        self.prefijo = prefijo
+        self.comprimir = comprimir
+
+    def _key(self, clave: str) -> str:
+        if not es_clave(clave):
+            raise ValueError(f"Clave de CV inválida: {clave}")
+        return f"{self.prefijo}{clave[:2]}/{clave[2:4]}/{clave}"
+
+    def _head(self, clave: str):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(clave))
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def put(self, data: bytes, ext: str) -> str:
+        clave = clave_para(data, ext)
+        if self._head(clave) is not None:
+            return clave  # Deduplicado
+        contenido, comprimido = _comprimir(data, self.comprimir)
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(clave),
+            Body=contenido,
+            ContentType=media_type_para(clave),
+            Metadata={'comprimido': '1' if comprimido else '0', 'tamano': str(len(data))},
+        )
+        return clave
+
+    def get(self, clave: str) -> bytes:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._key(clave))
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(clave)
+        data = obj['Body'].read()
+        return gzip.decompress(data) if obj.get('Metadata', {}).get('comprimido') == '1' else data
+
+    def stat(self, clave: str) -> Optional[BlobInfo]:
+        head = self._head(clave)
+        if head is None:
+            return None
+        meta = head.get('Metadata', {})
+        comprimido = meta.get('comprimido') == '1'
+        tamano = int(meta.get('tamano', head['ContentLength']))
+        return BlobInfo(clave, tamano, head['LastModified'], comprimido)
+
+    def delete(self, clave: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(clave))
+
+
+_storage: Optional[CVStorage] = None
+
+
+def get_storage() -> CVStorage:
+    """Backend configurado con CV_STORAGE_BACKEND (local | s3), creado una sola vez."""
+    global _storage
+    if _storage is None:
+        if CV_STORAGE_BACKEND == 's3':
+            _storage = S3Storage()
+        else:
+            _storage = LocalStorage()
+    return _storage
+
+
+@contextmanager
+def ruta_local_cv(cv_path: str) -> Iterator[str]:
+    """
+    Ruta local del CV guardado en `Estudiante.cv_path`, sea una clave del almacenamiento
+    o una ruta de archivo de antes de la migración (`uploaded_cvs/cv_{id}.pdf`).
+    """
+    if es_clave(cv_path):
+        with get_storage().local_path(cv_path) as ruta:
+            yield ruta
+    else:
+        yield cv_path
@@ -0,0 +1,194 @@
+"""
+Alta masiva de estudiantes desde un CSV (usado por el endpoint de administración y por
+scripts/import_usuarios.py).
+
+Columnas: `email,nombre,apellido,password` (obligatorias) y `matricula,semestre,carrera`
+(opcionales). El archivo se lee en streaming por lotes: en cada lote se validan las filas,
+se descartan emails/matrículas repetidos, se hashean las contraseñas en paralelo y se
+insertan los `User` + `Estudiante` en una sola transacción. Si la transacción falla se
+reintenta fila por fila para reportar exactamente qué filas tienen error.
+"""
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import func
+
+from db.database import SessionLocal, User as DBUser, Estudiante as DBEstudiante
+from schemas.models import UserCreate
+from security.core import pwd_context
+
+COLUMNAS_OBLIGATORIAS = ("email", "nombre", "apellido", "password")
+
+
+def _lotes(filas: Iterable, tam_lote: int) -> Iterator[List]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tam_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _validar(numero: int, fila: Dict[str, str]) -> Dict:
+    """Convierte una fila del CSV en los datos del alta; lanza ValueError si no es válida."""
+    # DictReader guarda los campos sobrantes como una lista bajo la clave None
+    if None in fila:
+        raise ValueError("La fila tiene más columnas que el encabezado")
+    fila = {(k or "").strip().lower(): (v or "").strip() for k, v in fila.items()}
+    try:
+        usuario = UserCreate(
+            email=fila.get("email", ""),
+            nombre=fila.get("nombre", ""),
+            apellido=fila.get("apellido", ""),
+            password=fila.get("password", ""),
+            tipo="estudiante",
+        )
+    except ValidationError as e:
+        campos = ", ".join(str(err["loc"][0]) for err in e.errors())
+        raise ValueError(f"Campos inválidos: {campos}")
+    semestre = fila.get("semestre") or None
+    if semestre is not None:
+        if not semestre.isdigit() or not 1 <= int(semestre) <= 10:
+            raise ValueError("Semestre inválido")
+        semestre = int(semestre)
+    return {
+        "fila": numero,
+        "usuario": usuario,
+        "matricula": fila.get("matricula") or None,
+        "semestre": semestre,
+        "carrera": fila.get("carrera") or None,
+    }
+
+
+def _nuevo_usuario(datos: Dict, hashed_password: str) -> DBUser:
+    u = datos["usuario"]
+    return DBUser(
+        email=u.email,
+        nombre=u.nombre,
+        apellido=u.apellido,
+        hashed_password=hashed_password,
+        tipo=u.tipo,
+        estudiante=DBEstudiante(
+            matricula=datos["matricula"],
+            semestre=datos["semestre"],
+            carrera=datos["carrera"],
+        ),
+    )
+
+
+def _insertar_lote(pendientes: List[Dict], hashes: List[str], dry_run: bool) -> List[Dict]:
+    """Inserta el lote en una transacción; si falla, reintenta fila por fila."""
+    reporte = []
+    db = SessionLocal()
+    try:
+        try:
+            db.add_all([_nuevo_usuario(d, h) for d, h in zip(pendientes, hashes)])
+            db.flush()
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            return [{"fila": d["fila"], "email": d["usuario"].email, "estado": "ok", "detalle": ""} for d in pendientes]
+        except Exception:
+            db.rollback()
+        for datos, hashed in zip(pendientes, hashes):
+            try:
+                db.add(_nuevo_usuario(datos, hashed))
+                db.flush()
+                if dry_run:
+                    db.rollback()
+                else:
+                    db.commit()
+                reporte.append({"fila": datos["fila"], "email": datos["usuario"].email, "estado": "ok", "detalle": ""})
+            except Exception as e:
+                db.rollback()
+                reporte.append({"fila": datos["fila"], "email": datos["usuario"].email, "estado": "error",
+                                "detalle": str(getattr(e, "orig", e))})
+    finally:
+        db.close()
+    return reporte
+
+
+def importar_estudiantes_csv(archivo: TextIO, tam_lote: int = 200, workers: Optional[int] = None,
+                             dry_run: bool = False) -> Dict:
+    """
+    Da de alta los estudiantes del CSV `archivo` (abierto en modo texto).
+    Devuelve {"total", "creados", "errores", "filas": [{fila, email, estado, detalle}, ...]}
+    donde `filas` solo incluye las que no se crearon.
+    """
+    lector = csv.DictReader(archivo)
+    columnas = {(c or "").strip().lower() for c in (lector.fieldnames or [])}
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+    reporte: List[Dict] = []
+    vistos_email, vistos_matricula = set(), set()
+    total = 0
+    # Pool propio para no competir con el pool de hashing de login/registro
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2, thread_name_prefix="argon2-import") as pool:
+        # La fila 1 es el encabezado
+        for lote in _lotes(enumerate(lector, start=2), tam_lote):
+            total += len(lote)
+            validas = []
+            for numero, fila in lote:
+                try:
+                    datos = _validar(numero, fila)
+                except Exception as e:
+                    # Una fila mal formada no debe abortar el resto de la importación
+                    reporte.append({"fila": numero, "email": (fila.get("email") or "").strip(),
+                                    "estado": "invalida", "detalle": str(e)})
+                    continue
+                email, matricula = datos["usuario"].email.lower(), datos["matricula"]
+                if email in vistos_email or (matricula and matricula in vistos_matricula):
+                    reporte.append({"fila": numero, "email": email, "estado": "duplicada",
+                                    "detalle": "Email o matrícula repetidos en el archivo"})
+                    continue
+                vistos_email.add(email)
+                if matricula:
+                    vistos_matricula.add(matricula)
+                validas.append(datos)
+
+            # Emails y matrículas que ya existen, con una consulta por lote (emails sin
+            # distinguir mayúsculas, igual que la deduplicación dentro del archivo)
+            db = SessionLocal()
+            try:
+                existentes_email = {
+                    e.lower() for (e,) in db.query(DBUser.email)
+                    .filter(func.lower(DBUser.email).in_([d["usuario"].email.lower() for d in validas]))
+                }
+                existentes_matricula = {
+                    m for (m,) in db.query(DBEstudiante.matricula)
+                    .filter(DBEstudiante.matricula.in_([d["matricula"] for d in validas if d["matricula"]]))
+                }
+            finally:
+                db.close()
+            pendientes = []
+            for datos in validas:
+                if datos["usuario"].email.lower() in existentes_email:
+                    reporte.append({"fila": datos["fila"], "email": datos["usuario"].email,
+                                    "estado": "existente", "detalle": "Email ya registrado"})
+                elif datos["matricula"] in existentes_matricula:
+                    reporte.append({"fila": datos["fila"], "email": datos["usuario"].email,
+                                    "estado": "existente", "detalle": "Matrícula ya registrada"})
+                else:
+                    pendientes.append(datos)
+            if not pendientes:
+                continue
+
+            hashes = list(pool.map(pwd_context.hash, [d["usuario"].password for d in pendientes]))
+            reporte.extend(_insertar_lote(pendientes, hashes, dry_run))
+
+    creados = sum(1 for r in reporte if r["estado"] == "ok")
+    return {
+        "total": total,
+        "creados": creados,
+        "errores": total - creados,
+        "dry_run": dry_run,
+        "filas": sorted((r for r in reporte if r["estado"] != "ok"), key=lambda r: r["fila"]),
+    }
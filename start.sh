@@ -1,4 +1,10 @@
 #!/bin/bash
 set -e
 PORT=${PORT:-8000}
-exec uvicorn unrc_api_main:app --host 0.0.0.0 --port "$PORT"
+export PORT
+# Producción: gunicorn con N workers de uvicorn (WEB_CONCURRENCY, ver gunicorn.conf.py).
+# SERVER=uvicorn arranca un solo proceso de uvicorn (desarrollo).
+if [ "${SERVER:-gunicorn}" = "uvicorn" ]; then
+    exec uvicorn unrc_api_main:app --host 0.0.0.0 --port "$PORT"
+fi
+exec gunicorn unrc_api_main:app -c gunicorn.conf.py
@@ -5,21 +5,24 @@ from fastapi.responses import HTMLResponse, FileResponse
 import logging
 import sys
 import os
-import subprocess
+from contextlib import asynccontextmanager
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Descargar modelo spaCy en startup (solo si no existe)
-try:
-    import spacy
-    spacy.load("es_core_news_sm")
-except OSError:
-    logger_temp = logging.getLogger(__name__)
-    logger_temp.info("Descargando modelo spaCy es_core_news_sm...")
-    subprocess.check_call([sys.executable, "-m", "spacy", "download", "es_core_news_sm"])
+# El modelo spaCy ya no se descarga ni se carga aquí: se instala en el build
+# (`python -m spacy download es_core_news_sm`) y se carga en el primer uso o
+# en el calentamiento de fondo (ver routers/health.py).
 
 # Se importa el router de autenticación. A medida que crees más routers, los importarás aquí.
-from routers import auth, habilidades, experiencias, proyectos, empresas, oportunidades, estudiantes
+from routers import auth, habilidades, experiencias, proyectos, empresas, oportunidades, estudiantes, health, metricas, perfiles
+from security.rate_limit import RateLimitMiddleware
+from core.compresion import CompressionMiddleware
+from core.config import (
+    COMPRESSION_ENABLED, MAINTENANCE_IN_PROCESS, METRICS_ENABLED, PROFILING_ENABLED, PROFILING_CONTINUOUS,
+)
+from core.metricas import MetricsMiddleware
+from core.perfilado import ProfilingMiddleware, iniciar_perfilado_continuo
+from services.mantenimiento import detener_planificador, iniciar_planificador
 
 # --- 2. Configuración del Logging ---
 # Configura un sistema básico de logging para registrar eventos importantes de la aplicación.
@@ -28,10 +31,24 @@ logger = logging.getLogger(__name__)
 
 # --- 3. Creación de la Aplicación FastAPI ---
 # Se crea la instancia principal de la aplicación FastAPI.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precarga de modelos en segundo plano; /health/ready indica cuándo termina.
+    health.iniciar_calentamiento()
+    if PROFILING_CONTINUOUS:
+        iniciar_perfilado_continuo()
+    # Tareas de mantenimiento (cierre de ofertas vencidas, estadísticas, ANALYZE...);
+    # con varios workers solo las ejecuta el que tiene el candado
+    if MAINTENANCE_IN_PROCESS:
+        iniciar_planificador()
+    yield
+    detener_planificador()
+
 app = FastAPI(
     title="API Vinculación UNRC",
     description="API inteligente para la gestión del talento humano de la UNRC",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- 4. Configuración de Middleware (CORS) ---
@@ -44,6 +61,20 @@ origins = [
     # "https://tu-dominio-de-produccion.com", # Agrega aquí tu dominio de producción
 ]
 
+# Perfilado por muestreo de peticiones concretas (`X-Profile: 1`, solo administradores).
+# Es el middleware más interno: el perfil cubre el endpoint y sus dependencias.
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Compresión gzip/brotli de respuestas grandes (JSON, HTML); por dentro del límite de
+# peticiones, CORS y métricas. Configurable con COMPRESSION_* (ver core/config.py).
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Límite de peticiones para login, registro y subida de CVs (configurable con RATE_LIMIT_RULES).
+# Se registra antes que CORS para que las respuestas 429 también lleven las cabeceras CORS.
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # Usar la lista de orígenes
@@ -52,6 +83,11 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"], # Especificar cabeceras
 )
 
+# Conteo y latencia de peticiones (GET /metrics). Se registra al final para quedar por
+# fuera del resto y medir también las respuestas 429 y las de CORS.
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # --- 5. Inclusión de Routers ---
 # Aquí se "conectan" los endpoints definidos en otros archivos (como auth.py) a la aplicación principal.
 # Cada router agrupa un conjunto de rutas relacionadas (ej. todo lo de autenticación).
@@ -62,6 +98,11 @@ app.include_router(proyectos.router)
 app.include_router(empresas.router)
 app.include_router(oportunidades.router)
 app.include_router(estudiantes.router)
+app.include_router(health.router)
+if METRICS_ENABLED:
+    app.include_router(metricas.router)
+if PROFILING_ENABLED:
+    app.include_router(perfiles.router)
 
 
 # --- 6. Endpoint Raíz (sirve index.html) ---
@@ -75,4 +116,11 @@ async def root(request: Request):
 # Este bloque permite ejecutar la API directamente con `python unrc_api_main.py`.
 # uvicorn es el servidor ASGI que corre la aplicación FastAPI. `reload=False` desactiva el reinicio automático.
 if __name__ == "__main__":
-    uvicorn.run("unrc_api_main:app", host="0.0.0.0", port=8000, reload=False)
\ No newline at end of file
+    # Desarrollo / despliegues simples. En producción usar gunicorn (ver gunicorn.conf.py y start.sh).
+    uvicorn.run(
+        "unrc_api_main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 8000)),
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        reload=False,
+    )
\ No newline at end of file